@@ -5,8 +5,14 @@ Complete web interface with live camera detection, GPS tracking, and dashboard
 
 import os
 import sys
+import shutil
 import json
 import base64
+import time
+import zlib
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
 import cv2
@@ -15,72 +21,211 @@ from flask import Flask, render_template, Response, request, jsonify
 from flask_cors import CORS
 
 # Add project to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 import config
-from src.utils import setup_logger
+from src.utils import (setup_logger, flush_logs, nms_boxes, load_tflite_interpreter, tflite_predict,
+                       setup_dnn_target)
 from src.database import DetectionDatabase
+from src.json_provider import dumpb, use_orjson
 from src.navigation.gps_handler import GPSHandler
 # Drone integration
 from src.navigation.drone_controller import DroneController
 from src.detection.drone_detector import DroneDetector
+from src.detection.openvino_engine import OpenVINOEngine
+from src.detection.tflite_engine import TFLiteYOLOEngine
+from src.detection.gpu_capture import open_capture
 
 logger = setup_logger(__name__)
 
+
+class GzipRequestMiddleware:
+    """Inflate gzip-encoded request bodies (APIClient compresses reports that carry images)"""
+    
+    def __init__(self, wsgi_app, max_size):
+        self.wsgi_app = wsgi_app
+        self.max_size = max_size
+    
+    def __call__(self, environ, start_response):
+        if environ.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip':
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            try:
+                # Cap the inflated size so a small body cannot expand without bound
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                body = inflater.decompress(environ['wsgi.input'].read(length), self.max_size + 1)
+            except zlib.error:
+                start_response('400 Bad Request', [('Content-Type', 'text/plain')])
+                return [b'Invalid gzip body']
+            
+            environ['wsgi.input'] = BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+            del environ['HTTP_CONTENT_ENCODING']
+        
+        return self.wsgi_app(environ, start_response)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+use_orjson(app)
 CORS(app)
 app.config['SECRET_KEY'] = 'astropath-2026-secret-key'
 app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE
+app.wsgi_app = GzipRequestMiddleware(app.wsgi_app, config.MAX_FILE_SIZE)
 
 # Initialize database
 db = DetectionDatabase()
 
+# Create required directories once, not on every save
+os.makedirs(config.DETECTIONS_DIR, exist_ok=True)
+os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+
 # Global variables for camera and detection
 camera = None
 yolo_net = None
+yolo_trt = None
+yolo_ov = None
+yolo_tflite = None
+YOLO_OUTPUT_LAYERS = ()
 classifier_model = None
 gps_handler = None
 detection_active = False
 
+# Background workers so JPEG encoding and disk writes don't stall inference
+encode_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='mjpeg-encode')
+save_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='detection-save')
+MAX_PENDING_ENCODES = 4  # Encoded frames allowed in flight before the stream waits
+DETECTIONS_STREAM_CHUNK = 64  # Rows per write when streaming /api/detections
+AGGREGATE_CACHE_CONTROL = 'private, max-age=15'  # Heatmap/stats are cached in the DB layer too
+
+# Reused single-frame YOLO input buffers, rebuilt only when the input size changes
+_blob_buffers = {'size': None, 'resized': None, 'blob': None}
+
+# Severity lookup by box/frame area ratio: searchsorted index -> name and BGR colour
+SEVERITY_BOUNDS = np.asarray(config.SEVERITY_BOUNDS, dtype=np.float64)
+SEVERITY_NAMES = config.SEVERITY_NAMES
+SEVERITY_COLORS = config.SEVERITY_COLORS_BGR
+
+# Location caches: last resolved fix (short TTL) and last IP lookup (refreshed off-thread)
+_location_cache = {'ts': 0.0, 'value': None}
+_ip_location_cache = {'ts': 0.0, 'latlng': None, 'refreshing': False}
+_ip_location_lock = threading.Lock()
+
+# Formatted wall-clock strings, refreshed at most once per second
+_clock = {'second': None, 'file': '', 'overlay': ''}
+
 
 def load_models():
     """Load YOLO and classifier models"""
-    global yolo_net, classifier_model
+    global yolo_net, yolo_trt, yolo_ov, yolo_tflite, YOLO_OUTPUT_LAYERS, classifier_model
     
     try:
-        # Load YOLO
-        if os.path.exists(config.YOLOV4_WEIGHTS) and os.path.exists(config.YOLOV4_CFG):
+        # Prefer TensorRT FP16 engine on CUDA devices
+        if config.USE_CUDA and config.USE_TENSORRT:
+            try:
+                # Imported here so CPU-only hosts never load TensorRT/PyCUDA in each worker
+                from src.detection.tensorrt_engine import TensorRTEngine
+                logger.info("Loading YOLO TensorRT engine...")
+                yolo_trt = TensorRTEngine(config.YOLOV4_TRT_ENGINE, onnx_path=config.YOLOV4_ONNX)
+                logger.info("✓ YOLO TensorRT engine loaded successfully")
+            except Exception as e:
+                logger.warning(f"TensorRT unavailable ({e}). Falling back to OpenCV DNN.")
+                yolo_trt = None
+        
+        # INT8 TFLite on edge builds, through the Edge TPU delegate when USE_EDGETPU is on
+        if (config.PI_OPTIMIZE or config.USE_EDGETPU) and yolo_trt is None:
+            try:
+                logger.info("Loading YOLO TFLite model...")
+                yolo_tflite = TFLiteYOLOEngine(
+                    config.YOLO_TFLITE,
+                    edgetpu_path=config.YOLO_EDGETPU if config.USE_EDGETPU else None,
+                    edgetpu_delegate=config.TFLITE_EDGETPU_DELEGATE
+                )
+                logger.info(f"✓ YOLO TFLite model loaded successfully ({yolo_tflite.device})")
+            except Exception as e:
+                logger.warning(f"TFLite YOLO unavailable ({e}). Falling back to OpenVINO/OpenCV DNN.")
+                yolo_tflite = None
+        
+        # Prefer OpenVINO when requested, or on CPU-only hosts when an IR export is present
+        if ((config.USE_OPENVINO or not config.USE_CUDA) and yolo_trt is None and yolo_tflite is None
+                and config.MODEL_STATUS['yolo_openvino'].exists):
+            try:
+                logger.info("Loading YOLO OpenVINO model...")
+                yolo_ov = OpenVINOEngine(config.YOLO_OPENVINO_XML)
+                logger.info("✓ YOLO OpenVINO model loaded successfully")
+            except Exception as e:
+                logger.warning(f"OpenVINO unavailable ({e}). Falling back to OpenCV DNN.")
+                yolo_ov = None
+        
+        # Load YOLO (OpenCV DNN) unless an accelerated engine is already active
+        if yolo_trt is not None or yolo_ov is not None or yolo_tflite is not None:
+            logger.info("Skipping OpenCV DNN load (TensorRT/OpenVINO/TFLite active)")
+        elif config.MODEL_STATUS['yolo_weights'].exists and config.MODEL_STATUS['yolo_cfg'].exists:
             logger.info("Loading YOLO model...")
             yolo_net = cv2.dnn.readNetFromDarknet(config.YOLOV4_CFG, config.YOLOV4_WEIGHTS)
             
-            if config.USE_CUDA:
-                yolo_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                yolo_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-            else:
-                yolo_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-                yolo_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            # CUDA (FP16 where supported) or CPU, warmed up so the first frame isn't slow
+            img_size = config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO
+            setup_dnn_target(yolo_net, img_size)
+            
+            # Resolve output layer names once instead of on every frame
+            layer_names = yolo_net.getLayerNames()
+            YOLO_OUTPUT_LAYERS = tuple(layer_names[i - 1] for i in np.asarray(yolo_net.getUnconnectedOutLayers()).flatten())
             
             logger.info("✓ YOLO model loaded successfully")
         else:
             logger.warning("YOLO model files not found. Detection will be limited.")
         
-        # Load classifier if available
-        if os.path.exists(config.CLASSIFIER_MODEL):
+        # Prefer the lightweight TFLite classifier on edge devices
+        if config.ACTIVE_CLASSIFIER == config.CLASSIFIER_TFLITE and config.MODEL_STATUS['classifier_tflite'].exists:
             try:
-                from tensorflow import keras
-                logger.info("Loading classifier model...")
-                classifier_model = keras.models.load_model(config.CLASSIFIER_MODEL)
-                logger.info("✓ Classifier model loaded successfully")
+                logger.info("Loading TFLite classifier model...")
+                classifier_model = load_tflite_interpreter(config.ACTIVE_CLASSIFIER)
+                logger.info("✓ TFLite classifier loaded successfully")
             except ImportError:
-                logger.warning("TensorFlow/Keras not installed. Skipping classifier model loading.")
+                logger.warning("tflite_runtime not installed. Falling back to Keras classifier.")
                 classifier_model = None
-        else:
-            logger.warning("Classifier model not found. Using YOLO only.")
+        
+        # Load Keras classifier only if TFLite is not in use
+        if classifier_model is None:
+            if config.MODEL_STATUS['classifier_h5'].exists:
+                try:
+                    from tensorflow import keras
+                    logger.info("Loading classifier model...")
+                    classifier_model = keras.models.load_model(config.CLASSIFIER_MODEL)
+                    logger.info("✓ Classifier model loaded successfully")
+                except ImportError:
+                    logger.warning("TensorFlow/Keras not installed. Skipping classifier model loading.")
+                    classifier_model = None
+            else:
+                logger.warning("Classifier model not found. Using YOLO only.")
             
     except Exception as e:
         logger.error(f"Error loading models: {e}")
 
 
+def run_classifier(img):
+    """
+    Run the pothole classifier on a BGR image crop
+    
+    Returns:
+        float: Pothole probability (0-1), or None if no classifier is loaded
+    """
+    if classifier_model is None:
+        return None
+    
+    resized = cv2.resize(img, (config.IMG_SIZE_CLASSIFIER, config.IMG_SIZE_CLASSIFIER))
+    resized = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)  # Classifier was trained on RGB
+    normalized = resized.astype(np.float32)[np.newaxis] / 255.0
+    
+    # TFLite interpreter
+    if hasattr(classifier_model, 'get_input_details'):
+        return float(tflite_predict(classifier_model, normalized).ravel()[0])
+    
+    # Keras model
+    return float(classifier_model.predict(normalized, verbose=0)[0][0])
+
+
 def initialize_gps():
     """Initialize GPS handler if enabled"""
     global gps_handler
@@ -88,7 +233,8 @@ def initialize_gps():
     if config.GPS_ENABLED:
         try:
             logger.info("Initializing GPS handler...")
-            gps_handler = GPSHandler(port=config.GPS_PORT, baud=config.GPS_BAUD)
+            gps_handler = GPSHandler(port=config.GPS_PORT, baud=config.GPS_BAUD,
+                                     cache_path=config.GPS_CACHE_FILE if config.GPS_USE_CACHED_IF_NO_FIX else None)
             if gps_handler.is_connected():
                 logger.info("✓ GPS handler initialized successfully")
             else:
@@ -98,7 +244,47 @@ def initialize_gps():
             gps_handler = None
 
 
+def _refresh_ip_location():
+    """Look up IP geolocation and store it in the cache"""
+    try:
+        import geocoder
+        g = geocoder.ip('me')
+        if g.ok and g.latlng:
+            _ip_location_cache['latlng'] = tuple(g.latlng)
+    except Exception as e:
+        logger.error(f"IP geolocation error: {e}")
+    finally:
+        _ip_location_cache['ts'] = time.monotonic()
+        _ip_location_cache['refreshing'] = False
+
+
+def _ip_location():
+    """Cached IP geolocation; only the very first lookup blocks the caller"""
+    if _ip_location_cache['ts'] == 0.0:
+        _refresh_ip_location()
+    elif time.monotonic() - _ip_location_cache['ts'] > config.IP_LOCATION_TTL:
+        with _ip_location_lock:
+            start = not _ip_location_cache['refreshing']
+            _ip_location_cache['refreshing'] = True
+        if start:
+            threading.Thread(target=_refresh_ip_location, name='ip-geolocation', daemon=True).start()
+    
+    return _ip_location_cache['latlng']
+
+
 def get_location():
+    """Get current location, reusing the last fix for LOCATION_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if _location_cache['value'] is not None and now - _location_cache['ts'] < config.LOCATION_CACHE_TTL:
+        return _location_cache['value']
+    
+    location = _resolve_location()
+    _location_cache['value'] = location
+    _location_cache['ts'] = now
+    return location
+
+
+def _resolve_location():
     """Get current location from GPS, Drone, or fallback to IP geolocation"""
     lat, lon = None, None
     source = "unknown"
@@ -129,15 +315,11 @@ def get_location():
     
     # Fallback to IP geolocation
     if config.GPS_FALLBACK_TO_IP or config.FALLBACK_GEOLOCATION:
-        try:
-            import geocoder
-            g = geocoder.ip('me')
-            if g.ok and g.latlng:
-                lat, lon = g.latlng
-                source = "ip"
-                logger.info(f"Location from IP: {lat}, {lon}")
-        except Exception as e:
-            logger.error(f"IP geolocation error: {e}")
+        latlng = _ip_location()
+        if latlng:
+            lat, lon = latlng
+            source = "ip"
+            logger.info(f"Location from IP: {lat}, {lon}")
     
     # Default fallback (Solapur, India)
     if lat is None or lon is None:
@@ -148,71 +330,68 @@ def get_location():
     return lat, lon, source
 
 
-def detect_potholes(frame):
-    """Detect potholes in a frame using YOLO"""
+def _timestamps():
+    """Return (filename, overlay) timestamp strings for the current second"""
+    now = int(time.time())
+    if now != _clock['second']:
+        local = time.localtime(now)
+        _clock['file'] = time.strftime("%Y%m%d_%H%M%S", local)
+        _clock['overlay'] = time.strftime("%Y-%m-%d %H:%M:%S", local)
+        _clock['second'] = now
+    return _clock['file'], _clock['overlay']
+
+
+def _process_outputs(frame, outputs, conf_threshold=None, nms_threshold=None):
+    """Decode YOLO outputs for one frame: threshold, NMS, severity and annotation"""
+    # Read per call (two attribute lookups per frame) so runtime config changes apply
+    if conf_threshold is None:
+        conf_threshold = config.CONF_THRESHOLD
+    if nms_threshold is None:
+        nms_threshold = config.NMS_THRESHOLD
     detections = []
     
-    if yolo_net is None:
-        return detections, frame
-    
     try:
         height, width = frame.shape[:2]
+        frame_area = width * height
         
-        # Prepare blob for YOLO
-        img_size = config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO
-        blob = cv2.dnn.blobFromImage(frame, 1/255.0, (img_size, img_size), swapRB=True, crop=False)
-        yolo_net.setInput(blob)
+        # Process detections: all proposals at once, one row per candidate
+        dets = np.concatenate([np.asarray(output).reshape(-1, output.shape[-1]) for output in outputs], axis=0)
+        
+        if dets.shape[1] > 5:
+            conf = dets[:, 5]
+        else:
+            conf = np.zeros(len(dets), dtype=np.float32)
         
-        # Get output layers
-        layer_names = yolo_net.getLayerNames()
-        output_layers = [layer_names[i - 1] for i in yolo_net.getUnconnectedOutLayers()]
+        mask = conf > conf_threshold
+        d = dets[mask]
         
-        # Forward pass
-        outputs = yolo_net.forward(output_layers)
+        # Get bounding box coordinates
+        center_x = (d[:, 0] * width).astype(np.int32)
+        center_y = (d[:, 1] * height).astype(np.int32)
+        w = (d[:, 2] * width).astype(np.int32)
+        h = (d[:, 3] * height).astype(np.int32)
         
-        # Process detections
-        boxes = []
-        confidences = []
+        x = (center_x - w / 2).astype(np.int32)
+        y = (center_y - h / 2).astype(np.int32)
         
-        for output in outputs:
-            for detection in output:
-                scores = detection[5:]
-                confidence = float(scores[0]) if len(scores) > 0 else 0
-                
-                if confidence > config.CONF_THRESHOLD:
-                    # Get bounding box coordinates
-                    center_x = int(detection[0] * width)
-                    center_y = int(detection[1] * height)
-                    w = int(detection[2] * width)
-                    h = int(detection[3] * height)
-                    
-                    x = int(center_x - w / 2)
-                    y = int(center_y - h / 2)
-                    
-                    boxes.append([x, y, w, h])
-                    confidences.append(confidence)
+        boxes = np.stack([x, y, w, h], axis=1)
+        scores = conf[mask]
         
         # Non-maximum suppression
         if len(boxes) > 0:
-            indices = cv2.dnn.NMSBoxes(boxes, confidences, config.CONF_THRESHOLD, config.NMS_THRESHOLD)
+            keep = nms_boxes(boxes, scores, nms_threshold)
             
-            if len(indices) > 0:
-                for i in indices.flatten():
-                    x, y, w, h = boxes[i]
-                    confidence = confidences[i]
-                    
-                    # Calculate severity based on area
-                    area_ratio = (w * h) / (width * height)
-                    
-                    if area_ratio < 0.01:
-                        severity = "Low"
-                        color = (0, 255, 0)
-                    elif area_ratio < 0.05:
-                        severity = "Medium"
-                        color = (0, 165, 255)
-                    else:
-                        severity = "High"
-                        color = (0, 0, 255)
+            if len(keep) > 0:
+                kept = boxes[keep]
+                
+                # Calculate severity based on area, for all kept boxes at once
+                area_ratios = kept[:, 2].astype(np.float64) * kept[:, 3] / frame_area
+                severity_idx = np.searchsorted(SEVERITY_BOUNDS, area_ratios, side='right')
+                
+                for (x, y, w, h), confidence, area_ratio, s in zip(kept.tolist(), scores[keep].tolist(),
+                                                                   area_ratios.tolist(), severity_idx.tolist()):
+                    severity = SEVERITY_NAMES[s]
+                    color = SEVERITY_COLORS[s]
                     
                     # Draw bounding box
                     cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
@@ -229,7 +408,7 @@ def detect_potholes(frame):
                     })
         
         # Add timestamp and detection count
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _timestamps()[1]
         cv2.putText(frame, f"Detections: {len(detections)}", (10, 30), 
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
         cv2.putText(frame, timestamp, (10, height - 10), 
@@ -241,12 +420,220 @@ def detect_potholes(frame):
     return detections, frame
 
 
+def _frame_to_blob(frame, size):
+    """
+    Equivalent of cv2.dnn.blobFromImage(frame, 1/255.0, size, swapRB=True) that writes into
+    a preallocated (1, 3, H, W) buffer instead of allocating a new blob per frame
+    """
+    if _blob_buffers['size'] != size:
+        width, height = size
+        _blob_buffers['resized'] = np.empty((height, width, 3), dtype=np.uint8)
+        _blob_buffers['blob'] = np.empty((1, 3, height, width), dtype=np.float32)
+        _blob_buffers['size'] = size
+    
+    resized = _blob_buffers['resized']
+    blob = _blob_buffers['blob']
+    cv2.resize(frame, size, dst=resized, interpolation=cv2.INTER_LINEAR)
+    cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=resized)
+    np.multiply(resized.transpose(2, 0, 1), 1 / 255.0, out=blob[0], casting='unsafe')
+    return blob
+
+
+def detect_potholes(frame, gpu_frame=None):
+    """Detect potholes in a frame using YOLO (gpu_frame: NVDEC-decoded copy of frame)"""
+    if yolo_net is None and yolo_trt is None and yolo_ov is None and yolo_tflite is None:
+        return [], frame
+    
+    try:
+        if yolo_trt is not None and gpu_frame is not None:
+            # Forward pass (TensorRT FP16), preprocessed on the GPU straight into the input binding
+            outputs = yolo_trt.infer_gpu_frame(gpu_frame)
+        elif yolo_trt is not None:
+            # Forward pass (TensorRT FP16), preprocessed into the engine's pinned input buffer
+            outputs = yolo_trt.infer_frame(frame)
+        elif yolo_ov is not None:
+            # Forward pass (OpenVINO CPU), at the IR's fixed input size
+            outputs = yolo_ov.infer(_frame_to_blob(frame, (yolo_ov.input_w, yolo_ov.input_h)))
+        elif yolo_tflite is not None:
+            # Forward pass (INT8 TFLite, Edge TPU or CPU), quantized into the input tensor
+            outputs = yolo_tflite.infer_frame(frame)
+        else:
+            # Prepare blob for YOLO
+            img_size = config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO
+            yolo_net.setInput(_frame_to_blob(frame, (img_size, img_size)))
+            
+            # Forward pass
+            outputs = yolo_net.forward(YOLO_OUTPUT_LAYERS)
+    
+    except Exception as e:
+        logger.error(f"Detection error: {e}")
+        return [], frame
+    
+    return _process_outputs(frame, outputs)
+
+
+def detect_potholes_batch(frames):
+    """
+    Detect potholes in several frames with a single YOLO forward pass
+    
+    Returns:
+        List of (detections, annotated_frame) tuples in input order
+    """
+    if not frames:
+        return []
+    
+    # TensorRT engine is built with a fixed batch of 1; double-buffer frames through it instead
+    if yolo_trt is not None:
+        return _detect_potholes_pipelined(frames)
+    
+    if len(frames) == 1 or (yolo_net is None and yolo_ov is None):
+        return [detect_potholes(frame) for frame in frames]
+    
+    # OpenVINO IR also has batch 1; run the frames concurrently on its request pool
+    if yolo_ov is not None:
+        try:
+            size = (yolo_ov.input_w, yolo_ov.input_h)
+            blobs = [cv2.dnn.blobFromImage(frame, 1/255.0, size, swapRB=True, crop=False) for frame in frames]
+            results = yolo_ov.infer_batch(blobs)
+        except Exception as e:
+            logger.error(f"Batch detection error: {e}")
+            return [([], frame) for frame in frames]
+        
+        return [_process_outputs(frame, outputs) for frame, outputs in zip(frames, results)]
+    
+    try:
+        img_size = config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO
+        blob = cv2.dnn.blobFromImages(frames, 1/255.0, (img_size, img_size), swapRB=True, crop=False)
+        yolo_net.setInput(blob)
+        outputs = yolo_net.forward(YOLO_OUTPUT_LAYERS)
+        
+        # Split each output layer back into per-frame proposals
+        batch = len(frames)
+        outputs = [output.reshape(batch, -1, output.shape[-1]) for output in outputs]
+    
+    except Exception as e:
+        logger.error(f"Batch detection error: {e}")
+        return [([], frame) for frame in frames]
+    
+    return [_process_outputs(frame, [output[i] for output in outputs]) for i, frame in enumerate(frames)]
+
+
+def _encode_jpeg(frame):
+    """Encode a frame as JPEG bytes at the configured quality"""
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+    return buffer.tobytes()
+
+
+def _detect_potholes_pipelined(frames):
+    """
+    Run frames through TensorRT with two in flight: frame i+1 is preprocessed and
+    queued while frame i is still on the GPU, and frame i is post-processed while
+    frame i+1 runs
+    """
+    results = []
+    try:
+        handle = yolo_trt.submit(frames[0])
+        for i, frame in enumerate(frames):
+            next_handle = yolo_trt.submit(frames[i + 1]) if i + 1 < len(frames) else None
+            outputs = yolo_trt.collect(handle)
+            results.append(_process_outputs(frame, outputs))
+            handle = next_handle
+    
+    except Exception as e:
+        logger.error(f"Batch detection error: {e}")
+        results.extend(([], frame) for frame in frames[len(results):])
+    
+    return results
+
+
+def _encode_preview(frame):
+    """Encode a non-detection frame as a downscaled, lower-quality JPEG for the stream only"""
+    height, width = frame.shape[:2]
+    if width > config.PREVIEW_MAX_WIDTH:
+        size = (config.PREVIEW_MAX_WIDTH, round(height * config.PREVIEW_MAX_WIDTH / width))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, config.PREVIEW_JPEG_QUALITY])
+    return buffer.tobytes()
+
+
+def _write_jpeg(image_path, jpeg_future):
+    """Write an already-encoded JPEG (from the encode pool) to disk"""
+    with open(image_path, 'wb') as f:
+        f.write(jpeg_future.result())
+
+
+def _save_detections(detections, frame_count, jpeg_future):
+    """Save the detection frame to disk and its detections to the database"""
+    lat, lon, source = get_location()
+    
+    # Save frame as image (reusing the stream's JPEG encode)
+    image_filename = f"detection_{_timestamps()[0]}_{frame_count}.jpg"
+    image_path = os.path.join(config.DETECTIONS_DIR, image_filename)
+    
+    save_pool.submit(_write_jpeg, image_path, jpeg_future)
+    
+    for detection in detections:
+        # Add to database
+        detection_data = {
+            'latitude': lat,
+            'longitude': lon,
+            'severity': detection['severity'],
+            'confidence': detection['confidence'],
+            'image_path': image_path,
+            'source': 'camera',
+            'location_source': source
+        }
+        
+        db.add_detection(detection_data)
+        logger.info(f"Detection saved: {detection['severity']} at ({lat}, {lon})")
+
+
+def _mjpeg_part(jpeg):
+    """Wrap JPEG bytes as one multipart MJPEG chunk"""
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n')
+
+
+def _drain_encoded(in_flight, max_pending):
+    """Yield finished MJPEG chunks in order, waiting only when too many are in flight"""
+    while in_flight and (in_flight[0].done() or len(in_flight) > max_pending):
+        yield _mjpeg_part(in_flight.popleft().result())
+
+
+def _flush_pending(pending, in_flight):
+    """Run batched detection over buffered frames and queue their encodes in capture order"""
+    results = iter(detect_potholes_batch([frame for _, frame, detect in pending if detect]))
+    
+    for frame_count, frame, detect in pending:
+        detections = []
+        if detect:
+            detections, frame = next(results)
+        
+        jpeg = encode_pool.submit(_encode_jpeg if detect else _encode_preview, frame)
+        
+        # Save detection to database if found
+        if detections:
+            _save_detections(detections, frame_count, jpeg)
+        
+        in_flight.append(jpeg)
+    
+    pending.clear()
+
+
 def generate_frames(camera_source=0):
     """Generate video frames with detection"""
     global camera, detection_active
     
+    # Frames waiting for a batched YOLO pass: (frame_count, frame, run_detection)
+    pending = deque()
+    pending_detections = 0
+    pending_since = 0.0
+    
+    # Encode futures not yet sent to the client, oldest first
+    in_flight = deque()
+    
     try:
-        camera = cv2.VideoCapture(camera_source)
+        camera = open_capture(camera_source, use_gpu=config.USE_CUDA)
         
         if not camera.isOpened():
             logger.error(f"Cannot open camera source: {camera_source}")
@@ -255,6 +642,10 @@ def generate_frames(camera_source=0):
         detection_active = True
         frame_count = 0
         
+        # Bit-mask test when the skip is a power of two, modulo otherwise
+        skip = config.DETECTION_FRAME_SKIP
+        skip_mask = skip - 1 if skip > 0 and skip & (skip - 1) == 0 else None
+        
         while detection_active:
             success, frame = camera.read()
             
@@ -262,9 +653,14 @@ def generate_frames(camera_source=0):
                 break
             
             # Process every Nth frame
-            if frame_count % config.DETECTION_FRAME_SKIP == 0:
-                # Check for drone mode
-                if config.DRONE_ENABLED:
+            if skip_mask is not None:
+                run_detection = (frame_count & skip_mask) == 0
+            else:
+                run_detection = frame_count % skip == 0
+            
+            # Check for drone mode
+            if config.DRONE_ENABLED:
+                if run_detection:
                     # Initialize drone controller if needed
                     if not hasattr(generate_frames, "drone_detector"):
                         drone_ctrl = DroneController(stream_url=camera_source if camera_source != 0 else config.DRONE_STREAM_URL)
@@ -284,48 +680,42 @@ def generate_frames(camera_source=0):
                              detector.save_detection(frame, detection)
                     
                     processed_frame = detector.annotate_frame(frame, detections, show_telemetry=True)
-                
                 else:
-                    # Standard pothole detection
-                    detections, processed_frame = detect_potholes(frame)
+                    processed_frame = frame
                 
-                    # Save detection to database if found
-                    if detections:
-                        lat, lon, source = get_location()
-                        
-                        for detection in detections:
-                            # Save frame as image
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            image_filename = f"detection_{timestamp}_{frame_count}.jpg"
-                            image_path = os.path.join(config.DETECTIONS_DIR, image_filename)
-                            
-                            os.makedirs(config.DETECTIONS_DIR, exist_ok=True)
-                            cv2.imwrite(image_path, frame)
-                            
-                            # Add to database
-                            detection_data = {
-                                'latitude': lat,
-                                'longitude': lon,
-                                'severity': detection['severity'],
-                                'confidence': detection['confidence'],
-                                'image_path': image_path,
-                                'source': 'camera',
-                                'location_source': source
-                            }
-                            
-                            db.add_detection(detection_data)
-                            logger.info(f"Detection saved: {detection['severity']} at ({lat}, {lon})")
-            else:
-                processed_frame = frame
+                in_flight.append(encode_pool.submit(_encode_jpeg if run_detection else _encode_preview, processed_frame))
+            
+            elif run_detection and yolo_trt is not None and getattr(camera, 'gpu_frame', None) is not None:
+                # Frame is already on the GPU (NVDEC); run it now before the reader reuses the buffer
+                detections, frame = detect_potholes(frame, camera.gpu_frame)
+                jpeg = encode_pool.submit(_encode_jpeg, frame)
+                if detections:
+                    _save_detections(detections, frame_count, jpeg)
+                in_flight.append(jpeg)
+            
+            elif not run_detection and pending_detections == 0:
+                # Nothing queued ahead of this frame, stream it straight away
+                in_flight.append(encode_pool.submit(_encode_preview, frame))
             
-            # Encode frame
-            ret, buffer = cv2.imencode('.jpg', processed_frame)
-            frame_bytes = buffer.tobytes()
+            else:
+                # Standard pothole detection, batched across frames
+                if not pending:
+                    pending_since = time.time()
+                pending.append((frame_count, frame, run_detection))
+                pending_detections += run_detection
+                
+                if (pending_detections >= config.YOLO_BATCH_SIZE or
+                        time.time() - pending_since >= config.YOLO_BATCH_TIMEOUT):
+                    _flush_pending(pending, in_flight)
+                    pending_detections = 0
             
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            yield from _drain_encoded(in_flight, MAX_PENDING_ENCODES)
             
             frame_count += 1
+        
+        # Drain frames left in a partial batch
+        _flush_pending(pending, in_flight)
+        yield from _drain_encoded(in_flight, 0)
             
     except Exception as e:
         logger.error(f"Frame generation error: {e}")
@@ -335,6 +725,103 @@ def generate_frames(camera_source=0):
         detection_active = False
 
 
+class FrameBroker:
+    """
+    Single capture + inference thread shared by every /video_feed client
+    The producer publishes each finished MJPEG chunk; viewers only wait for the latest one.
+    It runs only while someone is watching: when the last viewer disconnects it stops and
+    releases the camera, and the next viewer starts it again.
+    """
+    
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.start_lock = threading.Lock()
+        self.latest_part = None
+        self.seq = 0
+        self.viewers = 0
+        self.running = False
+        self.source = None
+        self.thread = None
+    
+    @staticmethod
+    def normalize_source(camera_source):
+        """Query strings arrive as text: '0' must name the same camera as config's int 0"""
+        if isinstance(camera_source, str) and camera_source.strip().isdigit():
+            return int(camera_source)
+        return camera_source
+    
+    def start(self, camera_source):
+        """Start the producer for camera_source, restarting it if the source changed"""
+        global detection_active
+        
+        with self.start_lock:
+            with self.cond:
+                if self.running and camera_source == self.source:
+                    return
+                previous = self.thread
+            
+            if previous is not None and previous.is_alive():
+                detection_active = False
+                previous.join()
+            
+            with self.cond:
+                self.source = camera_source
+                self.running = True
+                self.thread = threading.Thread(target=self._run, args=(camera_source,),
+                                               name='frame-broker', daemon=True)
+                self.thread.start()
+    
+    def _run(self, camera_source):
+        global detection_active
+        
+        parts = generate_frames(camera_source)
+        try:
+            for part in parts:
+                with self.cond:
+                    if not self.viewers:
+                        # Nobody is watching: stop here. running is cleared under the same
+                        # lock, so a viewer arriving now starts a fresh producer
+                        self.running = False
+                        detection_active = False
+                        break
+                    self.latest_part = part
+                    self.seq += 1
+                    self.cond.notify_all()
+        finally:
+            # Releases the camera before start() sees this thread finish
+            parts.close()
+            with self.cond:
+                self.running = False
+                self.cond.notify_all()
+    
+    def frames(self, camera_source):
+        """Yield the newest MJPEG chunk to one client until the producer stops"""
+        camera_source = self.normalize_source(camera_source)
+        
+        with self.cond:
+            self.viewers += 1
+        try:
+            self.start(camera_source)
+            
+            with self.cond:
+                seen = self.seq
+            
+            while True:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.seq != seen or not self.running)
+                    if self.seq == seen:
+                        return
+                    seen, part = self.seq, self.latest_part
+                yield part
+        finally:
+            # Runs when the client disconnects and the server closes this generator
+            with self.cond:
+                self.viewers -= 1
+
+
+frame_broker = FrameBroker()
+
+
 @app.route('/')
 def index():
     """Main page"""
@@ -351,35 +838,48 @@ def dashboard():
 def video_feed():
     """Video streaming route"""
     camera_source = request.args.get('source', config.CAMERA_SOURCE)
-    return Response(generate_frames(camera_source),
+    return Response(frame_broker.frames(camera_source),
                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
 @app.route('/api/detections', methods=['GET'])
 def get_detections():
-    """Get all detections"""
+    """Get all detections, streamed row by row (count is sent after the list)"""
     try:
         limit = int(request.args.get('limit', 100))
-        detections = db.get_recent_detections(limit=limit)
-        return jsonify({
-            'success': True,
-            'count': len(detections),
-            'detections': detections
-        })
+        rows = db.iter_recent_detections(limit=limit)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+    
+    def generate():
+        count = 0
+        chunk = [b'{"success": true, "detections": [']
+        for row in rows:
+            if count:
+                chunk.append(b',')
+            chunk.append(dumpb(app, row))
+            count += 1
+            if count % DETECTIONS_STREAM_CHUNK == 0:
+                yield b''.join(chunk)
+                chunk.clear()
+        chunk.append(b'], "count": %d}' % count)
+        yield b''.join(chunk)
+    
+    return Response(generate(), mimetype='application/json')
 
 
 @app.route('/api/heatmap', methods=['GET'])
 def get_heatmap():
     """Get heatmap data"""
     try:
-        detections = db.get_heatmap_data()
-        return jsonify({
+        heatmap = db.get_heatmap_data()
+        response = jsonify({
             'success': True,
-            'count': len(detections),
-            'data': detections
+            'count': len(heatmap['weight']),
+            'data': heatmap
         })
+        response.headers['Cache-Control'] = AGGREGATE_CACHE_CONTROL
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -389,10 +889,12 @@ def get_stats():
     """Get detection statistics"""
     try:
         stats = db.get_statistics()
-        return jsonify({
+        response = jsonify({
             'success': True,
             'stats': stats
         })
+        response.headers['Cache-Control'] = AGGREGATE_CACHE_CONTROL
+        return response
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -461,16 +963,24 @@ def upload_detection():
                 image_data = data['image'].split(',')[1] if ',' in data['image'] else data['image']
                 image_bytes = base64.b64decode(image_data)
                 
+                # Validate the upload decodes as an image; JPEGs keep their original bytes,
+                # other formats (PNG, WebP, ...) are re-encoded so the .jpg name is truthful
+                img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+                if img is None:
+                    raise ValueError("uploaded data is not a decodable image")
+                if not image_bytes.startswith(b'\xff\xd8'):
+                    ok, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+                    if not ok:
+                        raise ValueError("failed to re-encode upload as JPEG")
+                    image_bytes = buffer.tobytes()
+                
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 image_filename = f"detection_{timestamp}.jpg"
                 image_path = os.path.join(config.DETECTIONS_DIR, image_filename)
                 
-                os.makedirs(config.DETECTIONS_DIR, exist_ok=True)
-                
                 # Save image
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                cv2.imwrite(image_path, img)
+                with open(image_path, 'wb') as f:
+                    f.write(image_bytes)
             except Exception as e:
                 logger.error(f"Base64 image decode error: {e}")
                 
@@ -481,7 +991,6 @@ def upload_detection():
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 image_filename = f"node_{timestamp}.jpg"
                 image_path = os.path.join(config.DETECTIONS_DIR, image_filename)
-                os.makedirs(config.DETECTIONS_DIR, exist_ok=True)
                 file.save(image_path)
                 logger.info(f"File uploaded via multipart: {image_path}")
         
@@ -514,7 +1023,20 @@ def upload_detection():
 def report_pothole_api():
     """Endpoint for automated detections from drone/edge devices"""
     try:
-        data = request.get_json()
+        if 'image' in request.files:
+            # Multipart: scalar fields arrive as strings, the image as a raw file part
+            data = request.form.to_dict()
+            for key in ('latitude', 'longitude', 'confidence'):
+                if key in data:
+                    data[key] = float(data[key])
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            image_path = os.path.join(config.DETECTIONS_DIR, f"report_{timestamp}.jpg")
+            request.files['image'].save(image_path)
+            data['image_path'] = image_path
+        else:
+            data = request.get_json()
+        
         if not data:
             return jsonify({'success': False, 'error': 'No data provided'}), 400
 
@@ -539,6 +1061,29 @@ def report_pothole_api():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/report-batch', methods=['POST'])
+def report_batch_api():
+    """Bulk endpoint for BatchedReporter: {'detections': [...]} inserted in one transaction"""
+    try:
+        data = request.get_json()
+        detections = data.get('detections') if isinstance(data, dict) else None
+        if not detections:
+            return jsonify({'success': False, 'error': 'No detections provided'}), 400
+        
+        for detection in detections:
+            if 'class' in detection and 'class_name' not in detection:
+                detection['class_name'] = detection['class']
+        
+        inserted = db.add_detections(detections)
+        if inserted:
+            return jsonify({'success': True, 'inserted': inserted}), 201
+        return jsonify({'success': False, 'error': 'Database insertion failed'}), 500
+    
+    except Exception as e:
+        logger.error(f"Batch report API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/start_detection', methods=['POST'])
 def start_detection():
     """Start detection service"""
@@ -550,10 +1095,9 @@ def start_detection():
 @app.route('/api/stop_detection', methods=['POST'])
 def stop_detection():
     """Stop detection service"""
-    global detection_active, camera
+    global detection_active
+    # The broker thread releases the camera when its loop exits
     detection_active = False
-    if camera:
-        camera.release()
     return jsonify({'success': True, 'message': 'Detection stopped'})
 
 
@@ -565,7 +1109,8 @@ def health():
         'timestamp': datetime.now().isoformat(),
         'gps_enabled': config.GPS_ENABLED,
         'gps_connected': gps_handler.is_connected() if gps_handler else False,
-        'models_loaded': yolo_net is not None
+        'models_loaded': (yolo_net is not None or yolo_trt is not None or yolo_ov is not None
+                          or yolo_tflite is not None)
     })
 
 
@@ -575,16 +1120,19 @@ if __name__ == '__main__':
     logger.info("🚨 ASTROPATH - Starting Real-time Web Application")
     logger.info("="*70)
     
+    if not config.FLASK_DEBUG and shutil.which('gunicorn'):
+        # Hand the process over to gunicorn; models and GPS load in the worker (gunicorn.conf.py)
+        logger.info("Running in PRODUCTION mode (Gunicorn gthread workers)")
+        conf = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+        flush_logs()
+        os.execvp('gunicorn', ['gunicorn', '-c', conf, 'app:app'])
+    
     # Load models
     load_models()
     
     # Initialize GPS
     initialize_gps()
     
-    # Create required directories
-    os.makedirs(config.DETECTIONS_DIR, exist_ok=True)
-    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
-    
     # Run Flask app
     logger.info(f"\n🌐 Starting server at http://{config.FLASK_HOST}:{config.FLASK_PORT}")
     
@@ -599,4 +1147,4 @@ if __name__ == '__main__':
     else:
         logger.info("Running in PRODUCTION mode (Waitress WSGI Server)")
         from waitress import serve
-        serve(app, host=config.FLASK_HOST, port=config.FLASK_PORT)
+        serve(app, host=config.FLASK_HOST, port=config.FLASK_PORT, threads=config.GUNICORN_THREADS)
@@ -4,6 +4,7 @@ Centralised configuration for model paths, thresholds, and API endpoints
 """
 
 import os
+from collections import namedtuple
 
 # ==================== Project Paths ====================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +19,38 @@ YOLOV4_CFG = os.path.join(MODELS_DIR, "yolov4-tiny.cfg")
 OBJ_NAMES = os.path.join(MODELS_DIR, "obj.names")
 CLASSIFIER_MODEL = os.path.join(MODELS_DIR, "custom_classifier.h5")
 CLASSIFIER_TFLITE = os.path.join(MODELS_DIR, "custom_classifier.tflite")
+YOLOV4_ONNX = os.path.join(MODELS_DIR, "yolov4-tiny.onnx")
+YOLOV4_TRT_ENGINE = os.path.join(MODELS_DIR, "yolov4-tiny.engine")
+YOLO_OPENVINO_XML = os.path.join(MODELS_DIR, "yolov4-tiny.xml")  # OpenVINO IR, used on CPU when present
+YOLO_TFLITE = os.path.join(MODELS_DIR, "yolov4-tiny_int8.tflite")  # Built by tools/build_yolo_edge.py
+YOLO_EDGETPU = os.path.join(MODELS_DIR, "yolov4-tiny_int8_edgetpu.tflite")  # Used with USE_EDGETPU
+
+# Model artifacts are stat'ed once at import; startup code checks MODEL_STATUS[name].exists
+# instead of repeating os.path.exists (re-check the file if it is produced in-process)
+ModelArtifact = namedtuple('ModelArtifact', ['path', 'exists', 'size'])
+
+
+def _scan_artifacts(paths):
+    status = {}
+    for name, path in paths.items():
+        try:
+            status[name] = ModelArtifact(path, True, os.stat(path).st_size)
+        except OSError:
+            status[name] = ModelArtifact(path, False, 0)
+    return status
+
+
+MODEL_STATUS = _scan_artifacts({
+    'yolo_weights': YOLOV4_WEIGHTS,
+    'yolo_cfg': YOLOV4_CFG,
+    'yolo_onnx': YOLOV4_ONNX,
+    'yolo_trt_engine': YOLOV4_TRT_ENGINE,
+    'yolo_openvino': YOLO_OPENVINO_XML,
+    'yolo_tflite': YOLO_TFLITE,
+    'yolo_edgetpu': YOLO_EDGETPU,
+    'classifier_h5': CLASSIFIER_MODEL,
+    'classifier_tflite': CLASSIFIER_TFLITE,
+})
 
 # ==================== Training Configuration ====================
 IMG_SIZE_CLASSIFIER = 224
@@ -36,6 +69,7 @@ EXISTING_POTHOLE_IMAGES = os.getenv("EXISTING_IMAGES_PATH", os.path.join(os.path
 TRAINING_DATA_PATH = os.path.join(DATA_DIR, "training_images")
 POTHOLE_DATA_PATH = os.path.join(TRAINING_DATA_PATH, "pothole")
 PLAIN_DATA_PATH = os.path.join(TRAINING_DATA_PATH, "plain")
+COPY_PRESERVE_METADATA = False  # setup_training_data.py: keep timestamps (copy2) instead of a plain copyfile
 
 # 💡 CHOOSE YOUR TRAINING DATA SOURCE:
 # Option A: Use your existing images directly
@@ -45,6 +79,7 @@ PLAIN_DATA_PATH = os.path.join(TRAINING_DATA_PATH, "plain")
 
 # ==================== Detection Configuration ====================
 CONF_THRESHOLD = 0.5
+CONF_THRESHOLD_HIGH = 0.6  # Edge pipeline: minimum confidence to estimate severity and report
 NMS_THRESHOLD = 0.4
 SEVERITY_THRESHOLDS = {
     "area_ratio_low": 0.01,      # < 1% of frame
@@ -53,22 +88,45 @@ SEVERITY_THRESHOLDS = {
 
 # ==================== Severity Estimation ====================
 # Severity levels based on area ratio and confidence
-SEVERITY_LEVELS = {
-    "Low": {"min_area": 0, "max_area": 0.01, "color": (0, 255, 0)},        # Green
-    "Medium": {"min_area": 0.01, "max_area": 0.05, "color": (0, 165, 255)},  # Orange
-    "High": {"min_area": 0.05, "max_area": 1.0, "color": (0, 0, 255)},      # Red
-}
+# (name, min_area, max_area, BGR color), ordered from lowest to highest
+SEVERITY_LEVELS = (
+    ("Low", 0.0, 0.01, (0, 255, 0)),        # Green
+    ("Medium", 0.01, 0.05, (0, 165, 255)),  # Orange
+    ("High", 0.05, 1.0, (0, 0, 255)),       # Red
+)
+# Same table split into parallel columns for vectorized lookup:
+# level index = searchsorted(SEVERITY_BOUNDS, area_ratio, side='right')
+SEVERITY_BOUNDS = (SEVERITY_THRESHOLDS["area_ratio_low"], SEVERITY_THRESHOLDS["area_ratio_medium"])
+SEVERITY_NAMES = tuple(name for name, _, _, _ in SEVERITY_LEVELS)
+SEVERITY_COLORS_BGR = tuple(color for _, _, _, color in SEVERITY_LEVELS)
 
 # ==================== Camera/Input Configuration ====================
 CAMERA_SOURCE = 0  # 0 for webcam, or URL for IP camera / drone stream
 # CAMERA_SOURCE = "udp://192.168.1.100:5000"  # Example for drone
 VIDEO_OUTPUT_PATH = os.path.join(DETECTIONS_DIR, "output_video.avi")
 SAVE_DETECTIONS = True
-DETECTION_FRAME_SKIP = 2  # Process every Nth frame for faster inference (lower = faster but heavier)
+JPEG_QUALITY = 85  # JPEG quality for the MJPEG stream and saved detection frames
+DETECTION_FRAME_SKIP = 2  # Process every Nth frame (powers of two use a bit-mask test); higher = faster
+EDGE_REPORT_QUEUE_SIZE = 2  # Frames with detections waiting to be saved/geolocated; more are dropped
+PREVIEW_MAX_WIDTH = 960  # Skipped (non-detection) frames are streamed downscaled to this width
+PREVIEW_JPEG_QUALITY = 70  # JPEG quality for those preview frames
+YOLO_BATCH_SIZE = 8  # Frames per batched YOLO forward pass on the web stream (1 = no batching)
+YOLO_BATCH_TIMEOUT = 0.25  # Max seconds a partial batch waits before it is flushed
 
 # ==================== API/Cloud Configuration ====================
 API_URL = "http://localhost:5000/api/report"  # Local test server; replace with production URL
+API_BATCH_URL = "http://localhost:5000/api/report-batch"  # Bulk endpoint used by BatchedReporter
 API_TIMEOUT = 10  # seconds
+API_POOL_MAXSIZE = 16  # Keep-alive connections kept per API host by APIClient
+API_HTTP2 = False  # Multiplex concurrent API calls over one HTTP/2 connection via httpx (needs httpx[http2])
+API_MAX_RETRIES = 5  # Retries on connection errors, 429 and 5xx responses (exponential backoff)
+API_RETRY_BACKOFF = 0.3  # Backoff factor: waits 0.3s, 0.6s, 1.2s, ... between retries
+API_GZIP_MIN_BYTES = 1024  # Gzip JSON request bodies larger than this (image reports)
+API_BATCH_MAX_ITEMS = 50  # Detections per batched POST
+API_BATCH_MAX_BYTES = 900_000  # Flush a batch before its JSON body grows past this
+API_CACHE_SIZE = 128  # Distinct GET queries (heatmap bounds, report pages) kept in memory
+API_CACHE_TTL = 30  # Seconds a cached GET response is reused before refetching
+API_BATCH_INTERVAL = 1.0  # Seconds a queued detection may wait before its batch is sent
 ENABLE_CLOUD_UPLOAD = True  # Set to False to disable uploads
 
 # Geolocation fallback (IP-based)
@@ -95,7 +153,10 @@ GPS_MIN_QUALITY = 1  # 0=NoFix, 1=GPSFix, 2=DGPS, etc. (1+ is safe)
 
 # Fallback Behaviour
 GPS_USE_CACHED_IF_NO_FIX = True  # Use last known position if no current fix
+GPS_CACHE_FILE = os.path.join(DATA_DIR, "gps_cache.bin")  # mmap'ed last fix, shared across processes/restarts
 GPS_FALLBACK_TO_IP = True  # Use IP geolocation if GPS unavailable
+LOCATION_CACHE_TTL = 1.0  # Seconds a resolved location is reused across detections
+IP_LOCATION_TTL = 60.0  # Seconds before the IP geolocation is refreshed (in the background)
 
 # Recommended GPS Modules (2026):
 # - u-blox NEO-6M / NEO-M8N: ~₹500-1500, 2-5m accuracy, very popular
@@ -167,9 +228,16 @@ DRONE_SURVEY_SPEED = 5      # Survey speed in m/s
 
 
 # ==================== Raspberry Pi / Edge Deployment ====================
-PI_OPTIMIZE = False  # Enable TensorFlow Lite and lightweight inference
-USE_OPENVINO = False  # Use OpenVINO for YOLO acceleration on Pi
+PI_OPTIMIZE = False  # Enable TensorFlow Lite and lightweight inference (INT8 classifier)
+USE_OPENVINO = False  # Force OpenVINO (YOLO_OPENVINO_XML) even with USE_CUDA; CPU-only hosts use it when present
 USE_NCNN = False  # Use NCNN for YOLO on embedded devices
+# Run YOLO on a Coral Edge TPU (YOLO_EDGETPU); PI_OPTIMIZE alone runs the INT8 YOLO_TFLITE on the CPU
+USE_EDGETPU = False
+TFLITE_EDGETPU_DELEGATE = "libedgetpu.so.1"
+TFLITE_CALIBRATION_SAMPLES = 200  # Training images used to calibrate INT8 TFLite export
+# Classifier used by the detectors: INT8 TFLite on edge builds (tools/quantize_classifier.py), Keras otherwise
+ACTIVE_CLASSIFIER = CLASSIFIER_TFLITE if PI_OPTIMIZE else CLASSIFIER_MODEL
+TFLITE_XNNPACK_DELEGATE = "libxnnpack.so"  # Explicit XNNPACK delegate library, if installed
 
 # ==================== Fast Mode / Performance Tweaks ====================
 # Enable FAST_MODE to prioritise speed: uses smaller YOLO input size and lower-cost processing.
@@ -178,21 +246,43 @@ FAST_MODE = True
 FAST_IMG_SIZE_YOLO = 320
 # When True and OpenCV DNN built with CUDA, prefer CUDA target for inference.
 USE_CUDA = False
+# With USE_CUDA, run OpenCV DNN in FP16 on tensor cores; set False to force FP32 (e.g. Pascal GPUs)
+CUDA_FP16 = True
+# When True (with USE_CUDA), run YOLO through a TensorRT FP16 engine built from YOLOV4_ONNX.
+USE_TENSORRT = False
 
 # ==================== Web Server Configuration ====================
 # FLASK_HOST = "0.0.0.0" allows access from other devices on the network
 # FLASK_HOST = "127.0.0.1" allows access ONLY from this computer
 FLASK_HOST = "0.0.0.0"
 FLASK_PORT = int(os.environ.get('PORT', 5000))
+DASHBOARD_URL = f"http://{FLASK_HOST}:{FLASK_PORT}"
 FLASK_DEBUG = False  # Set to False for production!
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+# Production server (python app.py execs gunicorn when installed, else waitress).
+# One worker: the camera/inference thread is a per-process singleton; scale with threads.
+GUNICORN_WORKERS = 1
+GUNICORN_THREADS = 8
+# Dashboard (gunicorn_entry.py) has no per-process singletons, so it runs gevent workers
+DASHBOARD_WORKERS = 2
+DASHBOARD_WORKER_CONNECTIONS = 1000
+# Citizen app handlers mostly wait on the backend POST, so it can run far more threads than cores
+CITIZEN_SERVER_THREADS = 32
+CITIZEN_SERVER_BACKLOG = 1024  # Pending connections queued by the OS during upload bursts
+CITIZEN_UPLOAD_WORKERS = 8  # Background threads that save uploads and forward them to the backend
+CITIZEN_JOB_HISTORY = 1000  # Finished report jobs kept for /api/report/<job_id> status lookups
+CITIZEN_DIRECT_UPLOAD = False  # Browser PUTs photos to a backend pre-signed object-storage URL; only metadata reaches this app
+CITIZEN_UPLOAD_MAX_AGE = 3600  # Cache-Control max-age for /uploads/<filename>; names are timestamped, so files never change
+CITIZEN_USE_X_SENDFILE = False  # Behind Apache/lighttpd: let the front server send upload files (X-Sendfile)
+CITIZEN_UPLOAD_X_ACCEL = None  # Behind Nginx: internal location aliasing UPLOAD_FOLDER, e.g. "/protected-uploads/"
 
 # ==================== Logging Configuration ====================
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
 LOG_FILE = os.path.join(BASE_DIR, "astropath.log")
 LOG_TO_FILE = True
 LOG_TO_CONSOLE = True
+LOG_ASYNC = True  # Hand records to a background thread so request/frame threads never block on log I/O
 
 # ==================== Performance Metrics ====================
 ENABLE_FPS_COUNTER = True
@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for app.py
+Used by `python app.py` in production, or directly: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import config
+
+bind = f"{config.FLASK_HOST}:{config.FLASK_PORT}"
+workers = config.GUNICORN_WORKERS
+worker_class = 'gthread'
+threads = config.GUNICORN_THREADS
+timeout = 120
+
+
+def post_worker_init(worker):
+    """Load models and GPS inside the worker that serves requests"""
+    import app
+    app.load_models()
+    app.initialize_gps()
@@ -0,0 +1,14 @@
+"""
+Gunicorn settings for the dashboard (gunicorn_entry.py)
+Run: gunicorn -c gunicorn_dashboard.conf.py gunicorn_entry:app
+"""
+
+import config
+
+bind = f"{config.FLASK_HOST}:{config.FLASK_PORT}"
+# Dashboard handlers wait on SQLite reads and JSON encoding: greenlets, not threads.
+# Open connections per server = workers * worker_connections
+workers = config.DASHBOARD_WORKERS
+worker_class = 'gevent'
+worker_connections = config.DASHBOARD_WORKER_CONNECTIONS
+timeout = 120
@@ -0,0 +1,15 @@
+"""
+Gunicorn entry point for the dashboard (src/dashboard.py)
+Run: gunicorn -c gunicorn_dashboard.conf.py gunicorn_entry:app
+"""
+
+# Patch before anything imports socket/threading, so sqlite connections become per-greenlet
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+import config
+from src.dashboard import create_app
+
+app = create_app(os.path.join(config.BASE_DIR, "detections.db"))
@@ -1,16 +1,32 @@
 """
 ASTROPATH Main Entry Point
 Complete smart pothole detection system with dashboard, GPS, and ESP32-CAM support
+
+Usage:
+  python main.py                # Interactive menu
+  python main.py detect         # Run one operation and exit (see --help)
 """
 
 import sys
 import os
+import argparse
+import importlib
 
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:  # Already first on the path when run as a script
+    sys.path.insert(0, ROOT_DIR)
 import config
-from src.utils import setup_logger
 
-logger = setup_logger(__name__)
+_logger = None
+
+
+def get_logger():
+    """Create the logger on first use (src.utils pulls in NumPy/OpenCV)"""
+    global _logger
+    if _logger is None:
+        from src.utils import setup_logger
+        _logger = setup_logger(__name__)
+    return _logger
 
 
 def main_menu():
@@ -34,27 +50,14 @@ def main_menu():
     return choice
 
 
-def train_classifier():
-    """Launch training"""
-    from src.detection.train_classifier import main
-    main()
-
-
-def detect_edge():
-    """Launch edge detection"""
-    from src.detection.detect_edge import main
-    main()
-
-
 def start_dashboard():
     """Launch dashboard server"""
     from src.dashboard import DashboardServer
-    import os
     
     print("\n" + "="*70)
     print("🌐 ASTROPATH Dashboard Server")
     print("="*70)
-    print(f"Starting dashboard at http://{config.FLASK_HOST}:{config.FLASK_PORT}")
+    print(f"Starting dashboard at {config.DASHBOARD_URL}")
     print("Press Ctrl+C to stop the server\n")
     
     db_path = os.path.join(config.BASE_DIR, "detections.db")
@@ -71,37 +74,68 @@ def start_dashboard():
         dashboard.stop()
 
 
-def citizen_app():
-    """Launch citizen reporting app"""
-    from src.citizen_upload import main
-    main()
+# Static banners: config values are fixed at import, so format them once
+SETTINGS_BANNER = "\n".join([
+    "\n" + "="*70,
+    "⚙️  ASTROPATH Configuration",
+    "="*70,
+    "\n1. GPS Configuration",
+    f"   - GPS Enabled: {config.GPS_ENABLED}",
+    f"   - GPS Port: {config.GPS_PORT}",
+    f"   - GPS Baud Rate: {config.GPS_BAUD}",
+    "\n2. ESP32-CAM Configuration",
+    "   - IP Address: (set in config.py)",
+    "   - Port: 80",
+    "\n3. Detection Settings",
+    f"   - Confidence Threshold: {config.CONF_THRESHOLD}",
+    f"   - NMS Threshold: {config.NMS_THRESHOLD}",
+    "\n4. Dashboard Settings",
+    f"   - Dashboard URL: {config.DASHBOARD_URL}",
+    f"   - Debug Mode: {config.FLASK_DEBUG}",
+    "\nTo modify settings, edit config.py directly",
+    "="*70 + "\n",
+])
+
+CONFIG_BANNER = "\n".join([
+    "\n" + "="*70,
+    "ℹ️  ASTROPATH Configuration Summary",
+    "="*70,
+    "\n📁 Directories:",
+    f"  Models: {config.MODELS_DIR}",
+    f"  Data: {config.DATA_DIR}",
+    f"  Detections: {config.DETECTIONS_DIR}",
+    "\n📷 Camera & Detection:",
+    f"  Camera Source: {config.CAMERA_SOURCE}",
+    f"  YOLO Input Size: {config.IMG_SIZE_YOLO}",
+    f"  Classifier Input Size: {config.IMG_SIZE_CLASSIFIER}",
+    f"  Confidence Threshold: {config.CONF_THRESHOLD}",
+    f"  NMS Threshold: {config.NMS_THRESHOLD}",
+    f"  Frame Skip: {config.DETECTION_FRAME_SKIP}",
+    "\n🛰️  GPS Configuration:",
+    f"  GPS Enabled: {config.GPS_ENABLED}",
+    f"  GPS Port: {config.GPS_PORT}",
+    f"  GPS Baud Rate: {config.GPS_BAUD}",
+    f"  GPS Min Satellites: {config.GPS_MIN_SATS}",
+    "\n🌐 API & Dashboard:",
+    f"  API URL: {config.API_URL}",
+    f"  API Timeout: {config.API_TIMEOUT}s",
+    f"  Cloud Upload: {config.ENABLE_CLOUD_UPLOAD}",
+    f"  Dashboard: {config.DASHBOARD_URL}",
+    f"  Flask Debug: {config.FLASK_DEBUG}",
+    "\n⚙️  System:",
+    f"  Log Level: {config.LOG_LEVEL}",
+    f"  Log File: {config.LOG_FILE}",
+    f"  Debug Mode: {config.DEBUG_MODE}",
+    f"  FPS Counter: {config.ENABLE_FPS_COUNTER}",
+    "\n" + "="*70,
+    "Edit config.py to change settings",
+    "="*70 + "\n",
+])
 
 
 def configure_settings():
     """Interactive configuration"""
-    print("\n" + "="*70)
-    print("⚙️  ASTROPATH Configuration")
-    print("="*70)
-    
-    print("\n1. GPS Configuration")
-    print(f"   - GPS Enabled: {config.GPS_ENABLED}")
-    print(f"   - GPS Port: {config.GPS_PORT}")
-    print(f"   - GPS Baud Rate: {config.GPS_BAUD}")
-    
-    print("\n2. ESP32-CAM Configuration")
-    print("   - IP Address: (set in config.py)")
-    print("   - Port: 80")
-    
-    print("\n3. Detection Settings")
-    print(f"   - Confidence Threshold: {config.CONF_THRESHOLD}")
-    print(f"   - NMS Threshold: {config.NMS_THRESHOLD}")
-    
-    print("\n4. Dashboard Settings")
-    print(f"   - Dashboard URL: http://{config.FLASK_HOST}:{config.FLASK_PORT}")
-    print(f"   - Debug Mode: {config.FLASK_DEBUG}")
-    
-    print("\nTo modify settings, edit config.py directly")
-    print("="*70 + "\n")
+    print(SETTINGS_BANNER)
 
 
 def test_gps():
@@ -126,7 +160,8 @@ def test_gps():
     print(f"\nConnecting to GPS on {port} @ {baud} baud...")
     
     try:
-        gps = GPSHandler(port=port, baud=baud)
+        gps = GPSHandler(port=port, baud=baud,
+                         cache_path=config.GPS_CACHE_FILE if config.GPS_USE_CACHED_IF_NO_FIX else None)
         
         if not gps.is_connected():
             print("❌ Failed to connect to GPS module")
@@ -162,7 +197,7 @@ def test_gps():
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
     except Exception as e:
-        logger.error(f"GPS test failed: {e}")
+        get_logger().error("GPS test failed: %s", e)
 
 
 def test_esp32():
@@ -231,124 +266,116 @@ def test_esp32():
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
     except Exception as e:
-        logger.error(f"ESP32-CAM test failed: {e}")
-
-
-def test_api():
-    """Test API client"""
-    from src.api_client import test_api
-    test_api()
+        get_logger().error("ESP32-CAM test failed: %s", e)
 
 
 def show_config():
     """Display configuration"""
-    print("\n" + "="*70)
-    print("ℹ️  ASTROPATH Configuration Summary")
-    print("="*70)
+    print(CONFIG_BANNER)
+
+
+# Menu choice -> (banner, handler, error label). "module:function" handlers are imported
+# on first use and the resolved function is cached back into the table.
+DISPATCH = {
+    '1': ("\n🎓 Training Classifier...", 'src.detection.train_classifier:main', "Training failed"),
+    '2': ("\n📹 Starting Edge Detection...", 'src.detection.detect_edge:main', "Detection failed"),
+    '3': ("\n🌐 Starting Dashboard Server...", start_dashboard, "Dashboard failed"),
+    '4': ("\n👥 Starting Citizen Reporting App...", 'src.citizen_upload:main', "App failed"),
+    '5': (None, configure_settings, None),
+    '6': ("\n🧪 Testing GPS Handler...", test_gps, "GPS test failed"),
+    '7': ("\n📷 Testing ESP32-CAM...", test_esp32, "ESP32-CAM test failed"),
+    '8': ("\n🔌 Testing API Client...", 'src.api_client:test_api', "API test failed"),
+    '9': (None, show_config, None),
+}
+
+
+# Sub-command -> (menu choice, help). The menu digit is accepted as an alias.
+COMMANDS = {
+    'train': ('1', "Train pothole classifier"),
+    'detect': ('2', "Run edge detection (camera/video/ESP32-CAM)"),
+    'dashboard': ('3', "Start dashboard server"),
+    'citizen': ('4', "Start citizen reporting web app"),
+    'configure': ('5', "Show configurable settings"),
+    'test-gps': ('6', "Test GPS handler"),
+    'test-esp32': ('7', "Test ESP32-CAM connection"),
+    'test-api': ('8', "Test API client"),
+    'show-config': ('9', "View configuration"),
+}
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line sub-commands
+    
+    Returns:
+        str or None: Menu choice to run, or None for the interactive menu
+    """
+    parser = argparse.ArgumentParser(description="ASTROPATH - Smart Road Damage Reporting System")
+    sub = parser.add_subparsers(dest='cmd', metavar='command')
     
-    print("\n📁 Directories:")
-    print(f"  Models: {config.MODELS_DIR}")
-    print(f"  Data: {config.DATA_DIR}")
-    print(f"  Detections: {config.DETECTIONS_DIR}")
+    aliases = {}
+    for name, (choice, help_text) in COMMANDS.items():
+        sub.add_parser(name, aliases=[choice], help=help_text)
+        aliases[name] = aliases[choice] = choice
     
-    print("\n📷 Camera & Detection:")
-    print(f"  Camera Source: {config.CAMERA_SOURCE}")
-    print(f"  YOLO Input Size: {config.IMG_SIZE_YOLO}")
-    print(f"  Classifier Input Size: {config.IMG_SIZE_CLASSIFIER}")
-    print(f"  Confidence Threshold: {config.CONF_THRESHOLD}")
-    print(f"  NMS Threshold: {config.NMS_THRESHOLD}")
-    print(f"  Frame Skip: {config.DETECTION_FRAME_SKIP}")
+    args = parser.parse_args(argv)
+    return aliases.get(args.cmd)
+
+
+def run_choice(choice, raise_errors=False):
+    """
+    Run one menu operation
     
-    print("\n🛰️  GPS Configuration:")
-    print(f"  GPS Enabled: {config.GPS_ENABLED}")
-    print(f"  GPS Port: {config.GPS_PORT}")
-    print(f"  GPS Baud Rate: {config.GPS_BAUD}")
-    print(f"  GPS Min Satellites: {config.GPS_MIN_SATS}")
+    Args:
+        choice (str): Menu choice
+        raise_errors (bool): Re-raise a failing operation instead of logging it and
+            returning to the menu (non-interactive sub-commands)
     
-    print("\n🌐 API & Dashboard:")
-    print(f"  API URL: {config.API_URL}")
-    print(f"  API Timeout: {config.API_TIMEOUT}s")
-    print(f"  Cloud Upload: {config.ENABLE_CLOUD_UPLOAD}")
-    print(f"  Dashboard: http://{config.FLASK_HOST}:{config.FLASK_PORT}")
-    print(f"  Flask Debug: {config.FLASK_DEBUG}")
+    Returns:
+        bool: False when the user chose to exit
+    """
+    if choice == '0':
+        print("\n👋 Goodbye!")
+        return False
     
-    print("\n⚙️  System:")
-    print(f"  Log Level: {config.LOG_LEVEL}")
-    print(f"  Log File: {config.LOG_FILE}")
-    print(f"  Debug Mode: {config.DEBUG_MODE}")
-    print(f"  FPS Counter: {config.ENABLE_FPS_COUNTER}")
+    entry = DISPATCH.get(choice)
+    if entry is None:
+        print("\n❌ Invalid choice. Please try again.")
+        return True
     
-    print("\n" + "="*70)
-    print("Edit config.py to change settings")
-    print("="*70 + "\n")
+    banner, handler, error_label = entry
+    if banner:
+        print(banner)
+    
+    try:
+        if isinstance(handler, str):
+            module_name, attr = handler.split(':')
+            handler = getattr(importlib.import_module(module_name), attr)
+            DISPATCH[choice] = (banner, handler, error_label)
+        handler()
+    except Exception as e:
+        if error_label is None or raise_errors:
+            raise
+        get_logger().error("%s: %s", error_label, e)
+    
+    return True
 
 
 if __name__ == "__main__":
-    logger.info("="*70)
-    logger.info("ASTROPATH - Smart Road Damage Reporting System")
-    logger.info("="*70)
+    # Non-interactive: python main.py <command>
+    choice = parse_args()
+    if choice is not None:
+        # Exit non-zero on failure so systemd / CI see it
+        try:
+            run_choice(choice, raise_errors=True)
+        except Exception as e:
+            get_logger().error("%s: %s", DISPATCH[choice][2] or "Command failed", e)
+            sys.exit(1)
+        sys.exit(0)
     
-    while True:
-        choice = main_menu()
-        
-        if choice == '1':
-            print("\n🎓 Training Classifier...")
-            try:
-                train_classifier()
-            except Exception as e:
-                logger.error(f"Training failed: {e}")
-        
-        elif choice == '2':
-            print("\n📹 Starting Edge Detection...")
-            try:
-                detect_edge()
-            except Exception as e:
-                logger.error(f"Detection failed: {e}")
-        
-        elif choice == '3':
-            print("\n🌐 Starting Dashboard Server...")
-            try:
-                start_dashboard()
-            except Exception as e:
-                logger.error(f"Dashboard failed: {e}")
-        
-        elif choice == '4':
-            print("\n👥 Starting Citizen Reporting App...")
-            try:
-                citizen_app()
-            except Exception as e:
-                logger.error(f"App failed: {e}")
-        
-        elif choice == '5':
-            configure_settings()
-        
-        elif choice == '6':
-            print("\n🧪 Testing GPS Handler...")
-            try:
-                test_gps()
-            except Exception as e:
-                logger.error(f"GPS test failed: {e}")
-        
-        elif choice == '7':
-            print("\n📷 Testing ESP32-CAM...")
-            try:
-                test_esp32()
-            except Exception as e:
-                logger.error(f"ESP32-CAM test failed: {e}")
-        
-        elif choice == '8':
-            print("\n🔌 Testing API Client...")
-            try:
-                test_api()
-            except Exception as e:
-                logger.error(f"API test failed: {e}")
-        
-        elif choice == '9':
-            show_config()
-        
-        elif choice == '0':
-            print("\n👋 Goodbye!")
-            break
-        
-        else:
-            print("\n❌ Invalid choice. Please try again.")
+    get_logger().info("="*70)
+    get_logger().info("ASTROPATH - Smart Road Damage Reporting System")
+    get_logger().info("="*70)
+    
+    while run_choice(main_menu()):
+        pass
@@ -6,14 +6,106 @@ Integrate your existing pothole images for training
 import os
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 import config
 from src.utils import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+IMAGE_EXTENSIONS = frozenset(('jpg', 'jpeg', 'png'))
+
+
+def iter_images(directory):
+    """
+    Yield image file names from a single scandir pass without building a list
+    
+    Raises:
+        FileNotFoundError: If the directory does not exist (on first iteration)
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.rpartition('.')[2].lower() in IMAGE_EXTENSIONS and entry.is_file(follow_symlinks=False):
+                yield entry.name
+
+
+def list_images(directory):
+    """
+    List image file names in a directory
+    
+    Returns:
+        list of file names, or None if the directory does not exist
+    """
+    try:
+        return list(iter_images(directory))
+    except FileNotFoundError:
+        return None
+
+
+def count_images(directory):
+    """
+    Count image files in a directory without keeping their names
+    
+    Returns:
+        int, or None if the directory does not exist
+    """
+    try:
+        return sum(1 for _ in iter_images(directory))
+    except FileNotFoundError:
+        return None
+
+
+def copy_images(names, src_dir, dest_dir, total=None):
+    """
+    Copy files across a thread pool, keeping only a bounded number of copies in flight
+    
+    Args:
+        names: Iterable of file names (consumed lazily)
+        src_dir (str): Source directory
+        dest_dir (str): Destination directory
+        total (int): Expected count, for the progress bar
+    
+    Returns:
+        int: Number of files copied
+    """
+    copy = shutil.copy2 if config.COPY_PRESERVE_METADATA else shutil.copyfile  # copyfile uses sendfile()
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    progress = tqdm(total=total, desc="Copying", unit="img") if tqdm is not None else None
+    copied = 0
+    
+    def finish(done):
+        nonlocal copied
+        for future in done:
+            name = pending.pop(future)
+            try:
+                future.result()
+                copied += 1
+            except Exception as e:
+                logger.warning("Failed to copy %s: %s", name, e)
+            if progress is not None:
+                progress.update(1)
+    
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name in names:
+            if len(pending) >= workers * 2:
+                finish(wait(pending, return_when=FIRST_COMPLETED).done)
+            pending[executor.submit(copy, os.path.join(src_dir, name), os.path.join(dest_dir, name))] = name
+        finish(wait(pending).done)
+    
+    if progress is not None:
+        progress.close()
+    return copied
+
 
 def show_menu():
     """Display setup menu"""
@@ -37,18 +129,16 @@ def option_1_copy_images():
     existing_images = config.EXISTING_POTHOLE_IMAGES
     pothole_dest = config.POTHOLE_DATA_PATH
     
-    if not os.path.exists(existing_images):
-        logger.error(f"❌ Source images not found: {existing_images}")
+    # Get list of images
+    image_files = list_images(existing_images)
+    if image_files is None:
+        logger.error("❌ Source images not found: %s", existing_images)
         return
     
     # Create destination directory
     os.makedirs(pothole_dest, exist_ok=True)
     
-    # Get list of images
-    image_files = [f for f in os.listdir(existing_images) 
-                   if f.lower().endswith(('.jpg', '.jpeg', '.png'))]
-    
-    logger.info(f"Found {len(image_files)} pothole images")
+    logger.info("Found %d pothole images", len(image_files))
     print(f"\n📋 Sample images: {image_files[:5]}")
     
     if len(image_files) == 0:
@@ -61,22 +151,16 @@ def option_1_copy_images():
         print("Cancelled.")
         return
     
-    # Copy images
-    copied = 0
-    for img in image_files:
-        try:
-            src = os.path.join(existing_images, img)
-            dst = os.path.join(pothole_dest, img)
-            if not os.path.exists(dst):
-                shutil.copy2(src, dst)
-                copied += 1
-        except Exception as e:
-            logger.warning(f"Failed to copy {img}: {e}")
+    # Copy images not already at the destination, overlapping the I/O across threads
+    already_copied = set(iter_images(pothole_dest))
+    todo = (img for img in image_files if img not in already_copied)
+    copied = copy_images(todo, existing_images, pothole_dest,
+                         total=len(image_files) - len(already_copied.intersection(image_files)))
     
-    logger.info(f"✅ Copied {copied} images to {pothole_dest}")
+    logger.info("✅ Copied %d images to %s", copied, pothole_dest)
     print(f"\n✅ Done! Pothole images ready for training.")
     print(f"📍 Location: {pothole_dest}")
-    print(f"📊 Count: {len(os.listdir(pothole_dest))} images")
+    print(f"📊 Count: {count_images(pothole_dest) or 0} images")
 
 
 def option_2_direct_use():
@@ -86,14 +170,12 @@ def option_2_direct_use():
     
     existing_images = config.EXISTING_POTHOLE_IMAGES
     
-    if not os.path.exists(existing_images):
-        logger.error(f"❌ Images not found: {existing_images}")
+    image_count = count_images(existing_images)
+    if image_count is None:
+        logger.error("❌ Images not found: %s", existing_images)
         return
     
-    image_count = len([f for f in os.listdir(existing_images) 
-                       if f.lower().endswith(('.jpg', '.jpeg', '.png'))])
-    
-    logger.info(f"Found {image_count} images at: {existing_images}")
+    logger.info("Found %d images at: %s", image_count, existing_images)
     print(f"\n📝 To use these images directly for training:")
     print(f"\nEdit config.py line ~32 and uncomment:")
     print(f"   # POTHOLE_DATA_PATH = EXISTING_POTHOLE_IMAGES")
@@ -107,26 +189,25 @@ def option_3_show_config():
     print("\n📋 Current Configuration")
     print("-" * 50)
     
+    existing = count_images(config.EXISTING_POTHOLE_IMAGES)
     print(f"\n📍 Existing Images Location:")
     print(f"   {config.EXISTING_POTHOLE_IMAGES}")
-    print(f"   Status: {'✅ EXISTS' if os.path.exists(config.EXISTING_POTHOLE_IMAGES) else '❌ NOT FOUND'}")
-    
-    if os.path.exists(config.EXISTING_POTHOLE_IMAGES):
-        count = len(os.listdir(config.EXISTING_POTHOLE_IMAGES))
-        print(f"   Images: {count} files found")
+    print(f"   Status: {'✅ EXISTS' if existing is not None else '❌ NOT FOUND'}")
+    if existing is not None:
+        print(f"   Images: {existing} files found")
     
+    pothole = count_images(config.POTHOLE_DATA_PATH)
     print(f"\n📂 Training Data Paths:")
     print(f"   Pothole: {config.POTHOLE_DATA_PATH}")
-    print(f"   Status: {'✅ EXISTS' if os.path.exists(config.POTHOLE_DATA_PATH) else '❌ NOT FOUND'}")
-    if os.path.exists(config.POTHOLE_DATA_PATH):
-        count = len(os.listdir(config.POTHOLE_DATA_PATH))
-        print(f"   Images: {count} files")
+    print(f"   Status: {'✅ EXISTS' if pothole is not None else '❌ NOT FOUND'}")
+    if pothole is not None:
+        print(f"   Images: {pothole} files")
     
+    plain = count_images(config.PLAIN_DATA_PATH)
     print(f"\n   Plain: {config.PLAIN_DATA_PATH}")
-    print(f"   Status: {'✅ EXISTS' if os.path.exists(config.PLAIN_DATA_PATH) else '❌ NOT FOUND'}")
-    if os.path.exists(config.PLAIN_DATA_PATH):
-        count = len(os.listdir(config.PLAIN_DATA_PATH))
-        print(f"   Images: {count} files")
+    print(f"   Status: {'✅ EXISTS' if plain is not None else '❌ NOT FOUND'}")
+    if plain is not None:
+        print(f"   Images: {plain} files")
 
 
 def main():
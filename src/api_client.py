@@ -5,11 +5,18 @@ Handle communication with cloud backend for detection data upload and status tra
 
 import os
 import sys
+import gzip
+import threading
+import time
 import requests
 import json
-import base64
-from datetime import datetime
-from typing import Dict, Optional, Tuple
+import mimetypes
+import uuid
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
@@ -17,6 +24,241 @@ from src.utils import setup_logger
 
 logger = setup_logger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    Histogram = None
+
+if Histogram is not None:
+    _HTTP_DURATION = Histogram('astropath_http_duration_seconds', 'Backend request latency by endpoint',
+                               ['endpoint', 'status'])
+    _HTTP_ERRORS = Counter('astropath_http_errors_total', 'Backend requests that failed without a response',
+                           ['endpoint'])
+    _CACHE_LOOKUPS = Counter('astropath_api_cache_lookups_total', 'APIClient GET cache lookups', ['result'])
+    _POOL_CONNECTIONS = Gauge('astropath_http_pool_connections', 'Pooled backend connections', ['state'])
+else:
+    _HTTP_DURATION = _HTTP_ERRORS = _CACHE_LOOKUPS = _POOL_CONNECTIONS = None
+
+
+def _create_http2_client():
+    """
+    Build an HTTP/2 httpx client that multiplexes concurrent reports over one connection
+    
+    Returns:
+        httpx.Client, or None when httpx[http2] is not installed
+    """
+    if httpx is None:
+        logger.warning("API_HTTP2 is on but httpx is not installed: pip install 'httpx[http2]'")
+        return None
+    
+    limits = httpx.Limits(max_connections=config.API_POOL_MAXSIZE,
+                          max_keepalive_connections=config.API_POOL_MAXSIZE)
+    try:
+        # httpx only retries failed connects; there is no status-code retry as with urllib3
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=config.API_MAX_RETRIES)
+    except ImportError:
+        logger.warning("API_HTTP2 is on but h2 is not installed: pip install 'httpx[http2]'")
+        return None
+    
+    # No Connection header: it is forbidden on HTTP/2 and keep-alive is implicit
+    return httpx.Client(transport=transport, headers={'User-Agent': 'astropath/1.0'})
+
+
+def _create_session():
+    """Build the keep-alive session shared by every APIClient in the process"""
+    if config.API_HTTP2:
+        client = _create_http2_client()
+        if client is not None:
+            return client
+    
+    session = requests.Session()
+    session.headers.update({'Connection': 'keep-alive', 'User-Agent': 'astropath/1.0'})
+    
+    # Reuse keep-alive connections across reports; retry dropped connects, throttling and
+    # server errors with exponential backoff. POST is retried too: a duplicate report is
+    # cheaper than a dropped one. After the last try the final response is returned, not raised.
+    retry = Retry(total=config.API_MAX_RETRIES, backoff_factor=config.API_RETRY_BACKOFF,
+                  status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=frozenset({'GET', 'HEAD', 'POST'}),
+                  raise_on_status=False, respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.API_POOL_MAXSIZE, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_SESSION = _create_session()
+
+
+def _request(session, method: str, url: str, endpoint: str, **kwargs) -> requests.Response:
+    """Send a request, recording latency by endpoint/status (and failures) when prometheus_client is installed"""
+    if _HTTP_DURATION is None:
+        return session.request(method, url, **kwargs)
+    
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, **kwargs)
+    except Exception:
+        _HTTP_ERRORS.labels(endpoint).inc()
+        raise
+    _HTTP_DURATION.labels(endpoint, str(response.status_code)).observe(time.perf_counter() - start)
+    return response
+
+
+def _post_body(session, url: str, endpoint: str, body, headers: Dict, timeout) -> requests.Response:
+    """POST a prebuilt body through either a requests session or an httpx client"""
+    if httpx is not None and isinstance(session, httpx.Client):
+        return _request(session, 'POST', url, endpoint, content=body, headers=headers, timeout=timeout)
+    return _request(session, 'POST', url, endpoint, data=body, headers=headers, timeout=timeout)
+
+
+def _pool_connection_counts() -> Dict:
+    """Open and idle connections across the shared session's urllib3 pools (requests session only)"""
+    counts = {'open': 0, 'idle': 0}
+    if not isinstance(_SESSION, requests.Session):
+        return counts
+    for adapter in set(_SESSION.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            counts['open'] += pool.num_connections
+            # The idle queue is pre-filled with None placeholders up to maxsize
+            counts['idle'] += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    return counts
+
+
+if _POOL_CONNECTIONS is not None:
+    _POOL_CONNECTIONS.labels('open').set_function(lambda: _pool_connection_counts()['open'])
+    _POOL_CONNECTIONS.labels('idle').set_function(lambda: _pool_connection_counts()['idle'])
+
+
+# (epoch second, ISO string) of the last formatted timestamp; swapped as one tuple so threads never see a torn pair
+_ts_cache = (0, "")
+
+
+def _now_iso() -> str:
+    """Local ISO-8601 timestamp at second granularity, formatted at most once per second"""
+    global _ts_cache
+    now = int(time.time())
+    cached = _ts_cache
+    if cached[0] != now:
+        cached = (now, time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)))
+        _ts_cache = cached
+    return cached[1]
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _decode_json(response: requests.Response):
+    """Decode a response body straight from its bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _encode_json_body(payload) -> Tuple[bytes, Dict]:
+    """Serialize a JSON request body, gzip-compressing it when large (base64 images)"""
+    body = _dumps(payload)
+    headers = {'Content-Type': 'application/json'}
+    if len(body) > config.API_GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=5)
+        headers['Content-Encoding'] = 'gzip'
+    return body, headers
+
+
+class _MultipartFileBody:
+    """
+    Seekable multipart/form-data body that reads the image part from disk as it is sent
+    
+    requests' files= builds the whole multipart body in memory; this keeps only the
+    small form-field header and trailer in RAM and lets http.client pull the image
+    in blocks (or iterate it, for httpx). tell()/seek() let urllib3 rewind the body
+    when it retries.
+    """
+    
+    def __init__(self, fields: Dict, image_path: str, content_type: str, field_name: str = 'image'):
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        
+        parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'
+                 for key, value in fields.items()]
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{field_name}"; '
+                     f'filename="{os.path.basename(image_path)}"\r\nContent-Type: {content_type}\r\n\r\n')
+        self._head = ''.join(parts).encode('utf-8')
+        self._tail = f'\r\n--{boundary}--\r\n'.encode('ascii')
+        
+        self._file = open(image_path, 'rb')
+        self._file_len = os.fstat(self._file.fileno()).st_size
+        self._file_end = len(self._head) + self._file_len
+        self.len = self._file_end + len(self._tail)
+        self._pos = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self._file.close()
+    
+    def __iter__(self):
+        # httpx streams iterables; requests and http.client read() the body directly
+        while True:
+            chunk = self.read(64 * 1024)
+            if not chunk:
+                return
+            yield chunk
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += self.len
+        self._pos = min(max(offset, 0), self.len)
+        self._file.seek(min(max(self._pos - len(self._head), 0), self._file_len))
+        return self._pos
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.len - self._pos
+        
+        chunks = []
+        while size > 0 and self._pos < self.len:
+            if self._pos < len(self._head):
+                chunk = self._head[self._pos:self._pos + size]
+            elif self._pos < self._file_end:
+                chunk = self._file.read(min(size, self._file_end - self._pos))
+                if not chunk:
+                    raise IOError(f"Image shrank while uploading: {self._file.name}")
+            else:
+                offset = self._pos - self._file_end
+                chunk = self._tail[offset:offset + size]
+            chunks.append(chunk)
+            self._pos += len(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
 
 class APIClient:
     """Client for communicating with ASTROPATH cloud backend"""
@@ -24,17 +266,128 @@ class APIClient:
     def __init__(self, base_url=config.API_URL, timeout=config.API_TIMEOUT):
         self.base_url = base_url
         self.timeout = timeout
-        self.session = requests.Session()
-        logger.info(f"APIClient initialized: {base_url}")
+        self.session = _SESSION
+        
+        # TTL LRU of GET responses: (path, sorted params) -> (expires_at, json)
+        self._cache = OrderedDict()
+        self._cache_lock = threading.RLock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # Misses currently being fetched: cache key -> Future shared by every caller asking for it
+        self._inflight = {}
+        self._coalesced = 0
+        logger.info("APIClient initialized: %s", base_url)
+    
+    def _post_json(self, path: str, payload: Dict) -> requests.Response:
+        """POST a JSON payload, gzip-compressing large bodies (base64 images)"""
+        body, headers = _encode_json_body(payload)
+        return _post_body(self.session, f"{self.base_url}{path}", path, body, headers, self.timeout)
+    
+    def _cached_get(self, path: str, params: Optional[Dict] = None) -> Tuple[int, object]:
+        """
+        GET a read-only endpoint through the TTL LRU cache
+        
+        Only 200 responses are cached; anything else is returned and retried next call.
+        Concurrent misses for the same key share one backend request (singleflight).
+        
+        Returns:
+            (status_code, body): body is the decoded JSON on 200, else the response text
+        """
+        cache_key = (path, tuple(sorted((params or {}).items())))
+        now = time.monotonic()
+        
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(cache_key)
+                self._cache_hits += 1
+                if _CACHE_LOOKUPS is not None:
+                    _CACHE_LOOKUPS.labels('hit').inc()
+                return 200, entry[1]
+            self._cache_misses += 1
+            
+            future = self._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = self._inflight[cache_key] = Future()
+            else:
+                self._coalesced += 1
+        if _CACHE_LOOKUPS is not None:
+            _CACHE_LOOKUPS.labels('miss').inc()
+        
+        if not leader:
+            # Another thread is already fetching this key; its request has its own timeout
+            return future.result()
+        
+        try:
+            result = self._fetch(path, params, cache_key, now)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._cache_lock:
+                del self._inflight[cache_key]
+    
+    def _fetch(self, path: str, params: Optional[Dict], cache_key, now: float) -> Tuple[int, object]:
+        """Send a cache-miss GET and store a 200 body in the cache"""
+        response = _request(self.session, 'GET', f"{self.base_url}{path}", path,
+                            params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            return response.status_code, response.text
+        
+        data = _decode_json(response)
+        with self._cache_lock:
+            self._cache[cache_key] = (now + config.API_CACHE_TTL, data)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > config.API_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return 200, data
+    
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters for the GET response cache"""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / lookups if lookups else 0.0,
+                'coalesced': self._coalesced,
+                'size': len(self._cache),
+                'max_size': config.API_CACHE_SIZE,
+                'ttl': config.API_CACHE_TTL
+            }
+    
+    def _post_multipart(self, path: str, payload: Dict, image_path: str) -> requests.Response:
+        """
+        POST scalar fields as form data with the image streamed from disk as a raw part (no base64 copy)
+        
+        A missing or unreadable image is detected by the open itself (no separate exists()
+        stat) and the report is sent as plain JSON instead.
+        """
+        fields = {key: str(value) for key, value in payload.items()}
+        content_type = mimetypes.guess_type(image_path)[0] or 'application/octet-stream'
+        
+        try:
+            body = _MultipartFileBody(fields, image_path, content_type)
+        except OSError:
+            return self._post_json(path, payload)
+        
+        with body:
+            headers = {'Content-Type': body.content_type, 'Content-Length': str(body.len)}
+            return _post_body(self.session, f"{self.base_url}{path}", path, body, headers, self.timeout)
     
     def _check_connectivity(self) -> bool:
         """Check if API is reachable"""
         try:
-            response = self.session.head(self.base_url, timeout=5)
-            logger.info(f"API connectivity check: {response.status_code}")
+            response = _request(self.session, 'HEAD', self.base_url, '/', timeout=5)
+            logger.info("API connectivity check: %s", response.status_code)
             return response.status_code < 500
         except Exception as e:
-            logger.error(f"API connectivity check failed: {e}")
+            logger.error("API connectivity check failed: %s", e)
             return False
     
     def report_detection(self, detection_data: Dict) -> Tuple[bool, Dict]:
@@ -59,7 +412,7 @@ class APIClient:
         try:
             # Prepare payload
             payload = {
-                'timestamp': detection_data.get('timestamp', datetime.now().isoformat()),
+                'timestamp': detection_data.get('timestamp') or _now_iso(),
                 'latitude': float(detection_data.get('latitude', 0)),
                 'longitude': float(detection_data.get('longitude', 0)),
                 'severity': detection_data.get('severity', 'Unknown'),
@@ -67,42 +420,56 @@ class APIClient:
                 'class': detection_data.get('class', 'pothole'),
             }
             
-            # Handle image (either file path or base64)
-            image_data = None
-            if 'image_base64' in detection_data:
-                image_data = detection_data['image_base64']
-            elif 'image_path' in detection_data and os.path.exists(detection_data['image_path']):
-                # Read and encode image as base64
-                with open(detection_data['image_path'], 'rb') as f:
-                    image_data = base64.b64encode(f.read()).decode('utf-8')
-            
-            if image_data:
-                payload['image_base64'] = image_data
-            
-            logger.debug(f"Sending detection: {payload}")
+            logger.debug("Sending detection lat=%s lon=%s severity=%s confidence=%s has_image=%s",
+                         payload['latitude'], payload['longitude'], payload['severity'],
+                         payload['confidence'],
+                         'image_base64' in detection_data or bool(detection_data.get('image_path')))
             
-            # Send request
-            response = self.session.post(
-                f"{self.base_url}/report",
-                json=payload,
-                timeout=self.timeout
-            )
+            # Send request: image files go as a multipart part, already-encoded images as JSON
+            image_path = detection_data.get('image_path')
+            if 'image_base64' in detection_data:
+                payload['image_base64'] = detection_data['image_base64']
+                response = self._post_json("/report", payload)
+            elif image_path:
+                response = self._post_multipart("/report", payload, image_path)
+            else:
+                response = self._post_json("/report", payload)
             
             # Handle response
             if response.status_code == 200 or response.status_code == 201:
-                logger.info(f"Detection reported successfully: {response.status_code}")
+                logger.info("Detection reported successfully: %s", response.status_code)
                 try:
-                    return True, response.json()
+                    return True, _decode_json(response)
                 except:
                     return True, {"status": "success"}
             else:
-                logger.warning(f"API error: {response.status_code} - {response.text}")
+                logger.warning("API error: %s - %s", response.status_code, response.text[:200])
                 return False, {"error": response.text}
         
         except Exception as e:
-            logger.error(f"Failed to report detection: {e}")
+            logger.error("Failed to report detection: %s", e)
             return False, {"error": str(e)}
     
+    def report_many(self, detections: List[Dict]) -> List[Tuple[bool, Dict]]:
+        """
+        Report several detections concurrently over the pooled session
+        
+        Uploads are network-bound, so overlapping them costs about one round trip
+        per batch instead of one per detection.
+        
+        Args:
+            detections: List of detection dicts (see report_detection)
+        
+        Returns:
+            List of (success, response_data), in input order
+        """
+        if not detections:
+            return []
+        
+        workers = min(len(detections), config.API_POOL_MAXSIZE)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.report_detection, detections))
+    
     def update_repair_status(self, detection_id: str, status: str, notes: str = "") -> Tuple[bool, Dict]:
         """
         Update repair status for a reported pothole
@@ -120,66 +487,58 @@ class APIClient:
                 'detection_id': detection_id,
                 'status': status,
                 'notes': notes,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _now_iso()
             }
             
-            logger.info(f"Updating repair status: {detection_id} -> {status}")
+            logger.info("Updating repair status: %s -> %s", detection_id, status)
             
-            response = self.session.post(
-                f"{self.base_url}/update-status",
-                json=payload,
-                timeout=self.timeout
-            )
+            response = self._post_json("/update-status", payload)
             
             if response.status_code == 200:
-                logger.info(f"Status updated: {status}")
-                return True, response.json()
+                logger.info("Status updated: %s", status)
+                return True, _decode_json(response)
             else:
-                logger.warning(f"Status update failed: {response.status_code}")
+                logger.warning("Status update failed: %s", response.status_code)
                 return False, {"error": response.text}
         
         except Exception as e:
-            logger.error(f"Failed to update status: {e}")
+            logger.error("Failed to update status: %s", e)
             return False, {"error": str(e)}
     
     def get_detection_by_id(self, detection_id: str) -> Tuple[bool, Dict]:
         """Retrieve detection details from API"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/detection/{detection_id}",
+            response = _request(
+                self.session, 'GET', f"{self.base_url}/detection/{detection_id}", '/detection',
                 timeout=self.timeout
             )
             
             if response.status_code == 200:
-                logger.info(f"Retrieved detection: {detection_id}")
-                return True, response.json()
+                logger.info("Retrieved detection: %s", detection_id)
+                return True, _decode_json(response)
             else:
-                logger.warning(f"Failed to retrieve detection: {response.status_code}")
+                logger.warning("Failed to retrieve detection: %s", response.status_code)
                 return False, {"error": response.text}
         
         except Exception as e:
-            logger.error(f"Failed to get detection: {e}")
+            logger.error("Failed to get detection: %s", e)
             return False, {"error": str(e)}
     
     def get_recent_detections(self, limit: int = 50, offset: int = 0) -> Tuple[bool, Dict]:
         """Get recent detections from API"""
         try:
             params = {'limit': limit, 'offset': offset}
-            response = self.session.get(
-                f"{self.base_url}/detections",
-                params=params,
-                timeout=self.timeout
-            )
+            status_code, data = self._cached_get("/detections", params)
             
-            if response.status_code == 200:
-                logger.info(f"Retrieved {limit} detections")
-                return True, response.json()
+            if status_code == 200:
+                logger.info("Retrieved %s detections", limit)
+                return True, data
             else:
-                logger.warning(f"Failed to retrieve detections: {response.status_code}")
-                return False, {"error": response.text}
+                logger.warning("Failed to retrieve detections: %s", status_code)
+                return False, {"error": data}
         
         except Exception as e:
-            logger.error(f"Failed to get detections: {e}")
+            logger.error("Failed to get detections: %s", e)
             return False, {"error": str(e)}
     
     def get_heatmap_data(self, bounds: Optional[Dict] = None) -> Tuple[bool, Dict]:
@@ -194,21 +553,17 @@ class APIClient:
         """
         try:
             params = bounds or {}
-            response = self.session.get(
-                f"{self.base_url}/heatmap",
-                params=params,
-                timeout=self.timeout
-            )
+            status_code, data = self._cached_get("/heatmap", params)
             
-            if response.status_code == 200:
+            if status_code == 200:
                 logger.info("Retrieved heatmap data")
-                return True, response.json()
+                return True, data
             else:
-                logger.warning(f"Failed to retrieve heatmap: {response.status_code}")
-                return False, {"error": response.text}
+                logger.warning("Failed to retrieve heatmap: %s", status_code)
+                return False, {"error": data}
         
         except Exception as e:
-            logger.error(f"Failed to get heatmap: {e}")
+            logger.error("Failed to get heatmap: %s", e)
             return False, {"error": str(e)}
     
     def request_drone_inspection(self, latitude: float, longitude: float, priority: str = "medium") -> Tuple[bool, Dict]:
@@ -228,30 +583,54 @@ class APIClient:
                 'latitude': latitude,
                 'longitude': longitude,
                 'priority': priority,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _now_iso()
             }
             
-            logger.info(f"Requesting drone inspection at ({latitude}, {longitude})")
+            logger.info("Requesting drone inspection at (%s, %s)", latitude, longitude)
             
-            response = self.session.post(
-                f"{self.base_url}/request-drone",
-                json=payload,
-                timeout=self.timeout
-            )
+            response = self._post_json("/request-drone", payload)
             
             if response.status_code == 200 or response.status_code == 201:
                 logger.info("Drone inspection requested")
-                return True, response.json()
+                return True, _decode_json(response)
             else:
-                logger.warning(f"Drone request failed: {response.status_code}")
+                logger.warning("Drone request failed: %s", response.status_code)
                 return False, {"error": response.text}
         
         except Exception as e:
-            logger.error(f"Failed to request drone: {e}")
+            logger.error("Failed to request drone: %s", e)
+            return False, {"error": str(e)}
+    
+    def get_upload_url(self, content_type: str = "image/jpeg") -> Tuple[bool, Dict]:
+        """
+        Ask the backend for a pre-signed object-storage PUT URL for one image
+        
+        Args:
+            content_type: MIME type the client will upload
+        
+        Returns:
+            (success: bool, {'url': str, 'object_key': str})
+        """
+        try:
+            response = _request(
+                self.session, 'GET', f"{self.base_url}/upload-url", '/upload-url',
+                params={'content_type': content_type},
+                timeout=self.timeout
+            )
+            
+            if response.status_code == 200:
+                return True, _decode_json(response)
+            else:
+                logger.warning("Upload URL request failed: %s", response.status_code)
+                return False, {"error": response.text}
+        
+        except Exception as e:
+            logger.error("Failed to get upload URL: %s", e)
             return False, {"error": str(e)}
     
     def submit_citizen_report(self, latitude: float, longitude: float, 
-                             description: str = "", image_path: str = "") -> Tuple[bool, Dict]:
+                             description: str = "", image_path: str = "",
+                             object_key: str = "") -> Tuple[bool, Dict]:
         """
         Submit a citizen report via the API
         
@@ -260,6 +639,7 @@ class APIClient:
             longitude: Report location longitude
             description: Description of the issue
             image_path: Path to citizen-submitted image
+            object_key: Key of an image already PUT to object storage (see get_upload_url)
         
         Returns:
             (success: bool, report_data: dict)
@@ -269,52 +649,124 @@ class APIClient:
                 'latitude': latitude,
                 'longitude': longitude,
                 'description': description,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'source': 'citizen_app'
             }
             
-            # Add image if provided
-            if image_path and os.path.exists(image_path):
-                with open(image_path, 'rb') as f:
-                    payload['image_base64'] = base64.b64encode(f.read()).decode('utf-8')
-            
-            logger.info(f"Submitting citizen report at ({latitude}, {longitude})")
+            logger.info("Submitting citizen report at (%s, %s)", latitude, longitude)
             
-            response = self.session.post(
-                f"{self.base_url}/citizen-report",
-                json=payload,
-                timeout=self.timeout
-            )
+            # Photo already in object storage: only its key travels with the metadata
+            if object_key:
+                payload['object_key'] = object_key
+                response = self._post_json("/citizen-report", payload)
+            # Stream the photo as a multipart part rather than base64 inside the JSON
+            elif image_path:
+                response = self._post_multipart("/citizen-report", payload, image_path)
+            else:
+                response = self._post_json("/citizen-report", payload)
             
             if response.status_code == 200 or response.status_code == 201:
                 logger.info("Citizen report submitted")
-                return True, response.json()
+                return True, _decode_json(response)
             else:
-                logger.warning(f"Report submission failed: {response.status_code}")
+                logger.warning("Report submission failed: %s", response.status_code)
                 return False, {"error": response.text}
         
         except Exception as e:
-            logger.error(f"Failed to submit citizen report: {e}")
+            logger.error("Failed to submit citizen report: %s", e)
             return False, {"error": str(e)}
     
     def get_api_status(self) -> Tuple[bool, Dict]:
         """Check API status"""
         try:
-            response = self.session.get(
-                f"{self.base_url}/status",
+            response = _request(
+                self.session, 'GET', f"{self.base_url}/status", '/status',
                 timeout=self.timeout
             )
             
             if response.status_code == 200:
-                return True, response.json()
+                return True, _decode_json(response)
             else:
                 return False, {"error": "API unavailable"}
         
         except Exception as e:
-            logger.error(f"API status check failed: {e}")
+            logger.error("API status check failed: %s", e)
             return False, {"error": str(e)}
 
 
+class BatchedReporter:
+    """
+    Queue detections and send them in batches on a background thread
+    
+    submit() never blocks the caller on the network. A batch is POSTed as
+    {'detections': [...]} when it reaches API_BATCH_MAX_ITEMS items or
+    API_BATCH_MAX_BYTES of JSON, or API_BATCH_INTERVAL seconds after its first item.
+    """
+    
+    def __init__(self, url=config.API_BATCH_URL, timeout=config.API_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="BatchedReporter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, detection: Dict):
+        """Queue one detection payload for the next batch"""
+        with self._cond:
+            self._queue.append(detection)
+            # The first item wakes the sender so its API_BATCH_INTERVAL timer starts;
+            # a full batch wakes it again to send without waiting out the interval
+            if len(self._queue) == 1 or len(self._queue) >= config.API_BATCH_MAX_ITEMS:
+                self._cond.notify()
+    
+    def close(self):
+        """Send whatever is queued and stop the sender thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+    
+    def _next_batch(self) -> List[Dict]:
+        """Pop detections until the item or byte limit is reached"""
+        batch, size = [], 0
+        while self._queue and len(batch) < config.API_BATCH_MAX_ITEMS:
+            item_size = len(_dumps(self._queue[0]))
+            if batch and size + item_size > config.API_BATCH_MAX_BYTES:
+                break
+            batch.append(self._queue.popleft())
+            size += item_size
+        return batch
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._closed and len(self._queue) < config.API_BATCH_MAX_ITEMS:
+                    # Give the batch time to fill before sending
+                    self._cond.wait(config.API_BATCH_INTERVAL)
+                batch = self._next_batch()
+                done = self._closed and not self._queue
+            
+            if batch:
+                self._send(batch)
+            if done:
+                return
+    
+    def _send(self, batch: List[Dict]):
+        try:
+            body, headers = _encode_json_body({'detections': batch})
+            response = _post_body(_SESSION, self.url, 'batch', body, headers, self.timeout)
+            if response.status_code in (200, 201):
+                logger.info("Reported batch of %s detections", len(batch))
+            else:
+                logger.warning("Batch report failed: %s - %s", response.status_code, response.text[:200])
+        except Exception as e:
+            logger.error("Failed to report batch of %s detections: %s", len(batch), e)
+
+
 def test_api():
     """Test API connectivity and basic operations"""
     logger.info("="*60)
@@ -331,9 +783,9 @@ def test_api():
     # Check API status
     success, data = client.get_api_status()
     if success:
-        logger.info(f"API Status: {data}")
+        logger.info("API Status: %s", data)
     else:
-        logger.warning(f"Could not get API status: {data}")
+        logger.warning("Could not get API status: %s", data)
     
     # Test detection report (mock data)
     test_detection = {
@@ -343,12 +795,12 @@ def test_api():
         'confidence': 0.87,
         'class': 'pothole',
         'image_path': '',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': _now_iso()
     }
     
-    logger.info(f"Sending test detection: {test_detection}")
+    logger.info("Sending test detection: %s", test_detection)
     success, response = client.report_detection(test_detection)
-    logger.info(f"Response: {response}")
+    logger.info("Response: %s", response)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""ASTROPATH battery monitoring"""
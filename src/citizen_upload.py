@@ -6,176 +6,52 @@ Flask-based web app for citizen reporting with image upload and geolocation
 import os
 import sys
 import json
+import hashlib
+import itertools
+import re
+import time
+import uuid
+import logging
+import threading
+from urllib.parse import quote
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import wraps
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-from src.utils import setup_logger, ensure_dir_exists, get_timestamp
+from src.utils import setup_logger, ensure_dir_exists
 from src.api_client import APIClient
 
 logger = setup_logger(__name__)
 
 try:
-    from flask import Flask, render_template, request, jsonify, send_from_directory
-    from werkzeug.utils import secure_filename
+    from flask import Flask, Response, render_template, request, jsonify, send_from_directory
+    from werkzeug.security import safe_join
     import logging as flask_logging
+    from src.json_provider import use_orjson
     
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
     logger.warning("Flask not installed. Install with: pip install flask")
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class CitizenReportingApp:
-    """Flask web app for citizen pothole reporting"""
-    
-    def __init__(self, host=config.FLASK_HOST, port=config.FLASK_PORT, debug=config.FLASK_DEBUG):
-        if not FLASK_AVAILABLE:
-            raise RuntimeError("Flask not installed")
-        
-        self.app = Flask(__name__)
-        self.app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE
-        self.app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
-        
-        ensure_dir_exists(config.UPLOAD_FOLDER)
-        
-        self.host = host
-        self.port = port
-        self.debug = debug
-        self.api_client = APIClient()
-        
-        # Setup logging
-        if not debug:
-            flask_logging.getLogger('werkzeug').setLevel(flask_logging.ERROR)
-        
-        self._register_routes()
-        logger.info(f"CitizenReportingApp initialized: {host}:{port}")
-    
-    def _register_routes(self):
-        """Register Flask routes"""
-        
-        @self.app.route('/')
-        def index():
-            """Home page - serve HTML form"""
-            return self._render_html()
-        
-        @self.app.route('/api/report', methods=['POST'])
-        def submit_report():
-            """API endpoint for citizen report submission"""
-            try:
-                # Get form data
-                latitude = request.form.get('latitude', '0')
-                longitude = request.form.get('longitude', '0')
-                description = request.form.get('description', '')
-                
-                # Parse coordinates
-                try:
-                    latitude = float(latitude)
-                    longitude = float(longitude)
-                except ValueError:
-                    return jsonify({'error': 'Invalid coordinates'}), 400
-                
-                # Handle file upload
-                image_path = None
-                if 'image' in request.files:
-                    file = request.files['image']
-                    if file.filename:
-                        filename = secure_filename(f"{get_timestamp()}_{file.filename}")
-                        file_path = os.path.join(self.app.config['UPLOAD_FOLDER'], filename)
-                        file.save(file_path)
-                        image_path = file_path
-                        logger.info(f"Image saved: {file_path}")
-                
-                # Submit to API
-                success, response = self.api_client.submit_citizen_report(
-                    latitude=latitude,
-                    longitude=longitude,
-                    description=description,
-                    image_path=image_path or ''
-                )
-                
-                if success:
-                    logger.info(f"Citizen report submitted: ({latitude}, {longitude})")
-                    return jsonify({
-                        'success': True,
-                        'message': 'Report submitted successfully',
-                        'data': response
-                    }), 200
-                else:
-                    logger.warning(f"Report submission failed: {response}")
-                    return jsonify({
-                        'success': False,
-                        'message': 'Failed to submit report',
-                        'error': response.get('error', 'Unknown error')
-                    }), 500
-            
-            except Exception as e:
-                logger.error(f"Error in report submission: {e}")
-                return jsonify({
-                    'success': False,
-                    'message': str(e)
-                }), 500
-        
-        @self.app.route('/api/reports', methods=['GET'])
-        def get_reports():
-            """Get recent reports"""
-            try:
-                limit = request.args.get('limit', 50, type=int)
-                offset = request.args.get('offset', 0, type=int)
-                
-                success, data = self.api_client.get_recent_detections(limit, offset)
-                
-                if success:
-                    return jsonify({'success': True, 'data': data}), 200
-                else:
-                    return jsonify({'success': False, 'error': data.get('error')}), 500
-            
-            except Exception as e:
-                logger.error(f"Error fetching reports: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
-        
-        @self.app.route('/api/heatmap', methods=['GET'])
-        def get_heatmap():
-            """Get heatmap data for map visualization"""
-            try:
-                north = request.args.get('north', type=float)
-                south = request.args.get('south', type=float)
-                east = request.args.get('east', type=float)
-                west = request.args.get('west', type=float)
-                
-                bounds = None
-                if all([north, south, east, west]):
-                    bounds = {'north': north, 'south': south, 'east': east, 'west': west}
-                
-                success, data = self.api_client.get_heatmap_data(bounds)
-                
-                if success:
-                    return jsonify({'success': True, 'data': data}), 200
-                else:
-                    return jsonify({'success': False, 'error': data.get('error')}), 500
-            
-            except Exception as e:
-                logger.error(f"Error fetching heatmap: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
-        
-        @self.app.route('/uploads/<filename>', methods=['GET'])
-        def download_file(filename):
-            """Serve uploaded files"""
-            try:
-                return send_from_directory(self.app.config['UPLOAD_FOLDER'], filename)
-            except:
-                return jsonify({'error': 'File not found'}), 404
-        
-        @self.app.route('/api/status', methods=['GET'])
-        def api_status():
-            """Check API status"""
-            success, data = self.api_client.get_api_status()
-            return jsonify({'success': success, 'data': data}), 200 if success else 500
-    
-    def _render_html(self):
-        """Render HTML form for citizen reporting"""
-        html = """
+
+def _format_payload(payload):
+    """Pretty-print a report payload for debug logs (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(payload, indent=2)
+
+
+# Reporting page, encoded and hashed once at import instead of rebuilt per request
+_INDEX_HTML_BYTES = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -406,6 +282,7 @@ class CitizenReportingApp:
         const alert = document.getElementById('alert');
         const loading = document.getElementById('loading');
         const getLocationBtn = document.getElementById('getLocationBtn');
+        const DIRECT_UPLOAD = __DIRECT_UPLOAD__;
         
         // Get user location
         getLocationBtn.addEventListener('click', function() {
@@ -441,6 +318,13 @@ class CitizenReportingApp:
             loading.classList.add('show');
             
             try {
+                // Send the photo straight to object storage; only its key goes to /api/report
+                const image = formData.get('image');
+                if (DIRECT_UPLOAD && image && image.size) {
+                    formData.set('object_key', await uploadDirect(image));
+                    formData.delete('image');
+                }
+                
                 const response = await fetch('/api/report', {
                     method: 'POST',
                     body: formData
@@ -462,6 +346,25 @@ class CitizenReportingApp:
             }
         });
         
+        async function uploadDirect(file) {
+            const type = file.type || 'application/octet-stream';
+            const response = await fetch('/api/upload-url?content_type=' + encodeURIComponent(type));
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error || 'No upload URL');
+            }
+            
+            const put = await fetch(result.data.url, {
+                method: 'PUT',
+                headers: {'Content-Type': type},
+                body: file
+            });
+            if (!put.ok) {
+                throw new Error('Photo upload failed (' + put.status + ')');
+            }
+            return result.data.object_key;
+        }
+        
         function showAlert(message, type) {
             alert.textContent = message;
             alert.className = 'alert ' + type;
@@ -472,13 +375,349 @@ class CitizenReportingApp:
     </script>
 </body>
 </html>
+        """.replace('__DIRECT_UPLOAD__', 'true' if config.CITIZEN_DIRECT_UPLOAD else 'false').encode('utf-8')
+_INDEX_ETAG = hashlib.sha1(_INDEX_HTML_BYTES).hexdigest()
+
+
+# Anything outside this set (path separators, spaces, non-ASCII) becomes '_'
+_UNSAFE_FILENAME_RE = re.compile(r'[^A-Za-z0-9._-]', re.ASCII)
+_upload_seq = itertools.count().__next__
+
+
+def _upload_filename(original):
+    """
+    Unique, filesystem-safe name for an uploaded image
+    
+    A millisecond stamp plus a process-wide counter keeps names unique under parallel
+    uploads; the name always starts with a digit, so no dotfiles or reserved names.
+    The tail of the original name is kept so its extension survives truncation.
+    """
+    safe = _UNSAFE_FILENAME_RE.sub('_', original[-100:])
+    return f"{int(time.time() * 1000)}_{_upload_seq()}_{safe}"
+
+
+_BOUND_KEYS = ('north', 'south', 'east', 'west')
+
+
+def _parse_bounds(args):
+    """
+    Validate heatmap map bounds from query args
+    
+    Returns:
+        (bounds, error): bounds is None when no bound is given (whole map); error is a
+        message for a 400 when bounds are partial, non-numeric or out of range
+    """
+    raw = [args.get(key) for key in _BOUND_KEYS]
+    if all(value is None for value in raw):
+        return None, None
+    if any(value is None for value in raw):
+        return None, 'Bounds need all of north, south, east, west'
+    
+    try:
+        north, south, east, west = map(float, raw)
+    except ValueError:
+        return None, 'Bounds must be numbers'
+    
+    # 0.0 is a valid bound (equator / prime meridian), so compare ranges rather than truthiness
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return None, 'Bounds out of range'
+    return {'north': north, 'south': south, 'east': east, 'west': west}, None
+
+
+def _too_large():
+    """413 response for uploads over MAX_FILE_SIZE"""
+    return jsonify({
+        'success': False,
+        'error': f'Upload exceeds {config.MAX_FILE_SIZE // (1024 * 1024)} MB limit'
+    }), 413
+
+
+class CitizenReportingApp:
+    """Flask web app for citizen pothole reporting"""
+    
+    def __init__(self, host=config.FLASK_HOST, port=config.FLASK_PORT, debug=config.FLASK_DEBUG):
+        if not FLASK_AVAILABLE:
+            raise RuntimeError("Flask not installed")
+        
+        self.app = Flask(__name__)
+        use_orjson(self.app)
+        self.app.config['MAX_CONTENT_LENGTH'] = config.MAX_FILE_SIZE
+        self.app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
+        self.app.use_x_sendfile = config.CITIZEN_USE_X_SENDFILE
+        
+        ensure_dir_exists(config.UPLOAD_FOLDER)
+        
+        self.host = host
+        self.port = port
+        self.debug = debug
+        self.api_client = APIClient()
+        
+        # Uploads are saved and forwarded off the request thread; job_id -> Future
+        self._pool = ThreadPoolExecutor(max_workers=config.CITIZEN_UPLOAD_WORKERS,
+                                        thread_name_prefix="citizen-upload")
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        
+        # Setup logging
+        if not debug:
+            flask_logging.getLogger('werkzeug').setLevel(flask_logging.ERROR)
+        
+        self._register_routes()
+        logger.info("CitizenReportingApp initialized: %s:%s", host, port)
+    
+    def _register_routes(self):
+        """Register Flask routes"""
+        
+        @self.app.route('/')
+        def index():
+            """Home page - serve HTML form"""
+            return self._render_html()
+        
+        @self.app.route('/api/report', methods=['POST'])
+        def submit_report():
+            """API endpoint for citizen report submission"""
+            # Refuse oversized bodies from the header, before parsing the form or touching disk
+            if request.content_length is not None and request.content_length > config.MAX_FILE_SIZE:
+                return _too_large()
+            
+            try:
+                # Get form data
+                latitude = request.form.get('latitude', '0')
+                longitude = request.form.get('longitude', '0')
+                description = request.form.get('description', '')
+                object_key = request.form.get('object_key', '')
+                
+                # Parse coordinates
+                try:
+                    latitude = float(latitude)
+                    longitude = float(longitude)
+                except ValueError:
+                    return jsonify({'error': 'Invalid coordinates'}), 400
+                
+                # Read the upload now: the request stream is gone once we return
+                image_data = None
+                image_path = None
+                if not object_key and 'image' in request.files:
+                    file = request.files['image']
+                    if file.filename:
+                        filename = _upload_filename(file.filename)
+                        image_path = os.path.join(self.app.config['UPLOAD_FOLDER'], filename)
+                        # Bounded read: a body without Content-Length can't buffer more than the limit
+                        image_data = file.stream.read(config.MAX_FILE_SIZE + 1)
+                        if len(image_data) > config.MAX_FILE_SIZE:
+                            return _too_large()
+                
+                # Serializing the full payload is only worth it when DEBUG is on
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Report payload:\n%s", _format_payload({
+                        'latitude': latitude,
+                        'longitude': longitude,
+                        'description': description,
+                        'image_path': image_path,
+                        'object_key': object_key,
+                    }))
+                
+                job_id = self._submit_job(image_data, image_path, latitude, longitude, description, object_key)
+                return jsonify({
+                    'success': True,
+                    'accepted': True,
+                    'job_id': job_id,
+                    'message': 'Report received'
+                }), 202
+            
+            except Exception as e:
+                logger.error("Error in report submission: %s", e)
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 500
+        
+        @self.app.errorhandler(413)
+        def request_too_large(e):
+            """MAX_CONTENT_LENGTH rejections get the same JSON body as the report route"""
+            return _too_large()
+        
+        @self.app.route('/api/report/<job_id>', methods=['GET'])
+        def report_status(job_id):
+            """Status of a report accepted by /api/report"""
+            with self._jobs_lock:
+                future = self._jobs.get(job_id)
+            
+            if future is None:
+                return jsonify({'success': False, 'error': 'Unknown job'}), 404
+            if not future.done():
+                return jsonify({'success': True, 'status': 'pending'}), 200
+            
+            try:
+                success, response = future.result()
+            except Exception as e:
+                success, response = False, {'error': str(e)}
+            
+            return jsonify({
+                'success': success,
+                'status': 'submitted' if success else 'failed',
+                'data': response
+            }), 200
+        
+        @self.app.route('/api/upload-url', methods=['GET'])
+        def upload_url():
+            """Pre-signed object-storage PUT URL for a direct browser upload"""
+            if not config.CITIZEN_DIRECT_UPLOAD:
+                return jsonify({'success': False, 'error': 'Direct upload disabled'}), 404
+            
+            content_type = request.args.get('content_type', 'image/jpeg')
+            success, data = self.api_client.get_upload_url(content_type)
+            if success:
+                return jsonify({'success': True, 'data': data}), 200
+            else:
+                return jsonify({'success': False, 'error': data.get('error')}), 502
+        
+        @self.app.route('/api/reports', methods=['GET'])
+        def get_reports():
+            """Get recent reports"""
+            try:
+                limit = request.args.get('limit', 50, type=int)
+                offset = request.args.get('offset', 0, type=int)
+                
+                success, data = self.api_client.get_recent_detections(limit, offset)
+                
+                if success:
+                    return jsonify({'success': True, 'data': data}), 200
+                else:
+                    return jsonify({'success': False, 'error': data.get('error')}), 500
+            
+            except Exception as e:
+                logger.error("Error fetching reports: %s", e)
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
+        @self.app.route('/api/heatmap', methods=['GET'])
+        def get_heatmap():
+            """Get heatmap data for map visualization"""
+            try:
+                bounds, error = _parse_bounds(request.args)
+                if error:
+                    return jsonify({'success': False, 'error': error}), 400
+                
+                success, data = self.api_client.get_heatmap_data(bounds)
+                
+                if success:
+                    return jsonify({'success': True, 'data': data}), 200
+                else:
+                    return jsonify({'success': False, 'error': data.get('error')}), 500
+            
+            except Exception as e:
+                logger.error("Error fetching heatmap: %s", e)
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
+        @self.app.route('/uploads/<filename>', methods=['GET'])
+        def download_file(filename):
+            """Serve uploaded files (handed to the front server when X-Sendfile/X-Accel is configured)"""
+            try:
+                if config.CITIZEN_UPLOAD_X_ACCEL:
+                    return self._x_accel_response(filename)
+                # conditional: If-None-Match / If-Modified-Since get a bodiless 304
+                return send_from_directory(self.app.config['UPLOAD_FOLDER'], filename,
+                                           conditional=True, max_age=config.CITIZEN_UPLOAD_MAX_AGE)
+            except:
+                return jsonify({'error': 'File not found'}), 404
+        
+        @self.app.route('/api/status', methods=['GET'])
+        def api_status():
+            """Check API status"""
+            success, data = self.api_client.get_api_status()
+            return jsonify({'success': success, 'data': data}), 200 if success else 500
+        
+        @self.app.route('/metrics', methods=['GET'])
+        def metrics():
+            """Prometheus scrape endpoint (backend latency, cache and pool metrics)"""
+            try:
+                from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+            except ImportError:
+                return jsonify({'error': 'prometheus_client not installed'}), 404
+            return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+        
+        @self.app.route('/api/cache_stats', methods=['GET'])
+        def cache_stats():
+            """Hit/miss counters for cached report and heatmap lookups"""
+            return jsonify({'success': True, 'data': self.api_client.cache_stats()}), 200
+    
+    def _submit_job(self, image_data, image_path, latitude, longitude, description, object_key=''):
+        """Queue a report for the upload pool and return its job id"""
+        job_id = uuid.uuid4().hex
+        future = self._pool.submit(self._persist_and_forward, image_data, image_path,
+                                   latitude, longitude, description, object_key)
+        
+        with self._jobs_lock:
+            self._jobs[job_id] = future
+            # Forget the oldest finished jobs; pending ones are never dropped
+            while len(self._jobs) > config.CITIZEN_JOB_HISTORY:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.done():
+                    break
+                del self._jobs[oldest_id]
+        
+        return job_id
+    
+    def _persist_and_forward(self, image_data, image_path, latitude, longitude, description, object_key=''):
+        """
+        Save the uploaded image and submit the report to the backend (upload pool thread)
+        
+        Returns:
+            (success: bool, response: dict) from APIClient.submit_citizen_report
         """
-        return html
+        if image_data is not None:
+            with open(image_path, 'wb') as f:
+                f.write(image_data)
+            logger.info("Image saved: %s", image_path)
+        
+        success, response = self.api_client.submit_citizen_report(
+            latitude=latitude,
+            longitude=longitude,
+            description=description,
+            image_path=image_path or '',
+            object_key=object_key
+        )
+        
+        if success:
+            logger.info("Citizen report submitted: (%s, %s)", latitude, longitude)
+        else:
+            logger.warning("Report submission failed: %s", response)
+        return success, response
+    
+    def _x_accel_response(self, filename):
+        """Empty response telling Nginx to send the upload itself via sendfile()"""
+        path = safe_join(self.app.config['UPLOAD_FOLDER'], filename)
+        if path is None or not os.path.isfile(path):
+            return jsonify({'error': 'File not found'}), 404
+        
+        return Response(headers={
+            'X-Accel-Redirect': config.CITIZEN_UPLOAD_X_ACCEL + quote(filename),
+            'Cache-Control': f'public, max-age={config.CITIZEN_UPLOAD_MAX_AGE}'
+        })
+    
+    def _render_html(self):
+        """Serve the prebuilt reporting page, answering 304 when the browser's copy is current"""
+        response = Response(_INDEX_HTML_BYTES, mimetype='text/html',
+                            headers={'Cache-Control': 'public, max-age=3600'})
+        response.set_etag(_INDEX_ETAG)
+        return response.make_conditional(request)
     
     def run(self):
         """Start the Flask app"""
-        logger.info(f"Starting ASTROPATH Citizen Reporting App on {self.host}:{self.port}")
-        self.app.run(host=self.host, port=self.port, debug=self.debug)
+        logger.info("Starting ASTROPATH Citizen Reporting App on %s:%s", self.host, self.port)
+        
+        if not self.debug:
+            try:
+                from waitress import serve
+                serve(self.app, host=self.host, port=self.port,
+                      threads=config.CITIZEN_SERVER_THREADS,
+                      connection_limit=config.CITIZEN_SERVER_BACKLOG,
+                      backlog=config.CITIZEN_SERVER_BACKLOG)
+                return
+            except ImportError:
+                logger.warning("waitress not installed, falling back to Flask dev server: pip install waitress")
+        
+        self.app.run(host=self.host, port=self.port, debug=self.debug, threaded=True)
 
 
 def main():
@@ -9,17 +9,97 @@ import sys
 import logging
 from datetime import datetime, timedelta
 from functools import wraps
+from typing import List, Optional, Union
 
 from flask import Flask, render_template, jsonify, request, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
 from src.utils import setup_logger
 from src.database import DetectionDatabase
+from src.json_provider import use_orjson
 
 logger = setup_logger(__name__)
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+REQUIRED_DETECTION_FIELDS = ['timestamp', 'latitude', 'longitude', 'severity', 'confidence']
+
+if msgspec is not None:
+    class DetectionIn(msgspec.Struct):
+        """POST /api/detections item, validated and coerced in one native decode"""
+        timestamp: str
+        latitude: float
+        longitude: float
+        severity: str
+        confidence: float
+        class_name: str = 'pothole'
+        image_path: Optional[str] = None
+        image_base64: Optional[str] = None
+        camera_source: Optional[str] = None
+        gps_quality: Optional[int] = 0
+    
+    _DETECTION_DECODER = msgspec.json.Decoder(Union[DetectionIn, List[DetectionIn]])
+else:
+    _DETECTION_DECODER = None
+
+# Heatmap/statistics are cached server-side too; let browsers skip a poll or two
+AGGREGATE_CACHE_CONTROL = 'private, max-age=15'
+
+# /api/health body, pre-encoded around the timestamp (see _health_shortcut)
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","service":"ASTROPATH Dashboard","version":"1.0"}'
+
+
+def _health_shortcut(inner):
+    """
+    Wrap a WSGI app so GET /api/health is answered before Flask dispatch
+    
+    Load balancers poll the health check every few seconds; this skips routing, CORS
+    and JSON encoding for it. The Flask route stays registered for other methods.
+    """
+    def app(environ, start_response):
+        if environ.get('PATH_INFO') == '/api/health' and environ.get('REQUEST_METHOD') == 'GET':
+            body = _HEALTH_PREFIX + datetime.now().isoformat().encode() + _HEALTH_SUFFIX
+            start_response('200 OK', [('Content-Type', 'application/json'),
+                                      ('Content-Length', str(len(body))),
+                                      ('Access-Control-Allow-Origin', '*')])
+            return [body]
+        return inner(environ, start_response)
+    return app
+
+
+def api_error_handler(fn):
+    """
+    Turn exceptions escaping an API route into JSON errors
+    
+    ValueError is a client mistake (400, message passed through); anything else is logged
+    with its traceback and answered 500 without leaking internals. HTTPExceptions (e.g. a
+    malformed JSON body) keep Flask's own status.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except Exception:
+            logger.exception(f"Error in {fn.__name__}")
+            return jsonify({'status': 'error', 'message': 'Internal server error'}), 500
+    return wrapper
+
 
 class DashboardServer:
     """Flask-based dashboard for pothole detection tracking"""
@@ -48,11 +128,21 @@ class DashboardServer:
                         template_folder=template_dir,
                         static_folder=static_dir)
         self.app.config['DEBUG'] = config.FLASK_DEBUG
-        self.app.config['JSON_SORT_KEYS'] = False
+        # jsonify encodes with orjson (keys kept in insertion order, numpy values allowed)
+        use_orjson(self.app)
         
         # Enable CORS
         CORS(self.app)
         
+        # Detection lists and heatmap arrays are mostly repeated keys and timestamps
+        if Compress is not None:
+            self.app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+            self.app.config['COMPRESS_MIN_SIZE'] = 1024
+            self.app.config['COMPRESS_LEVEL'] = 4  # gzip
+            self.app.config['COMPRESS_BR_LEVEL'] = 4
+            Compress(self.app)
+        self.app.wsgi_app = _health_shortcut(self.app.wsgi_app)
+        
         # Setup routes
         self._setup_routes()
         
@@ -67,149 +157,129 @@ class DashboardServer:
             return render_template('dashboard.html')
         
         @self.app.route('/api/detections', methods=['GET'])
+        @api_error_handler
         def get_detections():
             """Get all detections or filtered by parameters"""
-            try:
-                limit = request.args.get('limit', 100, type=int)
-                severity = request.args.get('severity', None)
-                hours = request.args.get('hours', None, type=int)
-                
-                if severity:
-                    detections = self.db.get_detections_by_severity(severity, limit)
-                elif hours:
-                    detections = self.db.get_recent_detections(hours, limit)
-                else:
-                    detections = self.db.get_all_detections(limit)
-                
-                return jsonify({
-                    'status': 'success',
-                    'count': len(detections),
-                    'detections': detections
-                })
-            except Exception as e:
-                logger.error(f"Error fetching detections: {e}")
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            limit = request.args.get('limit', 100, type=int)
+            severity = request.args.get('severity', None)
+            hours = request.args.get('hours', None, type=int)
+            
+            if severity:
+                detections = self.db.get_detections_by_severity(severity, limit)
+            elif hours:
+                detections = self.db.get_recent_detections(hours, limit)
+            else:
+                detections = self.db.get_all_detections(limit)
+            
+            return jsonify({
+                'status': 'success',
+                'count': len(detections),
+                'detections': detections
+            })
         
         @self.app.route('/api/detections/<int:detection_id>', methods=['GET'])
+        @api_error_handler
         def get_detection(detection_id):
             """Get specific detection details"""
-            try:
-                detection = self.db.get_detection(detection_id)
-                if detection:
-                    return jsonify({
-                        'status': 'success',
-                        'detection': detection
-                    })
-                else:
-                    return jsonify({'status': 'error', 'message': 'Detection not found'}), 404
-            except Exception as e:
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            detection = self.db.get_detection(detection_id)
+            if detection:
+                return jsonify({
+                    'status': 'success',
+                    'detection': detection
+                })
+            else:
+                return jsonify({'status': 'error', 'message': 'Detection not found'}), 404
         
         @self.app.route('/api/detections/area', methods=['GET'])
+        @api_error_handler
         def get_detections_by_area():
             """Get detections within geographic area"""
-            try:
-                lat_min = request.args.get('lat_min', type=float)
-                lat_max = request.args.get('lat_max', type=float)
-                lon_min = request.args.get('lon_min', type=float)
-                lon_max = request.args.get('lon_max', type=float)
-                limit = request.args.get('limit', 100, type=int)
-                
-                if not all([lat_min, lat_max, lon_min, lon_max]):
-                    return jsonify({'status': 'error', 'message': 'Missing area bounds'}), 400
-                
-                detections = self.db.get_detections_by_area(lat_min, lat_max, lon_min, lon_max, limit)
-                
-                return jsonify({
-                    'status': 'success',
-                    'count': len(detections),
-                    'detections': detections
-                })
-            except Exception as e:
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            lat_min = request.args.get('lat_min', type=float)
+            lat_max = request.args.get('lat_max', type=float)
+            lon_min = request.args.get('lon_min', type=float)
+            lon_max = request.args.get('lon_max', type=float)
+            limit = request.args.get('limit', 100, type=int)
+            
+            if not all([lat_min, lat_max, lon_min, lon_max]):
+                raise ValueError('Missing area bounds')
+            
+            detections = self.db.get_detections_by_area(lat_min, lat_max, lon_min, lon_max, limit)
+            
+            return jsonify({
+                'status': 'success',
+                'count': len(detections),
+                'detections': detections
+            })
         
         @self.app.route('/api/detections', methods=['POST'])
+        @api_error_handler
         def add_detection():
-            """Add new detection"""
-            try:
-                data = request.get_json()
-                
-                # Validate required fields
-                required = ['timestamp', 'latitude', 'longitude', 'severity', 'confidence']
-                if not all(field in data for field in required):
-                    return jsonify({
-                        'status': 'error',
-                        'message': f'Missing required fields: {required}'
-                    }), 400
-                
-                detection_id = self.db.add_detection(data)
-                
-                if detection_id > 0:
-                    logger.info(f"New detection added via API: ID {detection_id}")
-                    return jsonify({
-                        'status': 'success',
-                        'detection_id': detection_id,
-                        'message': 'Detection recorded'
-                    }), 201
-                else:
-                    return jsonify({'status': 'error', 'message': 'Failed to add detection'}), 500
+            """Add new detection, or a JSON array of detections in one transaction"""
+            data = self._parse_detections()
+            if isinstance(data, list):
+                return self._add_detections(data)
+            
+            detection_id = self.db.add_detection(data)
             
-            except Exception as e:
-                logger.error(f"Error adding detection: {e}")
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            if detection_id > 0:
+                logger.info(f"New detection added via API: ID {detection_id}")
+                return jsonify({
+                    'status': 'success',
+                    'detection_id': detection_id,
+                    'message': 'Detection recorded'
+                }), 201
+            else:
+                return jsonify({'status': 'error', 'message': 'Failed to add detection'}), 500
         
         @self.app.route('/api/detections/<int:detection_id>/status', methods=['PUT'])
+        @api_error_handler
         def update_repair_status(detection_id):
             """Update repair status of detection"""
-            try:
-                data = request.get_json()
-                status = data.get('status')
-                notes = data.get('notes', '')
-                
-                if not status:
-                    return jsonify({'status': 'error', 'message': 'Status required'}), 400
-                
-                success = self.db.update_repair_status(detection_id, status, notes)
-                
-                if success:
-                    return jsonify({
-                        'status': 'success',
-                        'message': f'Detection {detection_id} status updated to {status}'
-                    })
-                else:
-                    return jsonify({'status': 'error', 'message': 'Failed to update status'}), 500
+            data = request.get_json()
+            status = data.get('status')
+            notes = data.get('notes', '')
+            
+            if not status:
+                raise ValueError('Status required')
             
-            except Exception as e:
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            success = self.db.update_repair_status(detection_id, status, notes)
+            
+            if success:
+                return jsonify({
+                    'status': 'success',
+                    'message': f'Detection {detection_id} status updated to {status}'
+                })
+            else:
+                return jsonify({'status': 'error', 'message': 'Failed to update status'}), 500
         
         @self.app.route('/api/statistics', methods=['GET'])
+        @api_error_handler
         def get_statistics():
             """Get dashboard statistics"""
-            try:
-                days = request.args.get('days', 30, type=int)
-                stats = self.db.get_statistics(days)
-                
-                return jsonify({
-                    'status': 'success',
-                    'statistics': stats
-                })
-            except Exception as e:
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            days = request.args.get('days', 30, type=int)
+            stats = self.db.get_statistics(days)
+            
+            response = jsonify({
+                'status': 'success',
+                'statistics': stats
+            })
+            response.headers['Cache-Control'] = AGGREGATE_CACHE_CONTROL
+            return response
         
         @self.app.route('/api/heatmap', methods=['GET'])
+        @api_error_handler
         def get_heatmap():
             """Get heatmap data for map visualization"""
-            try:
-                limit = request.args.get('limit', 500, type=int)
-                heatmap_data = self.db.get_heatmap_data(limit)
-                
-                return jsonify({
-                    'status': 'success',
-                    'count': len(heatmap_data),
-                    'data': heatmap_data
-                })
-            except Exception as e:
-                return jsonify({'status': 'error', 'message': str(e)}), 500
+            limit = request.args.get('limit', 500, type=int)
+            heatmap_data = self.db.get_heatmap_data(limit)
+            
+            response = jsonify({
+                'status': 'success',
+                'count': len(heatmap_data['weight']),
+                'data': heatmap_data
+            })
+            response.headers['Cache-Control'] = AGGREGATE_CACHE_CONTROL
+            return response
         
         @self.app.route('/api/health', methods=['GET'])
         def health_check():
@@ -223,8 +293,54 @@ class DashboardServer:
         
         logger.info("Dashboard routes registered successfully")
     
+    def _parse_detections(self):
+        """
+        Decode and validate a POST /api/detections body (one detection or an array)
+        
+        Uses the msgspec DetectionIn decoder when installed, else checks required fields.
+        
+        Returns:
+            Detection dict, or list of dicts for an array body
+        
+        Raises:
+            ValueError: Payload is malformed or misses required fields (answered 400)
+        """
+        if _DETECTION_DECODER is not None:
+            try:
+                data = _DETECTION_DECODER.decode(request.get_data())
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+            if isinstance(data, list):
+                return [msgspec.structs.asdict(item) for item in data]
+            return msgspec.structs.asdict(data)
+        
+        data = request.get_json()
+        required = REQUIRED_DETECTION_FIELDS
+        if isinstance(data, list):
+            for index, item in enumerate(data):
+                if not isinstance(item, dict) or not all(field in item for field in required):
+                    raise ValueError(f'Detection {index}: missing required fields: {required}')
+        elif not isinstance(data, dict) or not all(field in data for field in required):
+            raise ValueError(f'Missing required fields: {required}')
+        return data
+    
+    def _add_detections(self, detections):
+        """Bulk POST /api/detections: insert already-validated detections all at once"""
+        detection_ids = self.db.add_detections_bulk(detections)
+        if len(detection_ids) != len(detections):
+            return jsonify({'status': 'error', 'message': 'Failed to add detections'}), 500
+        
+        logger.info(f"{len(detection_ids)} detections added via API")
+        return jsonify({
+            'status': 'success',
+            'detection_ids': detection_ids,
+            'message': f'{len(detection_ids)} detections recorded'
+        }), 201
+    
     def run(self, debug: bool = False):
-        """Start the dashboard server"""
+        """Start the dashboard server (Flask dev server; production uses gunicorn_entry.py)"""
+        logger.warning("Flask dev server handles one request at a time - in production run: "
+                       "gunicorn -c gunicorn_dashboard.conf.py gunicorn_entry:app")
         logger.info(f"Starting dashboard server on {self.host}:{self.port}")
         logger.info(f"Access dashboard at: http://{self.host}:{self.port}")
         
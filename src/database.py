@@ -7,12 +7,247 @@ Provides CRUD operations and query capabilities for dashboard integration
 import sqlite3
 import logging
 import os
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple, Iterator
+from datetime import datetime, timedelta
 import json
 
 logger = logging.getLogger(__name__)
 
+# Under gevent, "threads" are greenlets: keep one connection per greenlet, not per OS thread
+try:
+    from gevent import monkey as _gevent_monkey
+    if _gevent_monkey.is_module_patched('threading'):
+        from gevent.local import local as _local
+    else:
+        _local = threading.local
+except ImportError:
+    _local = threading.local
+
+# Applied to every connection: WAL lets readers run alongside the writer, and
+# synchronous=NORMAL only fsyncs at checkpoints instead of on every commit
+_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-65536',      # 64 MB page cache
+    'PRAGMA mmap_size=268435456',    # 256 MB memory-mapped reads
+    'PRAGMA busy_timeout=5000',      # wait up to 5 s for a writer lock instead of failing
+)
+
+
+# Statements used on request paths, hoisted so every call passes the same SQL text and
+# hits the connection's prepared-statement cache instead of being re-parsed.
+# Time windows compare the stored ISO strings against a threshold computed in Python
+# (see _since): wrapping the column in datetime() would stop SQLite using idx_timestamp.
+# Integer codes for the severity enum, indexed as the generated severity_code column
+SEV_LOW, SEV_MEDIUM, SEV_HIGH = 1, 2, 3
+SEVERITY_CODES = {'Low': SEV_LOW, 'Medium': SEV_MEDIUM, 'High': SEV_HIGH}
+SEVERITY_NAMES = {code: name for name, code in SEVERITY_CODES.items()}
+
+# Listings project these columns only: image_base64 lives in detection_images and is
+# fetched on demand by get_detection, so a page of rows never drags megabytes of base64 along.
+# notes stays in: the dashboard's status form is filled from a listing row and posts it back
+DETECTION_COLUMNS = ('id', 'timestamp', 'latitude', 'longitude', 'severity', 'confidence',
+                     'class_name', 'image_path', 'camera_source', 'gps_quality',
+                     'repair_status', 'repair_date', 'notes')
+
+_COLUMNS = ', '.join(DETECTION_COLUMNS)
+_D_COLUMNS = ', '.join('d.' + c for c in DETECTION_COLUMNS)
+
+SQL_GET_BY_ID = '''
+    SELECT ''' + _D_COLUMNS + ''', d.created_at, d.updated_at, i.image_base64
+    FROM detections d
+    LEFT JOIN detection_images i ON i.detection_id = d.id
+    WHERE d.id = ?
+'''
+
+SQL_INSERT_DETECTION = '''
+    INSERT INTO detections
+    (timestamp, latitude, longitude, severity, confidence, class_name,
+     image_path, camera_source, gps_quality)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_IMAGE = 'INSERT INTO detection_images (detection_id, image_base64) VALUES (?, ?)'
+
+SQL_INSERT_GPS_LOG = '''
+    INSERT INTO gps_quality_log
+    (timestamp, latitude, longitude, quality, num_satellites, hdop, vdop, pdop, fix_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_AREA_RTREE = '''
+    SELECT ''' + _D_COLUMNS + ''' FROM detections_rtree r
+    JOIN detections d ON d.id = r.id
+    WHERE r.max_lat >= ? AND r.min_lat <= ?
+      AND r.max_lon >= ? AND r.min_lon <= ?
+      AND d.latitude BETWEEN ? AND ?
+      AND d.longitude BETWEEN ? AND ?
+    ORDER BY d.timestamp DESC
+    LIMIT ?
+'''
+
+SQL_AREA_SCAN = '''
+    SELECT ''' + _COLUMNS + ''' FROM detections
+    WHERE latitude BETWEEN ? AND ?
+      AND longitude BETWEEN ? AND ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+SQL_BY_SEVERITY = '''
+    SELECT ''' + _COLUMNS + ''' FROM detections
+    WHERE severity = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+SQL_BY_SEVERITY_CODE = '''
+    SELECT ''' + _COLUMNS + ''' FROM detections
+    WHERE severity_code = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+SQL_RECENT = '''
+    SELECT ''' + _COLUMNS + ''' FROM detections
+    WHERE timestamp > ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+SQL_ALL = '''
+    SELECT ''' + _COLUMNS + ''' FROM detections
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+SQL_UPDATE_REPAIR = '''
+    UPDATE detections
+    SET repair_status = ?, repair_date = ?, notes = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+# Per-day rows kept current by the analytics_* triggers (see _init_analytics)
+SQL_STATS = '''
+    SELECT SUM(total_detections),
+           SUM(high_severity_count),
+           SUM(medium_severity_count),
+           SUM(low_severity_count),
+           SUM(avg_confidence * total_detections) / SUM(total_detections),
+           SUM(repairs_completed)
+    FROM analytics
+    WHERE date > ?
+'''
+
+SQL_HEATMAP = '''
+    SELECT latitude, longitude, severity,
+           CASE severity WHEN 'High' THEN 10 WHEN 'Medium' THEN 5 ELSE 1 END
+    FROM detections
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+
+# Tables, indexes and triggers created by init_database (the R*Tree is set up separately
+# because not every SQLite build has the module)
+SCHEMA_DDL = '''
+    -- Main detections table
+    CREATE TABLE IF NOT EXISTS detections (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        severity TEXT NOT NULL,
+        confidence REAL NOT NULL,
+        class_name TEXT NOT NULL,
+        image_path TEXT,
+        camera_source TEXT,
+        gps_quality INTEGER,
+        repair_status TEXT DEFAULT 'pending',
+        repair_date TEXT,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Detection images, kept out of detections so listings stay small
+    CREATE TABLE IF NOT EXISTS detection_images (
+        detection_id INTEGER PRIMARY KEY REFERENCES detections(id) ON DELETE CASCADE,
+        image_base64 TEXT
+    );
+
+    -- foreign_keys is off by default, so cascade the delete explicitly
+    CREATE TRIGGER IF NOT EXISTS detection_images_delete AFTER DELETE ON detections
+    BEGIN
+        DELETE FROM detection_images WHERE detection_id = OLD.id;
+    END;
+
+    -- GPS quality levels table
+    CREATE TABLE IF NOT EXISTS gps_quality_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        latitude REAL,
+        longitude REAL,
+        quality INTEGER,
+        num_satellites INTEGER,
+        hdop REAL,
+        vdop REAL,
+        pdop REAL,
+        fix_type TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Repair tracking table
+    CREATE TABLE IF NOT EXISTS repairs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        detection_id INTEGER NOT NULL,
+        repair_date TEXT NOT NULL,
+        repair_crew TEXT,
+        cost REAL,
+        before_image TEXT,
+        after_image TEXT,
+        notes TEXT,
+        status TEXT DEFAULT 'completed',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(detection_id) REFERENCES detections(id)
+    );
+
+    -- Analytics table for dashboard summary
+    CREATE TABLE IF NOT EXISTS analytics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL UNIQUE,
+        total_detections INTEGER DEFAULT 0,
+        high_severity_count INTEGER DEFAULT 0,
+        medium_severity_count INTEGER DEFAULT 0,
+        low_severity_count INTEGER DEFAULT 0,
+        avg_confidence REAL,
+        repairs_completed INTEGER DEFAULT 0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Create indexes for faster queries
+    CREATE INDEX IF NOT EXISTS idx_timestamp ON detections(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_gps_location ON detections(latitude, longitude);
+    CREATE INDEX IF NOT EXISTS idx_repair_status ON detections(repair_status);
+    CREATE INDEX IF NOT EXISTS idx_repair_date ON detections(repair_date)
+        WHERE repair_status = 'completed';
+'''
+
+
+def _since(**delta) -> str:
+    """ISO timestamp for now minus delta, in the same local-time format the writers store"""
+    return (datetime.now() - timedelta(**delta)).isoformat()
+
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    """Tune a new connection for concurrent dashboard reads and detection writes"""
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+
 
 class DetectionDatabase:
     """
@@ -20,108 +255,286 @@ class DetectionDatabase:
     Stores location data, timestamps, severity, and images
     """
     
-    def __init__(self, db_path: str = "detections.db"):
+    def __init__(self, db_path: str = "detections.db", cache_ttl: float = 30.0):
         """
         Initialize database connection
         
         Args:
             db_path (str): Path to SQLite database file
+            cache_ttl (float): Seconds heatmap/statistics results are reused (0 disables)
         """
         self.db_path = db_path
-        self.conn = None
+        self.has_rtree = False
+        self.has_severity_code = False
+        
+        # Dashboard aggregates polled on every tick: key -> (expires_at, result).
+        # Local writes clear it; the TTL bounds staleness from other processes' writes.
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        
+        # One connection per worker thread so reads run in parallel under WAL;
+        # every connection opened is tracked so close() can release them all
+        self._local = _local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.init_database()
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a tuned connection (an in-memory database is shared, not per thread)"""
+        with self._connections_lock:
+            if self.db_path == ':memory:' and self._connections:
+                return self._connections[0]
+            
+            # Autocommit mode: single statements commit on their own, multi-statement
+            # writes use an explicit _transaction() instead of Python's implicit BEGIN
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None,
+                                   cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            _apply_pragmas(conn)
+            self._connections.append(conn)
+            return conn
+    
     def init_database(self):
         """Create database tables if they don't exist"""
         try:
-            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.conn.row_factory = sqlite3.Row
-            
             cursor = self.conn.cursor()
+            # One script parsed in one call; the transaction stays open for the steps below
+            cursor.executescript('BEGIN;' + SCHEMA_DDL)
+            
+            self._migrate_images(cursor)
+            self._init_analytics(cursor)
+            self.has_severity_code = self._init_severity_code(cursor)
+            self.has_rtree = self._init_rtree(cursor)
             
-            # Main detections table
+            cursor.execute('COMMIT')
+            logger.info(f"Database initialized: {self.db_path}")
+        
+        except Exception as e:
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+            logger.error(f"Failed to initialize database: {e}")
+            raise
+    
+    def _cache_get(self, key):
+        """
+        Cached aggregate for key, or None if missing/expired
+        
+        Returns:
+            (result, generation): pass generation back to _cache_put
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1], self._cache_generation
+            return None, self._cache_generation
+    
+    def _cache_put(self, key, result, generation: int):
+        """Store a result unless a write invalidated the cache while it was computed"""
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+    
+    def invalidate_cache(self):
+        """Drop cached heatmap/statistics results after a write"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._cache.clear()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run several statements as one BEGIN ... COMMIT (rolled back on error)"""
+        self.conn.execute('BEGIN')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+    
+    def _migrate_images(self, cursor):
+        """Move image_base64 out of detections tables created before detection_images"""
+        cursor.execute('PRAGMA table_info(detections)')
+        if not any(row[1] == 'image_base64' for row in cursor.fetchall()):
+            return
+        
+        cursor.execute('''
+            INSERT OR IGNORE INTO detection_images (detection_id, image_base64)
+            SELECT id, image_base64 FROM detections WHERE image_base64 IS NOT NULL
+        ''')
+        if cursor.rowcount:
+            logger.info(f"Moved {cursor.rowcount} detection images to detection_images")
+        cursor.execute('UPDATE detections SET image_base64 = NULL WHERE image_base64 IS NOT NULL')
+    
+    def _init_analytics(self, cursor):
+        """
+        Keep the analytics table as a per-day materialisation of detections
+        
+        Detections count towards the day of their timestamp, completed repairs towards
+        the day of their repair_date. Triggers maintain the rows on every insert, repair
+        status change and delete, so get_statistics reads a few day rows instead of
+        scanning detections. The table is rebuilt once when the triggers are created.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'analytics_insert'")
+        created = cursor.fetchone() is None
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analytics_insert AFTER INSERT ON detections
+            BEGIN
+                INSERT INTO analytics (date, total_detections, high_severity_count,
+                                       medium_severity_count, low_severity_count, avg_confidence)
+                VALUES (substr(NEW.timestamp, 1, 10), 1, NEW.severity = 'High',
+                        NEW.severity = 'Medium', NEW.severity = 'Low', NEW.confidence)
+                ON CONFLICT(date) DO UPDATE SET
+                    avg_confidence = (COALESCE(avg_confidence, 0) * total_detections
+                                      + excluded.avg_confidence) / (total_detections + 1),
+                    total_detections = total_detections + 1,
+                    high_severity_count = high_severity_count + excluded.high_severity_count,
+                    medium_severity_count = medium_severity_count + excluded.medium_severity_count,
+                    low_severity_count = low_severity_count + excluded.low_severity_count;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analytics_repair
+            AFTER UPDATE OF repair_status, repair_date ON detections
+            BEGIN
+                UPDATE analytics SET repairs_completed = repairs_completed - 1
+                WHERE OLD.repair_status = 'completed' AND date = substr(OLD.repair_date, 1, 10);
+                
+                INSERT INTO analytics (date, repairs_completed)
+                SELECT substr(NEW.repair_date, 1, 10), 1
+                WHERE NEW.repair_status = 'completed' AND NEW.repair_date IS NOT NULL
+                ON CONFLICT(date) DO UPDATE SET repairs_completed = repairs_completed + 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS analytics_delete AFTER DELETE ON detections
+            BEGIN
+                UPDATE analytics SET
+                    avg_confidence = CASE WHEN total_detections > 1
+                        THEN (avg_confidence * total_detections - OLD.confidence)
+                             / (total_detections - 1) END,
+                    total_detections = total_detections - 1,
+                    high_severity_count = high_severity_count - (OLD.severity = 'High'),
+                    medium_severity_count = medium_severity_count - (OLD.severity = 'Medium'),
+                    low_severity_count = low_severity_count - (OLD.severity = 'Low')
+                WHERE date = substr(OLD.timestamp, 1, 10);
+                
+                UPDATE analytics SET repairs_completed = repairs_completed - 1
+                WHERE OLD.repair_status = 'completed' AND date = substr(OLD.repair_date, 1, 10);
+            END
+        ''')
+        
+        if created:
+            cursor.execute('DELETE FROM analytics')
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS detections (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    latitude REAL NOT NULL,
-                    longitude REAL NOT NULL,
-                    severity TEXT NOT NULL,
-                    confidence REAL NOT NULL,
-                    class_name TEXT NOT NULL,
-                    image_path TEXT,
-                    image_base64 TEXT,
-                    camera_source TEXT,
-                    gps_quality INTEGER,
-                    repair_status TEXT DEFAULT 'pending',
-                    repair_date TEXT,
-                    notes TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
+                INSERT INTO analytics (date, total_detections, high_severity_count,
+                                       medium_severity_count, low_severity_count, avg_confidence)
+                SELECT substr(timestamp, 1, 10), COUNT(*), SUM(severity = 'High'),
+                       SUM(severity = 'Medium'), SUM(severity = 'Low'), AVG(confidence)
+                FROM detections
+                GROUP BY 1
             ''')
-            
-            # GPS quality levels table
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS gps_quality_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    latitude REAL,
-                    longitude REAL,
-                    quality INTEGER,
-                    num_satellites INTEGER,
-                    hdop REAL,
-                    vdop REAL,
-                    pdop REAL,
-                    fix_type TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
+                INSERT INTO analytics (date, repairs_completed)
+                SELECT substr(repair_date, 1, 10), COUNT(*)
+                FROM detections
+                WHERE repair_status = 'completed' AND repair_date IS NOT NULL
+                GROUP BY 1
+                ON CONFLICT(date) DO UPDATE SET repairs_completed = excluded.repairs_completed
             ''')
-            
-            # Repair tracking table
+    
+    def _init_severity_code(self, cursor) -> bool:
+        """
+        Index severity as a small integer instead of TEXT
+        
+        severity_code is a VIRTUAL generated column, so rows and writers are unchanged
+        while idx_severity_code holds integer keys (SEVERITY_CODES; NULL for other names)
+        followed by timestamp, so by-severity listings come out of the index already sorted.
+        
+        Returns:
+            bool: False if this SQLite predates generated columns (3.31); severity
+            filters then use idx_severity on the TEXT column
+        """
+        if sqlite3.sqlite_version_info < (3, 31, 0):
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_severity ON detections(severity)')
+            return False
+        
+        cursor.execute('PRAGMA table_xinfo(detections)')
+        if not any(row[1] == 'severity_code' for row in cursor.fetchall()):
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS repairs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    detection_id INTEGER NOT NULL,
-                    repair_date TEXT NOT NULL,
-                    repair_crew TEXT,
-                    cost REAL,
-                    before_image TEXT,
-                    after_image TEXT,
-                    notes TEXT,
-                    status TEXT DEFAULT 'completed',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY(detection_id) REFERENCES detections(id)
-                )
+                ALTER TABLE detections ADD COLUMN severity_code INTEGER
+                GENERATED ALWAYS AS (CASE severity WHEN 'Low' THEN 1
+                                                   WHEN 'Medium' THEN 2
+                                                   WHEN 'High' THEN 3 END) VIRTUAL
             ''')
-            
-            # Analytics table for dashboard summary
+        cursor.execute('DROP INDEX IF EXISTS idx_severity')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_severity_code ON detections(severity_code, timestamp)')
+        return True
+    
+    def _init_rtree(self, cursor) -> bool:
+        """
+        Mirror detection coordinates into an R*Tree so area queries prune by bounding box
+        
+        Triggers keep detections_rtree in step with detections; rows that predate the
+        R*Tree are backfilled once when it is created.
+        
+        Returns:
+            bool: False if this SQLite build lacks the rtree module (area queries then scan)
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'detections_rtree'")
+        created = cursor.fetchone() is None
+        
+        try:
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS analytics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL UNIQUE,
-                    total_detections INTEGER DEFAULT 0,
-                    high_severity_count INTEGER DEFAULT 0,
-                    medium_severity_count INTEGER DEFAULT 0,
-                    low_severity_count INTEGER DEFAULT 0,
-                    avg_confidence REAL,
-                    repairs_completed INTEGER DEFAULT 0,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
+                CREATE VIRTUAL TABLE IF NOT EXISTS detections_rtree
+                USING rtree(id, min_lat, max_lat, min_lon, max_lon)
             ''')
-            
-            # Create indexes for faster queries
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON detections(timestamp)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_severity ON detections(severity)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_gps_location ON detections(latitude, longitude)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_repair_status ON detections(repair_status)')
-            
-            self.conn.commit()
-            logger.info(f"Database initialized: {self.db_path}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite R*Tree unavailable, area queries will scan: {e}")
+            return False
         
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
-            raise
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS detections_rtree_insert AFTER INSERT ON detections
+            BEGIN
+                INSERT INTO detections_rtree
+                VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS detections_rtree_update
+            AFTER UPDATE OF latitude, longitude ON detections
+            BEGIN
+                UPDATE detections_rtree
+                SET min_lat = NEW.latitude, max_lat = NEW.latitude,
+                    min_lon = NEW.longitude, max_lon = NEW.longitude
+                WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS detections_rtree_delete AFTER DELETE ON detections
+            BEGIN
+                DELETE FROM detections_rtree WHERE id = OLD.id;
+            END
+        ''')
+        
+        if created:
+            cursor.execute('''
+                INSERT INTO detections_rtree
+                SELECT id, latitude, latitude, longitude, longitude FROM detections
+            ''')
+        return True
     
     def add_detection(self, detection_data: Dict) -> int:
         """
@@ -146,14 +559,7 @@ class DetectionDatabase:
             int: ID of inserted record
         """
         try:
-            cursor = self.conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO detections 
-                (timestamp, latitude, longitude, severity, confidence, class_name, 
-                 image_path, image_base64, camera_source, gps_quality)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            row = (
                 detection_data.get('timestamp'),
                 detection_data.get('latitude'),
                 detection_data.get('longitude'),
@@ -161,13 +567,18 @@ class DetectionDatabase:
                 detection_data.get('confidence', 0.0),
                 detection_data.get('class_name', 'pothole'),
                 detection_data.get('image_path'),
-                detection_data.get('image_base64'),
                 detection_data.get('camera_source'),
                 detection_data.get('gps_quality', 0)
-            ))
+            )
+            image_base64 = detection_data.get('image_base64')
             
-            self.conn.commit()
-            detection_id = cursor.lastrowid
+            if image_base64:
+                with self._transaction() as conn:
+                    detection_id = conn.execute(SQL_INSERT_DETECTION, row).lastrowid
+                    conn.execute(SQL_INSERT_IMAGE, (detection_id, image_base64))
+            else:
+                detection_id = self.conn.execute(SQL_INSERT_DETECTION, row).lastrowid
+            self.invalidate_cache()
             
             logger.info(f"Detection added (ID: {detection_id}): "
                        f"({detection_data.get('latitude'):.4f}, {detection_data.get('longitude'):.4f}) "
@@ -179,6 +590,64 @@ class DetectionDatabase:
             logger.error(f"Error adding detection: {e}")
             return -1
     
+    def add_detections(self, detections: List[Dict]) -> int:
+        """
+        Add many detections in one transaction
+        
+        Args:
+            detections (list): Detection dicts, same fields as add_detection
+        
+        Returns:
+            int: Number of rows inserted (0 on error)
+        """
+        return len(self.add_detections_bulk(detections))
+    
+    def add_detections_bulk(self, detections: List[Dict]) -> List[int]:
+        """
+        Add many detections with one executemany in one transaction (one commit/fsync)
+        
+        Args:
+            detections (list): Detection dicts, same fields as add_detection
+        
+        Returns:
+            list: IDs of the inserted rows in input order (empty on error)
+        """
+        if not detections:
+            return []
+        
+        try:
+            rows = [(
+                d.get('timestamp'),
+                d.get('latitude'),
+                d.get('longitude'),
+                d.get('severity', 'Unknown'),
+                d.get('confidence', 0.0),
+                d.get('class_name', 'pothole'),
+                d.get('image_path'),
+                d.get('camera_source'),
+                d.get('gps_quality', 0)
+            ) for d in detections]
+            
+            with self._transaction() as conn:
+                conn.executemany(SQL_INSERT_DETECTION, rows)
+                # AUTOINCREMENT ids in one write transaction are consecutive, ending at the sequence value
+                last_id = conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'detections'"
+                ).fetchone()[0]
+                first_id = last_id - len(rows) + 1
+                images = [(first_id + i, d['image_base64'])
+                          for i, d in enumerate(detections) if d.get('image_base64')]
+                if images:
+                    conn.executemany(SQL_INSERT_IMAGE, images)
+            self.invalidate_cache()
+            
+            logger.info(f"Added {len(rows)} detections in batch")
+            return list(range(first_id, last_id + 1))
+        
+        except Exception as e:
+            logger.error(f"Error adding detection batch: {e}")
+            return []
+    
     def add_gps_log(self, gps_data: Dict) -> int:
         """
         Log GPS reading for debugging and quality tracking
@@ -203,11 +672,7 @@ class DetectionDatabase:
         try:
             cursor = self.conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO gps_quality_log 
-                (timestamp, latitude, longitude, quality, num_satellites, hdop, vdop, pdop, fix_type)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(SQL_INSERT_GPS_LOG, (
                 gps_data.get('timestamp'),
                 gps_data.get('latitude'),
                 gps_data.get('longitude'),
@@ -219,18 +684,30 @@ class DetectionDatabase:
                 gps_data.get('fix_type')
             ))
             
-            self.conn.commit()
             return cursor.lastrowid
         
         except Exception as e:
             logger.error(f"Error logging GPS data: {e}")
             return -1
     
+    def _detection_rows(self, sql: str, params: Tuple) -> Iterator[Dict]:
+        """
+        Run a listing query (selecting DETECTION_COLUMNS) and return its rows as dicts
+        
+        The cursor yields plain tuples that are zipped with the known column names, which
+        is cheaper than building each dict from a sqlite3.Row. The query runs immediately;
+        rows are converted as the returned iterator is consumed.
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        return (dict(zip(DETECTION_COLUMNS, row)) for row in cursor)
+    
     def get_detection(self, detection_id: int) -> Optional[Dict]:
-        """Get single detection by ID"""
+        """Get single detection by ID, including image_base64 (None if no image)"""
         try:
             cursor = self.conn.cursor()
-            cursor.execute('SELECT * FROM detections WHERE id = ?', (detection_id,))
+            cursor.execute(SQL_GET_BY_ID, (detection_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
         except Exception as e:
@@ -252,17 +729,17 @@ class DetectionDatabase:
             List of detection dictionaries
         """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM detections 
-                WHERE latitude BETWEEN ? AND ? 
-                  AND longitude BETWEEN ? AND ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (lat_min, lat_max, lon_min, lon_max, limit))
+            if self.has_rtree:
+                # R*Tree boxes are 32-bit floats rounded outward: prune with an overlap
+                # test, then re-check the exact coordinates on the joined row
+                rows = self._detection_rows(SQL_AREA_RTREE, (lat_min, lat_max, lon_min, lon_max,
+                                                             lat_min, lat_max, lon_min, lon_max,
+                                                             limit))
+            else:
+                rows = self._detection_rows(SQL_AREA_SCAN, (lat_min, lat_max, lon_min, lon_max,
+                                                            limit))
             
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return list(rows)
         
         except Exception as e:
             logger.error(f"Error fetching detections by area: {e}")
@@ -272,16 +749,10 @@ class DetectionDatabase:
                                    limit: int = 100) -> List[Dict]:
         """Get detections filtered by severity level"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM detections 
-                WHERE severity = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (severity, limit))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            code = SEVERITY_CODES.get(severity) if self.has_severity_code else None
+            if code is not None:
+                return list(self._detection_rows(SQL_BY_SEVERITY_CODE, (code, limit)))
+            return list(self._detection_rows(SQL_BY_SEVERITY, (severity, limit)))
         
         except Exception as e:
             logger.error(f"Error fetching detections by severity: {e}")
@@ -290,33 +761,24 @@ class DetectionDatabase:
     def get_recent_detections(self, hours: int = 24, limit: int = 100) -> List[Dict]:
         """Get detections from last N hours"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM detections 
-                WHERE datetime(timestamp) > datetime('now', '-' || ? || ' hours')
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (hours, limit))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return list(self._detection_rows(SQL_RECENT, (_since(hours=hours), limit)))
         
         except Exception as e:
             logger.error(f"Error fetching recent detections: {e}")
             return []
     
+    def iter_recent_detections(self, hours: int = 24, limit: int = 100) -> Iterator[Dict]:
+        """
+        Like get_recent_detections, but yields rows straight off the cursor
+        
+        The query runs immediately (so errors raise here); rows are fetched lazily.
+        """
+        return self._detection_rows(SQL_RECENT, (_since(hours=hours), limit))
+    
     def get_all_detections(self, limit: int = 1000) -> List[Dict]:
         """Get all detections with optional limit"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT * FROM detections 
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            return list(self._detection_rows(SQL_ALL, (limit,)))
         
         except Exception as e:
             logger.error(f"Error fetching all detections: {e}")
@@ -339,13 +801,9 @@ class DetectionDatabase:
             
             repair_date = None if status == 'pending' else datetime.now().isoformat()
             
-            cursor.execute('''
-                UPDATE detections 
-                SET repair_status = ?, repair_date = ?, notes = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (status, repair_date, notes, detection_id))
+            cursor.execute(SQL_UPDATE_REPAIR, (status, repair_date, notes, detection_id))
+            self.invalidate_cache()
             
-            self.conn.commit()
             logger.info(f"Detection {detection_id} repair status updated to: {status}")
             return True
         
@@ -358,89 +816,86 @@ class DetectionDatabase:
         Get dashboard statistics for specified period
         
         Args:
-            days (int): Number of days to analyze
+            days (int): Number of calendar days to analyze, today included
         
         Returns:
-            Dict with statistics
+            Dict with statistics (cached for cache_ttl; treat as read-only)
         """
+        stats, generation = self._cache_get(('statistics', days))
+        if stats is not None:
+            return stats
+        
         try:
             cursor = self.conn.cursor()
             
-            # Total detections
-            cursor.execute('''
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN severity = 'High' THEN 1 ELSE 0 END) as high,
-                       SUM(CASE WHEN severity = 'Medium' THEN 1 ELSE 0 END) as medium,
-                       SUM(CASE WHEN severity = 'Low' THEN 1 ELSE 0 END) as low,
-                       AVG(confidence) as avg_confidence
-                FROM detections 
-                WHERE datetime(timestamp) > datetime('now', '-' || ? || ' days')
-            ''', (days,))
+            # Whole local days: the last `days` calendar days, today included
+            cursor.execute(SQL_STATS, (_since(days=days)[:10],))
             
             stats_row = cursor.fetchone()
             
-            cursor.execute('''
-                SELECT COUNT(*) as total FROM detections 
-                WHERE repair_status = 'completed'
-                  AND datetime(repair_date) > datetime('now', '-' || ? || ' days')
-            ''', (days,))
-            
-            repairs_row = cursor.fetchone()
-            
             stats = {
                 'total_detections': stats_row[0] or 0,
                 'high_severity': stats_row[1] or 0,
                 'medium_severity': stats_row[2] or 0,
                 'low_severity': stats_row[3] or 0,
                 'avg_confidence': stats_row[4] or 0,
-                'repairs_completed': repairs_row[0] or 0,
-                'pending_repairs': (stats_row[0] or 0) - (repairs_row[0] or 0)
+                'repairs_completed': stats_row[5] or 0,
+                'pending_repairs': (stats_row[0] or 0) - (stats_row[5] or 0)
             }
             
+            self._cache_put(('statistics', days), stats, generation)
             return stats
         
         except Exception as e:
             logger.error(f"Error getting statistics: {e}")
             return {}
     
-    def get_heatmap_data(self, limit: int = 500) -> List[Dict]:
+    def get_heatmap_data(self, limit: int = 500) -> Dict[str, List]:
         """
         Get data formatted for heatmap visualization
         
+        Column-oriented so the JSON carries each key once rather than once per point.
+        
         Returns:
-            List of {latitude, longitude, severity_level}
+            {'latitude': (...), 'longitude': (...), 'severity': (...), 'weight': (...)},
+            index-aligned tuples (cached for cache_ttl; treat as read-only)
         """
+        heatmap, generation = self._cache_get(('heatmap', limit))
+        if heatmap is not None:
+            return heatmap
+        
         try:
             cursor = self.conn.cursor()
-            cursor.execute('''
-                SELECT latitude, longitude, severity 
-                FROM detections 
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (limit,))
-            
-            heatmap = []
-            severity_weights = {'Low': 1, 'Medium': 5, 'High': 10}
+            cursor.row_factory = None
+            # Weight is computed by SQLite alongside the row instead of a Python lookup per point
+            cursor.execute(SQL_HEATMAP, (limit,))
             
-            for row in cursor.fetchall():
-                heatmap.append({
-                    'latitude': row[0],
-                    'longitude': row[1],
-                    'severity': row[2],
-                    'weight': severity_weights.get(row[2], 1)
-                })
+            # Transpose rows into columns in C rather than one Python loop per column
+            latitude, longitude, severity, weight = tuple(zip(*cursor.fetchall())) or ((),) * 4
+            heatmap = {
+                'latitude': latitude,
+                'longitude': longitude,
+                'severity': severity,
+                'weight': weight
+            }
             
+            self._cache_put(('heatmap', limit), heatmap, generation)
             return heatmap
         
         except Exception as e:
             logger.error(f"Error getting heatmap data: {e}")
-            return []
+            return {'latitude': (), 'longitude': (), 'severity': (), 'weight': ()}
     
     def close(self):
-        """Close database connection"""
-        if self.conn:
-            self.conn.close()
-            logger.info("Database connection closed")
+        """Close every thread's database connection"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Threads that touch the database again get a fresh connection
+        self._local = _local()
+        if connections:
+            logger.info(f"Database connections closed ({len(connections)})")
     
     def __enter__(self):
         """Context manager entry"""
@@ -507,8 +962,8 @@ if __name__ == "__main__":
     # Get heatmap data
     print("\nHeatmap Data:")
     heatmap = db.get_heatmap_data()
-    for point in heatmap:
-        print(f"  ({point['latitude']:.4f}, {point['longitude']:.4f}) - {point['severity']}")
+    for lat, lon, severity in zip(heatmap['latitude'], heatmap['longitude'], heatmap['severity']):
+        print(f"  ({lat:.4f}, {lon:.4f}) - {severity}")
     
     db.close()
     print("\nTest completed")
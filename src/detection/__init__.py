@@ -0,0 +1 @@
+"""ASTROPATH detection: YOLO/TensorRT/OpenVINO engines, camera capture and classifier training"""
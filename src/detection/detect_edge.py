@@ -6,17 +6,24 @@ Upgraded version of camera_video (1).py with modular design
 
 import os
 import sys
+import bisect
 import cv2
 import numpy as np
 import time
+import queue
 from datetime import datetime
 import threading
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
-from src.utils import setup_logger, get_geolocation, save_image, FPSCounter, ensure_dir_exists, create_detection_payload
+from src.utils import (setup_logger, get_geolocation, save_image, AsyncFileWriter, FPSCounter,
+                       ensure_dir_exists, create_detection_payload, load_tflite_interpreter,
+                       tflite_predict, setup_dnn_target, nms_boxes)
 from src.navigation.gps_handler import GPSHandler
+from src.api_client import BatchedReporter
 from src.navigation.drone_controller import DroneController
+from src.detection.tensorrt_engine import TensorRTEngine
+from src.detection.tflite_engine import TFLiteYOLOEngine
 
 logger = setup_logger(__name__)
 
@@ -35,26 +42,14 @@ class YOLODetector:
         
         # Load network
         self.net = cv2.dnn.readNet(weights_path, cfg_path)
+        # Choose smaller input when FAST_MODE enabled
+        input_size = config.FAST_IMG_SIZE_YOLO if getattr(config, 'FAST_MODE', False) else config.IMG_SIZE_YOLO
 
-        # Prefer CUDA if configured and available
-        try:
-            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-            if getattr(config, 'USE_CUDA', False):
-                # Attempt to use CUDA target if available in OpenCV build
-                try:
-                    self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-                    logger.info('Using CUDA for DNN inference')
-                except Exception:
-                    logger.warning('CUDA target not available, falling back to CPU')
-                    self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-            else:
-                self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
-        except Exception as e:
-            logger.debug(f'DNN backend/target setup error: {e}')
+        # CUDA (FP16 where supported) if configured, else CPU; warmed up at the real input size
+        target = setup_dnn_target(self.net, input_size)
+        logger.info(f'DNN inference target: {target}')
 
         self.model = cv2.dnn_DetectionModel(self.net)
-        # Choose smaller input when FAST_MODE enabled
-        input_size = config.FAST_IMG_SIZE_YOLO if getattr(config, 'FAST_MODE', False) else config.IMG_SIZE_YOLO
         self.model.setInputParams(
             size=(input_size, input_size),
             scale=1/255,
@@ -67,36 +62,143 @@ class YOLODetector:
         
         logger.info(f"YOLO loaded. Classes: {self.classes}")
     
-    def detect(self, frame):
-        """Detect objects in frame"""
+    def detect(self, frame, min_confidence=None):
+        """
+        Detect objects in frame
+        
+        Args:
+            frame: BGR image
+            min_confidence (float): Drop detections below this score before they are built;
+                defaults to config.CONF_THRESHOLD (every box the model keeps)
+        """
+        if min_confidence is None:
+            min_confidence = config.CONF_THRESHOLD
         classes_ids, confidences, boxes = self.model.detect(
             frame,
             config.CONF_THRESHOLD,
             config.NMS_THRESHOLD
         )
+        if len(confidences) == 0:
+            return []
+        
+        # Drop boxes below min_confidence in NumPy so dicts are built only for survivors
+        mask = np.asarray(confidences).ravel() >= min_confidence
+        classes_ids = np.asarray(classes_ids).ravel()[mask].tolist()
+        confidences = np.asarray(confidences).ravel()[mask].tolist()
+        boxes = np.asarray(boxes).reshape(-1, 4)[mask].tolist()
         
         detections = []
         for (class_id, confidence, box) in zip(classes_ids, confidences, boxes):
             detections.append({
-                'class_id': int(class_id),
+                'class_id': class_id,
                 'class_name': self.classes[class_id] if class_id < len(self.classes) else 'Unknown',
-                'confidence': float(confidence),
+                'confidence': confidence,
                 'box': box,
-                'x': int(box[0]),
-                'y': int(box[1]),
-                'w': int(box[2]),
-                'h': int(box[3])
+                'x': box[0],
+                'y': box[1],
+                'w': box[2],
+                'h': box[3]
             })
         
         return detections
 
 
+class TRTYOLODetector:
+    """YOLO detection on a TensorRT FP16 engine; detect() returns the same dicts as YOLODetector"""
+    
+    def __init__(self, engine_path, names_path, onnx_path=None):
+        logger.info("Initializing TensorRT YOLO detector...")
+        
+        # Builds the engine from onnx_path on first use if the .engine file is missing
+        self.engine = TensorRTEngine(engine_path, onnx_path=onnx_path)
+        
+        # Load class names
+        with open(names_path, 'r') as f:
+            self.classes = [line.strip() for line in f.readlines()]
+        
+        logger.info(f"TensorRT YOLO loaded. Classes: {self.classes}")
+    
+    def detect(self, frame, min_confidence=None):
+        """Detect objects in frame (min_confidence as in YOLODetector.detect)"""
+        if min_confidence is None:
+            min_confidence = config.CONF_THRESHOLD
+        outputs = self.engine.infer_frame(frame)
+        dets = np.concatenate(outputs, axis=0)
+        height, width = frame.shape[:2]
+        
+        # Rows are (cx, cy, w, h, objectness, class scores...) like cv2.dnn YOLO layers;
+        # keep each row's best class, then threshold and NMS all candidates at once. NMS only
+        # suppresses a box for a higher-scoring one, so thresholding at min_confidence first
+        # keeps the same survivors while giving NMS fewer candidates
+        class_scores = dets[:, 5:]
+        class_ids = class_scores.argmax(axis=1)
+        confidences = class_scores[np.arange(len(dets)), class_ids]
+        mask = confidences >= min_confidence
+        dets, class_ids, confidences = dets[mask], class_ids[mask], confidences[mask]
+        
+        w = dets[:, 2] * width
+        h = dets[:, 3] * height
+        boxes = np.stack([dets[:, 0] * width - w / 2, dets[:, 1] * height - h / 2, w, h],
+                         axis=1).astype(np.int32)
+        keep = nms_boxes(boxes, confidences, config.NMS_THRESHOLD) if len(boxes) else []
+        
+        detections = []
+        for box, class_id, confidence in zip(boxes[keep].tolist(), class_ids[keep].tolist(),
+                                             confidences[keep].tolist()):
+            detections.append({
+                'class_id': class_id,
+                'class_name': self.classes[class_id] if class_id < len(self.classes) else 'Unknown',
+                'confidence': confidence,
+                'box': box,
+                'x': box[0],
+                'y': box[1],
+                'w': box[2],
+                'h': box[3]
+            })
+        
+        return detections
+
+
+class TFLiteYOLODetector(TRTYOLODetector):
+    """YOLO detection on the INT8 TFLite build (Edge TPU when available); decoded like the TensorRT outputs"""
+    
+    def __init__(self, tflite_path, names_path, edgetpu_path=None):
+        logger.info("Initializing TFLite YOLO detector...")
+        
+        self.engine = TFLiteYOLOEngine(tflite_path, edgetpu_path=edgetpu_path,
+                                       edgetpu_delegate=config.TFLITE_EDGETPU_DELEGATE)
+        
+        # Load class names
+        with open(names_path, 'r') as f:
+            self.classes = [line.strip() for line in f.readlines()]
+        
+        logger.info(f"TFLite YOLO loaded on {self.engine.device}. Classes: {self.classes}")
+
+
 class SeverityEstimator:
     """Estimate pothole severity based on multiple factors"""
     
+    # Per-level base score and BGR color, indexed like config.SEVERITY_NAMES
+    SEVERITY_SCORES = (0.3, 0.6, 0.9)
+    SEVERITY_COLORS = dict(zip(config.SEVERITY_NAMES, config.SEVERITY_COLORS_BGR))
+    
     def __init__(self, classifier_path=None):
         self.classifier = None
-        if classifier_path and os.path.exists(classifier_path) and load_model:
+        
+        # Reused classifier input buffers; uint8 -> 0-1 float32 is a 256-entry lookup, not a divide
+        size = config.IMG_SIZE_CLASSIFIER
+        self._u8_to_f32 = np.arange(256, dtype=np.float32) / 255.0
+        self._resized = np.empty((size, size, 3), dtype=np.uint8)
+        self._batch = np.empty((0, size, size, 3), dtype=np.float32)
+        
+        self.is_tflite = bool(classifier_path) and classifier_path.endswith('.tflite')
+        if self.is_tflite and os.path.exists(classifier_path):
+            try:
+                self.classifier = load_tflite_interpreter(classifier_path)
+                logger.info(f"TFLite classifier loaded: {classifier_path}")
+            except Exception as e:
+                logger.warning(f"Failed to load TFLite classifier: {e}. Using heuristic-based severity only.")
+        elif classifier_path and os.path.exists(classifier_path) and load_model:
             try:
                 self.classifier = load_model(classifier_path)
                 logger.info(f"Classifier loaded: {classifier_path}")
@@ -104,59 +206,86 @@ class SeverityEstimator:
                 logger.warning(f"Failed to load classifier: {e}. Using heuristic-based severity only.")
     
     def estimate(self, frame, detection, frame_shape):
+        """Estimate severity for a single detection (see estimate_batch)"""
+        return self.estimate_batch(frame, [detection], frame_shape)[0]
+    
+    def estimate_batch(self, frame, detections, frame_shape):
         """
-        Estimate severity based on:
+        Estimate severity for all of a frame's detections based on:
         1. Bounding box area ratio
-        2. Classifier confidence (if available)
+        2. Classifier confidence (if available), one batched call for every crop
         3. Location in frame (center vs edge)
+        
+        Returns:
+            list: (severity, severity_score) per detection, in input order
         """
-        x, y, w, h = detection['x'], detection['y'], detection['w'], detection['h']
+        frame_area = frame_shape[0] * frame_shape[1]
+        results = [("Unknown", 0.5)] * len(detections)
         
-        # Extract crop
-        crop = frame[y:y+h, x:x+w]
-        if crop.size == 0:
-            return "Unknown", 0.5
+        # Extract crops
+        crops, indices = [], []
+        for i, det in enumerate(detections):
+            x, y, w, h = det['x'], det['y'], det['w'], det['h']
+            crop = frame[y:y+h, x:x+w]
+            if crop.size:
+                crops.append(crop)
+                indices.append(i)
         
-        # Area ratio (proportion of frame)
-        area_ratio = (w * h) / (frame_shape[0] * frame_shape[1])
+        if not crops:
+            return results
         
         # Classifier confidence (if available)
-        classifier_conf = 0.5
+        classifier_confs = None
         if self.classifier:
             try:
-                crop_resized = cv2.resize(crop, (config.IMG_SIZE_CLASSIFIER, config.IMG_SIZE_CLASSIFIER))
-                crop_normalized = crop_resized.astype(np.float32) / 255.0
-                crop_input = np.expand_dims(crop_normalized, axis=0)
-                classifier_conf = float(self.classifier.predict(crop_input, verbose=0)[0][0])
+                classifier_confs = self._classify(crops)
             except Exception as e:
                 logger.debug(f"Classifier inference error: {e}")
         
-        # Determine severity based on area and confidence
-        if area_ratio < config.SEVERITY_THRESHOLDS["area_ratio_low"]:
-            severity = "Low"
-            severity_score = 0.3
-        elif area_ratio < config.SEVERITY_THRESHOLDS["area_ratio_medium"]:
-            severity = "Medium"
-            severity_score = 0.6
-        else:
-            severity = "High"
-            severity_score = 0.9
-        
-        # Adjust based on classifier confidence
-        if self.classifier:
-            severity_score = (severity_score + classifier_conf) / 2
+        for j, i in enumerate(indices):
+            det = detections[i]
+            # Area ratio (proportion of frame)
+            area_ratio = (det['w'] * det['h']) / frame_area
+            
+            # Determine severity based on area and confidence
+            level = bisect.bisect_right(config.SEVERITY_BOUNDS, area_ratio)
+            severity_score = self.SEVERITY_SCORES[level]
+            
+            # Adjust based on classifier confidence (0.5 if inference failed)
+            if self.classifier:
+                classifier_conf = float(classifier_confs[j]) if classifier_confs is not None else 0.5
+                severity_score = (severity_score + classifier_conf) / 2
+            
+            results[i] = (config.SEVERITY_NAMES[level], severity_score)
+        
+        return results
+    
+    def _classify(self, crops):
+        """
+        Classifier confidence for each crop
         
-        return severity, severity_score
+        Each crop is resized into a reused uint8 buffer and mapped to 0-1 float32 through
+        the lookup table straight into its slot of a reused (N, size, size, 3) batch, so
+        no per-detection arrays are allocated. Keras runs the whole batch in one call
+        (model.__call__, without predict()'s loop overhead); TFLite interpreters have a
+        fixed batch of 1, so they run crop by crop.
+        """
+        size = config.IMG_SIZE_CLASSIFIER
+        if len(crops) > len(self._batch):
+            self._batch = np.empty((len(crops), size, size, 3), dtype=np.float32)
+        batch = self._batch[:len(crops)]
+        for i, crop in enumerate(crops):
+            cv2.resize(crop, (size, size), dst=self._resized)
+            np.take(self._u8_to_f32, self._resized, out=batch[i])
+        
+        if self.is_tflite:
+            return [tflite_predict(self.classifier, batch[i:i+1]).ravel()[0] for i in range(len(crops))]
+        return np.asarray(self.classifier(batch, training=False))[:, 0]
     
-    @staticmethod
-    def get_severity_color(severity):
+    @classmethod
+    def get_severity_color(cls, severity):
         """Get BGR color for severity level"""
-        colors = {
-            "Low": (0, 255, 0),      # Green
-            "Medium": (0, 165, 255),  # Orange
-            "High": (0, 0, 255),      # Red
-        }
-        return colors.get(severity, (255, 255, 255))
+        return cls.SEVERITY_COLORS.get(severity, (255, 255, 255))
 
 
 class EdgeDetectionPipeline:
@@ -170,17 +299,44 @@ class EdgeDetectionPipeline:
             logger.error("YOLO model files not found. Please download from: https://github.com/AlexeyAB/darknet")
             raise FileNotFoundError("Missing YOLO model files")
         
-        self.detector = YOLODetector(
-            config.YOLOV4_WEIGHTS,
-            config.YOLOV4_CFG,
-            config.OBJ_NAMES
-        )
+        # Prefer the TensorRT FP16 engine on CUDA devices, the INT8 TFLite build (Edge TPU
+        # with USE_EDGETPU) on edge builds, else OpenCV DNN
+        self.detector = None
+        if config.USE_CUDA and config.USE_TENSORRT:
+            try:
+                self.detector = TRTYOLODetector(
+                    config.YOLOV4_TRT_ENGINE,
+                    config.OBJ_NAMES,
+                    onnx_path=config.YOLOV4_ONNX
+                )
+            except Exception as e:
+                logger.warning(f"TensorRT unavailable ({e}). Falling back to OpenCV DNN.")
         
-        self.severity_estimator = SeverityEstimator(config.CLASSIFIER_MODEL)
+        if self.detector is None and (config.PI_OPTIMIZE or config.USE_EDGETPU):
+            try:
+                self.detector = TFLiteYOLODetector(
+                    config.YOLO_TFLITE,
+                    config.OBJ_NAMES,
+                    edgetpu_path=config.YOLO_EDGETPU if config.USE_EDGETPU else None
+                )
+            except Exception as e:
+                logger.warning(f"TFLite YOLO unavailable ({e}). Falling back to OpenCV DNN.")
+        
+        if self.detector is None:
+            self.detector = YOLODetector(
+                config.YOLOV4_WEIGHTS,
+                config.YOLOV4_CFG,
+                config.OBJ_NAMES
+            )
+        
+        self.severity_estimator = SeverityEstimator(config.ACTIVE_CLASSIFIER)
         
         self.fps_counter = FPSCounter(window_size=30) if config.ENABLE_FPS_COUNTER else None
         self.frame_count = 0
         self.detection_count = 0
+        
+        # Detections are queued and uploaded in batches off the frame loop
+        self.reporter = BatchedReporter() if config.ENABLE_CLOUD_UPLOAD else None
 
         # Initialize GPS Module if enabled
         self.gps = None
@@ -191,7 +347,8 @@ class EdgeDetectionPipeline:
                     baud=config.GPS_BAUD,
                     timeout=config.GPS_TIMEOUT,
                     max_retries=config.GPS_MAX_RETRIES,
-                    min_sats=config.GPS_MIN_SATS
+                    min_sats=config.GPS_MIN_SATS,
+                    cache_path=config.GPS_CACHE_FILE if config.GPS_USE_CACHED_IF_NO_FIX else None
                 )
                 if self.gps.is_connected():
                     logger.info(f"GPS connected on {config.GPS_PORT}")
@@ -219,28 +376,18 @@ class EdgeDetectionPipeline:
 
     def process_frame(self, frame):
         """Process single frame: detect -> estimate severity -> annotate"""
+        # Frame skipping happens at capture (VideoStream frame_skip); every frame here is processed
         self.frame_count += 1
         
-        # Skip frames for performance
-        if self.frame_count % config.DETECTION_FRAME_SKIP != 0 and config.DETECTION_FRAME_SKIP > 1:
-            return frame, []
+        # Detect objects worth reporting; the detector drops the rest before building them
+        processed_detections = self.detector.detect(frame, min_confidence=config.CONF_THRESHOLD_HIGH)
         
-        # Detect objects
-        detections = self.detector.detect(frame)
-        
-        # Filter and process detections
-        processed_detections = []
-        for det in detections:
-            if det['confidence'] < 0.6:
-                continue
-            
-            # Estimate severity
-            severity, severity_score = self.severity_estimator.estimate(frame, det, frame.shape)
+        # Estimate severity for all of them in one batch
+        severities = self.severity_estimator.estimate_batch(frame, processed_detections, frame.shape)
+        for det, (severity, severity_score) in zip(processed_detections, severities):
             det['severity'] = severity
             det['severity_score'] = severity_score
-            
-            processed_detections.append(det)
-            self.detection_count += 1
+        self.detection_count += len(processed_detections)
         
         # Annotate frame
         annotated_frame = self._annotate_frame(frame, processed_detections)
@@ -260,8 +407,8 @@ class EdgeDetectionPipeline:
         return annotated_frame, processed_detections
     
     def _annotate_frame(self, frame, detections):
-        """Draw bounding boxes and labels on frame"""
-        annotated = frame.copy()
+        """Draw bounding boxes and labels on frame in place and return it"""
+        annotated = frame
         
         # Add telemetry overlay if drone is active
         if self.drone:
@@ -290,12 +437,100 @@ class EdgeDetectionPipeline:
         
         return annotated
     
+    def _locate(self):
+        """
+        Current position for a detection report
+        
+        Priority: Flight Controller (Drone) GPS -> Local GPS Module -> IP Fallback
+        
+        Returns:
+            (latitude, longitude, gps_meta): coordinates are None if no source has a fix
+        """
+        chosen_lat, chosen_lon = None, None
+        gps_meta = {}
+
+        # 1. Try Flight Controller (user's only GPS)
+        if self.drone:
+            telemetry = self.drone.get_telemetry()
+            # Ensure we have a valid coordinate (not 0.0)
+            if telemetry and 'latitude' in telemetry and abs(telemetry['latitude']) > 1:
+                chosen_lat, chosen_lon = telemetry['latitude'], telemetry['longitude']
+                gps_meta = {
+                    'gps_timestamp': telemetry.get('timestamp', datetime.now()).isoformat(),
+                    'gps_quality': 2,
+                    'altitude': telemetry.get('altitude', 0),
+                    'heading': telemetry.get('heading', 0),
+                    'location_source': 'flight_controller'
+                }
+                logger.debug(f"Location from Flight Controller: {chosen_lat}, {chosen_lon}")
+
+        # 2. Try Local GPS module if FC not available
+        if chosen_lat is None and self.gps:
+            gps_lat, gps_lon, gps_ts, gps_quality = self.gps.get_coordinates()
+            if gps_lat is not None and gps_quality >= config.GPS_MIN_QUALITY:
+                chosen_lat, chosen_lon = gps_lat, gps_lon
+                gps_meta = {
+                    'gps_timestamp': gps_ts, 
+                    'gps_quality': gps_quality,
+                    'location_source': 'local_gps_module'
+                }
+                logger.debug(f"Location from Local GPS Module: {chosen_lat}, {chosen_lon}")
+
+        # 3. Fallback to IP geolocation
+        if chosen_lat is None and config.FALLBACK_GEOLOCATION:
+            chosen_lat, chosen_lon = get_geolocation()
+            gps_meta = {'location_source': 'ip_geolocation'}
+            logger.debug(f"Location from IP Fallback: {chosen_lat}, {chosen_lon}")
+
+        return chosen_lat, chosen_lon, gps_meta
+    
+    def _report_frame(self, annotated_frame, detections):
+        """Save one annotated frame, locate it once, and queue a report per detection"""
+        img_path = save_image(annotated_frame, config.DETECTIONS_DIR, "pothole", writer=self._image_writer)
+        chosen_lat, chosen_lon, gps_meta = self._locate()
+
+        for det in detections:
+            payload = create_detection_payload(
+                {
+                    'class': det['class_name'],
+                    'severity': det['severity'],
+                    'confidence': det['confidence'],
+                    'image_path': img_path,
+                },
+                chosen_lat or 0.0, chosen_lon or 0.0
+            )
+
+            if gps_meta:
+                payload.update(gps_meta)
+
+            logger.info(f"Pothole detected at ({chosen_lat}, {chosen_lon}) - Severity: {det['severity']}")
+
+            # Send to ground station / database API
+            if self.reporter is not None:
+                self.reporter.submit(payload)
+    
+    def _report_worker(self):
+        """
+        Report stage: JPEG encode/write and GPS/IP lookups overlap with detection
+        
+        Fed by run() through a small bounded queue; None stops it. BatchedReporter does
+        the HTTP uploads on its own thread.
+        """
+        while True:
+            item = self._report_queue.get()
+            if item is None:
+                return
+            try:
+                self._report_frame(*item)
+            except Exception as e:
+                logger.error(f"Failed to report detections: {e}")
+    
     def run(self, source=0, output_video=None):
         """Run detection pipeline on video source"""
         logger.info(f"Starting detection on source: {source}")
         
         # Open video source
-        vs = VideoStream(source).start()
+        vs = VideoStream(source, frame_skip=config.DETECTION_FRAME_SKIP).start()
         if not vs.cap.isOpened():
             logger.error(f"Failed to open video source: {source}")
             return
@@ -304,6 +539,8 @@ class EdgeDetectionPipeline:
         frame_width = int(vs.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         frame_height = int(vs.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         fps = int(vs.cap.get(cv2.CAP_PROP_FPS)) or 20
+        # Skipped frames are never decoded, so the written video runs at the processed rate
+        output_fps = fps / vs.frame_skip
         
         logger.info(f"Video: {frame_width}x{frame_height} @ {fps} FPS")
         
@@ -311,7 +548,12 @@ class EdgeDetectionPipeline:
         writer = None
         if output_video and config.SAVE_DETECTIONS:
             fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(output_video, fourcc, fps, (frame_width, frame_height))
+            writer = cv2.VideoWriter(output_video, fourcc, output_fps, (frame_width, frame_height))
+        
+        self._report_queue = queue.Queue(maxsize=config.EDGE_REPORT_QUEUE_SIZE)
+        self._image_writer = AsyncFileWriter()
+        report_thread = threading.Thread(target=self._report_worker, name='edge-report', daemon=True)
+        report_thread.start()
         
         try:
             while True:
@@ -323,66 +565,13 @@ class EdgeDetectionPipeline:
                 # Process frame
                 annotated_frame, detections = self.process_frame(frame)
                 
-                # Save detection images and prepare API payloads
+                # Saving, geolocation and upload run in the report stage, off the frame loop;
+                # the frame is copied because VideoStream reuses its buffer on the next read
                 if detections and config.SAVE_DETECTIONS:
-                    for det in detections:
-                        img_path = save_image(annotated_frame, config.DETECTIONS_DIR, "pothole")
-
-                        # Priority: Flight Controller (Drone) GPS -> Local GPS Module -> IP Fallback
-                        chosen_lat, chosen_lon = None, None
-                        gps_meta = {}
-
-                        # 1. Try Flight Controller (user's only GPS)
-                        if self.drone:
-                            telemetry = self.drone.get_telemetry()
-                            # Ensure we have a valid coordinate (not 0.0)
-                            if telemetry and 'latitude' in telemetry and abs(telemetry['latitude']) > 1:
-                                chosen_lat, chosen_lon = telemetry['latitude'], telemetry['longitude']
-                                gps_meta = {
-                                    'gps_timestamp': telemetry.get('timestamp', datetime.now()).isoformat(),
-                                    'gps_quality': 2,
-                                    'altitude': telemetry.get('altitude', 0),
-                                    'heading': telemetry.get('heading', 0),
-                                    'location_source': 'flight_controller'
-                                }
-                                logger.debug(f"Location from Flight Controller: {chosen_lat}, {chosen_lon}")
-
-                        # 2. Try Local GPS module if FC not available
-                        if chosen_lat is None and self.gps:
-                            gps_lat, gps_lon, gps_ts, gps_quality = self.gps.get_coordinates()
-                            if gps_lat is not None and gps_quality >= config.GPS_MIN_QUALITY:
-                                chosen_lat, chosen_lon = gps_lat, gps_lon
-                                gps_meta = {
-                                    'gps_timestamp': gps_ts, 
-                                    'gps_quality': gps_quality,
-                                    'location_source': 'local_gps_module'
-                                }
-                                logger.debug(f"Location from Local GPS Module: {chosen_lat}, {chosen_lon}")
-
-                        # 3. Fallback to IP geolocation
-                        if chosen_lat is None and config.FALLBACK_GEOLOCATION:
-                            chosen_lat, chosen_lon = get_geolocation()
-                            gps_meta = {'location_source': 'ip_geolocation'}
-                            logger.debug(f"Location from IP Fallback: {chosen_lat}, {chosen_lon}")
-
-                        payload = create_detection_payload(
-                            {
-                                'class': det['class_name'],
-                                'severity': det['severity'],
-                                'confidence': det['confidence'],
-                                'image_path': img_path,
-                            },
-                            chosen_lat or 0.0, chosen_lon or 0.0
-                        )
-
-                        if gps_meta:
-                            payload.update(gps_meta)
-
-                        logger.info(f"Pothole detected at ({chosen_lat}, {chosen_lon}) - Severity: {det['severity']}")
-
-                        # Send to ground station / database API
-                        if config.ENABLE_CLOUD_UPLOAD:
-                            self._send_to_api(payload)
+                    try:
+                        self._report_queue.put_nowait((annotated_frame.copy(), detections))
+                    except queue.Full:
+                        logger.debug("Report stage busy, dropping detections from this frame")
                 
                 # Write to output video
                 if writer:
@@ -396,34 +585,67 @@ class EdgeDetectionPipeline:
         
         finally:
             vs.stop()
+            # Let the report stage finish queued frames before the reporter is closed
+            self._report_queue.put(None)
+            report_thread.join(timeout=10)
+            self._image_writer.close()
             if writer:
                 writer.release()
             cv2.destroyAllWindows()
             if self.gps:
                 self.gps.close()
+            if self.reporter is not None:
+                self.reporter.close()
 
-    def _send_to_api(self, payload):
-        """Send detection payload to ground station database/API"""
-        try:
-            import requests
-            response = requests.post(config.API_URL, json=payload, timeout=config.API_TIMEOUT)
-            if response.status_code == 200 or response.status_code == 201:
-                logger.info("✓ Detection data synced to ground database")
-            else:
-                logger.warning(f"Failed to sync with ground API: {response.status_code}")
-        except Exception as e:
-            logger.error(f"Sync connection failed: {e}")
+
+def _open_capture(src):
+    """
+    Open a capture that holds at most one queued frame, so reads return the newest frame
+    
+    Local cameras use V4L2 with a 1-frame buffer and MJPEG (cheaper to decode than YUYV
+    on the Pi); RTSP streams use a GStreamer appsink that drops stale buffers. Anything
+    else, or a backend OpenCV was not built with, falls back to the default capture.
+    """
+    if isinstance(src, int) and sys.platform.startswith('linux'):
+        cap = cv2.VideoCapture(src, cv2.CAP_V4L2)
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            return cap
+    elif isinstance(src, str) and src.startswith('rtsp://'):
+        pipeline = (f"rtspsrc location={src} latency=0 ! decodebin ! videoconvert ! "
+                    "video/x-raw,format=BGR ! appsink max-buffers=1 drop=true sync=false")
+        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        if cap.isOpened():
+            return cap
+    
+    cap = cv2.VideoCapture(src)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
 
 
 class VideoStream:
-    """Simple threaded video capture to reduce frame latency."""
-    def __init__(self, src=0):
+    """
+    Simple threaded video capture to reduce frame latency.
+    
+    Frames are decoded into three reused buffers (triple buffering): the capture thread
+    fills its write slot and swaps it with the ready slot, and read() swaps the ready
+    slot with the one the consumer held. Neither side ever touches the other's buffer,
+    so no frame is copied or allocated per read.
+    """
+    def __init__(self, src=0, frame_skip=1):
         self.src = src
-        self.cap = cv2.VideoCapture(src)
+        self.cap = _open_capture(src)
+        # Only every frame_skip-th frame is decoded; the others are grabbed and dropped
+        self.frame_skip = max(1, int(frame_skip))
+        self._grabbed = 0
         self.stopped = False
-        self.frame = None
         self.lock = threading.Lock()
         self.thread = None
+        # Slot roles are indices into _buffers; None entries are allocated by the first decode
+        self._buffers = [None, None, None]
+        self._write_idx, self._ready_idx, self._read_idx = 0, 1, 2
+        self._fresh = False
 
     def start(self):
         if self.thread is None:
@@ -434,7 +656,13 @@ class VideoStream:
     def update(self):
         while not self.stopped:
             try:
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.grab(), None
+                if ret:
+                    self._grabbed += 1
+                    if (self._grabbed - 1) % self.frame_skip:
+                        continue
+                    # Decodes into the write slot in place; a new array is returned if the size changed
+                    ret, frame = self.cap.retrieve(self._buffers[self._write_idx])
             except Exception:
                 ret, frame = False, None
 
@@ -443,11 +671,22 @@ class VideoStream:
                 continue
 
             with self.lock:
-                self.frame = frame
+                self._buffers[self._write_idx] = frame
+                self._write_idx, self._ready_idx = self._ready_idx, self._write_idx
+                self._fresh = True
 
     def read(self):
+        """Take the latest frame, or None if no new frame arrived since the last read.
+
+        The returned buffer is reused: it stays valid, and may be drawn on, only until the
+        next read(). Copy it to keep it longer.
+        """
         with self.lock:
-            return self.frame.copy() if self.frame is not None else None
+            if not self._fresh:
+                return None
+            self._read_idx, self._ready_idx = self._ready_idx, self._read_idx
+            self._fresh = False
+            return self._buffers[self._read_idx]
 
     def stop(self):
         self.stopped = True
@@ -13,7 +13,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 import config
-from src.utils import setup_logger
+from src.utils import setup_logger, setup_dnn_target
 from src.database import DetectionDatabase
 
 logger = setup_logger(__name__)
@@ -34,6 +34,7 @@ class DroneDetector:
         self.drone = drone_controller
         self.yolo_net = yolo_net
         self.classifier = classifier
+        self.output_layers = None
         self.db = DetectionDatabase()
         
         # Load models if not provided
@@ -52,12 +53,8 @@ class DroneDetector:
                 logger.info("Loading YOLO model for drone detection...")
                 self.yolo_net = cv2.dnn.readNetFromDarknet(config.YOLOV4_CFG, config.YOLOV4_WEIGHTS)
                 
-                if config.USE_CUDA:
-                    self.yolo_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-                    self.yolo_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-                else:
-                    self.yolo_net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
-                    self.yolo_net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+                img_size = config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO
+                setup_dnn_target(self.yolo_net, img_size)
                 
                 logger.info("✓ YOLO model loaded")
             else:
@@ -88,12 +85,13 @@ class DroneDetector:
             blob = cv2.dnn.blobFromImage(frame, 1/255.0, (img_size, img_size), swapRB=True, crop=False)
             self.yolo_net.setInput(blob)
             
-            # Get output layers
-            layer_names = self.yolo_net.getLayerNames()
-            output_layers = [layer_names[i - 1] for i in self.yolo_net.getUnconnectedOutLayers()]
+            # Get output layers (resolved once per network)
+            if self.output_layers is None:
+                layer_names = self.yolo_net.getLayerNames()
+                self.output_layers = tuple(layer_names[i - 1] for i in np.asarray(self.yolo_net.getUnconnectedOutLayers()).flatten())
             
             # Forward pass
-            outputs = self.yolo_net.forward(output_layers)
+            outputs = self.yolo_net.forward(self.output_layers)
             
             # Process detections
             boxes = []
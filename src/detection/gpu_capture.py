@@ -0,0 +1,85 @@
+"""
+ASTROPATH GPU Capture Module (gpu_capture.py)
+Hardware (NVDEC) video decoding for files and RTSP streams via cv2.cudacodec
+Keeps the decoded frame on the GPU so TensorRT can be fed without a host->device copy
+
+Requirements:
+  - OpenCV built with CUDA and the cudacodec module (NVIDIA Video Codec SDK)
+"""
+
+import logging
+import cv2
+
+logger = logging.getLogger(__name__)
+
+NVDEC_AVAILABLE = hasattr(cv2, 'cudacodec') and hasattr(cv2, 'cuda')
+
+
+class NvdecCapture:
+    """
+    cv2.VideoCapture-compatible reader backed by cv2.cudacodec
+    read() returns the host frame for drawing/streaming; the device copy of the
+    same frame is kept in `gpu_frame` for GPU-side preprocessing.
+    """
+
+    def __init__(self, source):
+        """
+        Open a video file or network stream with the hardware decoder
+
+        Args:
+            source (str): File path or RTSP/HTTP URL (webcam indices are not supported)
+        """
+        if not NVDEC_AVAILABLE:
+            raise RuntimeError("OpenCV was built without cudacodec")
+
+        self.reader = cv2.cudacodec.createVideoReader(str(source))
+        self.gpu_frame = None
+        self._gpu_bgr = cv2.cuda_GpuMat()
+        logger.info(f"NVDEC reader opened: {source}")
+
+    def isOpened(self):
+        return self.reader is not None
+
+    def read(self):
+        """
+        Decode the next frame on the GPU
+
+        Returns:
+            (success, frame): frame is a BGR np.ndarray downloaded from the GPU
+        """
+        ok, gpu_frame = self.reader.nextFrame()
+        if not ok:
+            self.gpu_frame = None
+            return False, None
+
+        # NVDEC hands back BGRA by default
+        if gpu_frame.channels() == 4:
+            cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR, self._gpu_bgr)
+            gpu_frame = self._gpu_bgr
+
+        self.gpu_frame = gpu_frame
+        return True, gpu_frame.download()
+
+    def release(self):
+        self.reader = None
+        self.gpu_frame = None
+
+
+def open_capture(source, use_gpu=False):
+    """
+    Open a capture source, preferring NVDEC for files/streams when requested
+
+    Args:
+        source: Webcam index, file path or stream URL
+        use_gpu (bool): Try hardware decoding first
+
+    Returns:
+        NvdecCapture or cv2.VideoCapture
+    """
+    if use_gpu and NVDEC_AVAILABLE and isinstance(source, str):
+        try:
+            return NvdecCapture(source)
+        except Exception as e:
+            logger.warning(f"NVDEC unavailable for {source}, using cv2.VideoCapture: {e}")
+
+    return cv2.VideoCapture(source)
@@ -0,0 +1,86 @@
+"""
+ASTROPATH OpenVINO Engine Module (openvino_engine.py)
+CPU inference for YOLOv4-tiny through OpenVINO (oneDNN kernels, AVX-512/VNNI where available)
+Drop-in replacement for cv2.dnn forward passes when no CUDA device is present
+
+Requirements:
+  - openvino >= 2022.1
+  - YOLOv4-tiny exported to OpenVINO IR (.xml + .bin)
+"""
+
+import os
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from openvino import Core, AsyncInferQueue
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    try:
+        from openvino.runtime import Core, AsyncInferQueue
+        OPENVINO_AVAILABLE = True
+    except ImportError:
+        Core = None
+        AsyncInferQueue = None
+        OPENVINO_AVAILABLE = False
+
+
+class OpenVINOEngine:
+    """
+    Compiled OpenVINO model with an async request pool for batches of frames
+    Outputs are returned in the same (N, 5 + num_classes) layout as cv2.dnn YOLO layers
+    """
+
+    def __init__(self, xml_path, device='CPU'):
+        """
+        Compile an OpenVINO IR model
+
+        Args:
+            xml_path (str): Path to the IR .xml (weights .bin alongside)
+            device (str): OpenVINO device name
+        """
+        if not OPENVINO_AVAILABLE:
+            raise RuntimeError("OpenVINO not installed")
+
+        if not os.path.exists(xml_path):
+            raise FileNotFoundError(f"OpenVINO IR not found: {xml_path}")
+
+        core = Core()
+        self.compiled = core.compile_model(xml_path, device, {
+            'PERFORMANCE_HINT': 'THROUGHPUT',
+            'INFERENCE_NUM_THREADS': os.cpu_count(),
+        })
+
+        self.num_outputs = len(self.compiled.outputs)
+        _, _, self.input_h, self.input_w = (int(d) for d in self.compiled.input(0).shape)
+
+        # One request per CPU stream chosen by the THROUGHPUT hint
+        self.queue = AsyncInferQueue(self.compiled)
+        self.queue.set_callback(self._collect)
+
+        logger.info(f"OpenVINO model compiled: {xml_path} on {device} ({len(self.queue)} infer requests)")
+
+    def _collect(self, request, userdata):
+        results, index = userdata
+        # Copy out: the request's output buffers are reused by the next job
+        outputs = [request.get_output_tensor(i).data for i in range(self.num_outputs)]
+        results[index] = [out.reshape(-1, out.shape[-1]).copy() for out in outputs]
+
+    def infer_batch(self, blobs):
+        """
+        Run several single-image NCHW blobs concurrently across the request pool
+
+        Returns:
+            List (one per blob) of output-array lists
+        """
+        results = [None] * len(blobs)
+        for index, blob in enumerate(blobs):
+            self.queue.start_async({0: blob}, (results, index))
+        self.queue.wait_all()
+        return results
+
+    def infer(self, blob):
+        """Run inference on one NCHW blob and return its list of output arrays"""
+        return self.infer_batch([blob])[0]
@@ -0,0 +1,276 @@
+"""
+ASTROPATH TensorRT Engine Module (tensorrt_engine.py)
+FP16 TensorRT runtime for YOLOv4-tiny on NVIDIA GPUs (Jetson / Volta+)
+Drop-in replacement for cv2.dnn forward passes: takes an NCHW blob, returns YOLO output arrays
+
+Requirements:
+  - TensorRT 8.x Python bindings (tensorrt)
+  - PyCUDA (pycuda)
+  - trtexec on PATH (only needed once, to build the engine from ONNX)
+"""
+
+import os
+import shutil
+import subprocess
+import logging
+from contextlib import contextmanager
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tensorrt as trt
+    import pycuda.driver as cuda
+    TENSORRT_AVAILABLE = True
+except ImportError:
+    trt = None
+    cuda = None
+    TENSORRT_AVAILABLE = False
+
+
+def build_engine(onnx_path, engine_path, fp16=True, workspace_mb=2048):
+    """
+    Build a serialized TensorRT engine from an ONNX model using trtexec
+
+    Args:
+        onnx_path (str): Path to yolov4-tiny ONNX export
+        engine_path (str): Output path for the serialized engine
+        fp16 (bool): Enable FP16 kernels (Tensor Cores)
+        workspace_mb (int): Builder workspace size in MB
+
+    Returns:
+        bool: True if the engine file was written
+    """
+    trtexec = shutil.which('trtexec')
+    if trtexec is None:
+        logger.warning("trtexec not found on PATH. Cannot build TensorRT engine.")
+        return False
+
+    cmd = [trtexec, f"--onnx={onnx_path}", f"--saveEngine={engine_path}", f"--workspace={workspace_mb}"]
+    if fp16:
+        cmd.append("--fp16")
+
+    logger.info(f"Building TensorRT engine (one-time): {' '.join(cmd)}")
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        logger.error(f"trtexec failed: {result.stderr.decode(errors='replace')[-500:]}")
+        return False
+
+    return os.path.exists(engine_path)
+
+
+class TensorRTEngine:
+    """
+    Serialized TensorRT engine with pre-allocated pinned host and device buffers
+    Outputs are returned in the same (N, 5 + num_classes) layout as cv2.dnn YOLO layers
+
+    Two slots (execution context + stream + buffers) allow double buffering via
+    submit()/collect(): the next frame is preprocessed while the previous one runs.
+
+    CUDA contexts are current per thread, so the engine holds device 0's primary context
+    (the one cv2.cuda also uses) and pushes it around every call that touches the GPU;
+    the engine can be built on one thread and used from request or broker threads.
+    """
+
+    NUM_SLOTS = 2
+
+    def __init__(self, engine_path, onnx_path=None):
+        """
+        Load (and build if needed) a TensorRT engine
+
+        Args:
+            engine_path (str): Path to serialized .engine file
+            onnx_path (str): ONNX model used to build the engine when it is missing
+        """
+        if not TENSORRT_AVAILABLE:
+            raise RuntimeError("TensorRT/PyCUDA not installed")
+
+        if not os.path.exists(engine_path):
+            if not (onnx_path and os.path.exists(onnx_path) and build_engine(onnx_path, engine_path)):
+                raise FileNotFoundError(f"TensorRT engine not found: {engine_path}")
+
+        cuda.init()
+        self.cuda_ctx = cuda.Device(0).retain_primary_context()
+
+        with self._cuda():
+            self.trt_logger = trt.Logger(trt.Logger.WARNING)
+            with open(engine_path, 'rb') as f, trt.Runtime(self.trt_logger) as runtime:
+                self.engine = runtime.deserialize_cuda_engine(f.read())
+
+            if self.engine is None:
+                raise RuntimeError(f"Failed to deserialize TensorRT engine: {engine_path}")
+
+            # Allocate buffers once; reused for every frame
+            self.slots = [self._allocate_slot() for _ in range(self.NUM_SLOTS)]
+        self._next_slot = 0
+
+        # Slot 0 serves the synchronous infer*() calls
+        slot = self.slots[0]
+        self.context = slot['context']
+        self.stream = slot['stream']
+        self.bindings = slot['bindings']
+        self.inputs = slot['inputs']
+        self.outputs = slot['outputs']
+
+        self.input_shape = self.inputs[0]['shape']
+
+        # Staging buffer so frames are preprocessed straight into the pinned NCHW input
+        _, _, self.input_h, self.input_w = self.input_shape
+        self._resized = np.empty((self.input_h, self.input_w, 3), dtype=np.uint8)
+        self._gpu_planes = None  # Device-side views of the input binding, built on first GPU frame
+
+        logger.info(f"TensorRT engine loaded: {engine_path} (input {self.input_shape})")
+
+    @contextmanager
+    def _cuda(self):
+        """Make the engine's CUDA context current on the calling thread for the block"""
+        self.cuda_ctx.push()
+        try:
+            yield
+        finally:
+            cuda.Context.pop()
+
+    def _allocate_slot(self):
+        """Create an execution context, stream and pinned host/device buffers for every binding"""
+        slot = {
+            'context': self.engine.create_execution_context(),
+            'stream': cuda.Stream(),
+            'bindings': [],
+            'inputs': [],
+            'outputs': [],
+        }
+        for binding in self.engine:
+            shape = tuple(self.engine.get_binding_shape(binding))
+            dtype = trt.nptype(self.engine.get_binding_dtype(binding))
+            host_mem = cuda.pagelocked_empty(trt.volume(shape), dtype)
+            device_mem = cuda.mem_alloc(host_mem.nbytes)
+            slot['bindings'].append(int(device_mem))
+            entry = {'host': host_mem, 'device': device_mem, 'shape': shape}
+            if self.engine.binding_is_input(binding):
+                slot['inputs'].append(entry)
+            else:
+                slot['outputs'].append(entry)
+
+        inp = slot['inputs'][0]
+        slot['input_chw'] = inp['host'].reshape(inp['shape'])[0]
+        return slot
+
+    def preprocess(self, frame, slot=0):
+        """
+        Resize, BGR->RGB and scale a frame to 0-1 directly into a slot's pinned input buffer
+
+        Equivalent to cv2.dnn.blobFromImage(frame, 1/255.0, size, swapRB=True) without
+        allocating a new blob per frame.
+        """
+        cv2.resize(frame, (self.input_w, self.input_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._resized)
+        np.multiply(self._resized.transpose(2, 0, 1), 1 / 255.0, out=self.slots[slot]['input_chw'], casting='unsafe')
+
+    def infer_frame(self, frame):
+        """Preprocess a BGR frame in place and run inference on it"""
+        self.preprocess(frame)
+        return self.infer()
+
+    def preprocess_gpu(self, gpu_frame):
+        """
+        GPU-side equivalent of preprocess() for frames decoded by NVDEC
+
+        Resizes, converts and scales a cv2.cuda_GpuMat, then copies each channel
+        plane straight into the engine's device input binding.
+        """
+        with self._cuda():
+            self._preprocess_gpu(gpu_frame)
+
+    def _preprocess_gpu(self, gpu_frame):
+        if self._gpu_planes is None:
+            plane_bytes = self.input_h * self.input_w * np.dtype(np.float32).itemsize
+            base = int(self.inputs[0]['device'])
+            self._gpu_planes = [
+                cv2.cuda.createGpuMatFromCudaMemory(self.input_h, self.input_w, cv2.CV_32FC1, base + c * plane_bytes)
+                for c in range(3)
+            ]
+            self._gpu_resized = cv2.cuda_GpuMat()
+            self._gpu_float = cv2.cuda_GpuMat()
+
+        cv2.cuda.resize(gpu_frame, (self.input_w, self.input_h), self._gpu_resized, interpolation=cv2.INTER_LINEAR)
+        cv2.cuda.cvtColor(self._gpu_resized, cv2.COLOR_BGR2RGB, self._gpu_resized)
+        self._gpu_resized.convertTo(cv2.CV_32F, 1 / 255.0, self._gpu_float)
+        for plane, dst in zip(cv2.cuda.split(self._gpu_float), self._gpu_planes):
+            plane.copyTo(dst)
+
+    def infer_gpu_frame(self, gpu_frame):
+        """Preprocess a GpuMat on the device and run inference without a host->device copy"""
+        with self._cuda():
+            self._preprocess_gpu(gpu_frame)
+            self._enqueue(0, copy_input=False)
+            return self._collect(0)
+
+    def infer(self, blob=None, on_device=False):
+        """
+        Run inference on a preprocessed NCHW blob
+
+        Args:
+            blob: np.ndarray matching the engine input shape, or None if the
+                input buffer was already filled by preprocess()
+            on_device (bool): Input binding was already filled on the GPU by
+                preprocess_gpu(), skip the host->device copy
+
+        Returns:
+            List of output arrays, each reshaped to (N, 5 + num_classes)
+        """
+        if blob is not None:
+            np.copyto(self.inputs[0]['host'], blob.ravel())
+
+        with self._cuda():
+            self._enqueue(0, copy_input=not on_device)
+            return self._collect(0)
+
+    def _enqueue(self, slot, copy_input=True):
+        """Queue input copy, inference and output copies on a slot's stream without waiting"""
+        slot = self.slots[slot]
+        stream = slot['stream']
+        if copy_input:
+            inp = slot['inputs'][0]
+            cuda.memcpy_htod_async(inp['device'], inp['host'], stream)
+
+        slot['context'].execute_async_v2(bindings=slot['bindings'], stream_handle=stream.handle)
+
+        for out in slot['outputs']:
+            cuda.memcpy_dtoh_async(out['host'], out['device'], stream)
+
+    def submit(self, frame):
+        """
+        Preprocess a frame into the next free slot and start inference asynchronously
+
+        At most NUM_SLOTS frames may be in flight; collect() each handle before
+        submitting that many more frames.
+
+        Returns:
+            int: Slot handle to pass to collect()
+        """
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.NUM_SLOTS
+
+        with self._cuda():
+            # The slot's previous work must be done before its pinned input is overwritten
+            self.slots[slot]['stream'].synchronize()
+            self.preprocess(frame, slot)
+            self._enqueue(slot)
+        return slot
+
+    def collect(self, slot):
+        """
+        Wait for a slot's inference and return its outputs
+
+        Returns:
+            List of output arrays, each reshaped to (N, 5 + num_classes); they are
+            views of the slot's pinned buffers and are overwritten when it is reused
+        """
+        with self._cuda():
+            return self._collect(slot)
+
+    def _collect(self, slot):
+        slot = self.slots[slot]
+        slot['stream'].synchronize()
+        return [out['host'].reshape(-1, out['shape'][-1]) for out in slot['outputs']]
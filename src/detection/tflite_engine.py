@@ -0,0 +1,87 @@
+"""
+ASTROPATH TFLite Engine Module (tflite_engine.py)
+Full-integer YOLOv4-tiny inference through TFLite, on a Coral Edge TPU when one is attached
+Drop-in replacement for cv2.dnn forward passes on Raspberry Pi class devices
+
+Requirements:
+  - tflite_runtime (or tensorflow)
+  - INT8 models built by tools/build_yolo_edge.py (tflite / edgetpu targets)
+  - libedgetpu (Edge TPU only)
+"""
+
+import os
+import logging
+import cv2
+import numpy as np
+
+from src.utils import load_tflite_interpreter
+
+logger = logging.getLogger(__name__)
+
+
+class TFLiteYOLOEngine:
+    """
+    INT8 TFLite YOLO model, compiled for the Edge TPU or run on the CPU
+    Outputs are returned in the same (N, 5 + num_classes) layout as cv2.dnn YOLO layers
+    """
+
+    def __init__(self, tflite_path, edgetpu_path=None, edgetpu_delegate='libedgetpu.so.1'):
+        """
+        Load the Edge TPU model if it and its delegate are available, else the CPU model
+
+        Args:
+            tflite_path (str): Full-integer TFLite model (CPU)
+            edgetpu_path (str): edgetpu_compiler output, or None to stay on the CPU
+            edgetpu_delegate (str): Edge TPU delegate library
+        """
+        self.interpreter = None
+        self.device = 'CPU'
+
+        if edgetpu_path and os.path.exists(edgetpu_path):
+            try:
+                self.interpreter = load_tflite_interpreter(edgetpu_path, delegate=edgetpu_delegate)
+                self.device = 'Edge TPU'
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.warning(f"Edge TPU unavailable ({e}). Using the CPU TFLite model.")
+
+        if self.interpreter is None:
+            if not os.path.exists(tflite_path):
+                raise FileNotFoundError(f"TFLite model not found: {tflite_path}")
+            self.interpreter = load_tflite_interpreter(tflite_path)
+
+        self.input = self.interpreter.get_input_details()[0]
+        self.outputs = self.interpreter.get_output_details()
+        _, self.input_h, self.input_w, _ = self.input['shape']
+
+        # Pixel value -> model input, so quantizing a frame is one table lookup
+        levels = np.arange(256, dtype=np.float32) / 255.0
+        scale, zero_point = self.input['quantization']
+        if self.input['dtype'] == np.float32:
+            self._lut = levels
+        else:
+            info = np.iinfo(self.input['dtype'])
+            self._lut = np.clip(np.rint(levels / scale + zero_point), info.min, info.max).astype(self.input['dtype'])
+        self._resized = np.empty((self.input_h, self.input_w, 3), dtype=np.uint8)
+
+        path = edgetpu_path if self.device == 'Edge TPU' else tflite_path
+        logger.info(f"TFLite YOLO loaded: {path} on {self.device} (input {tuple(self.input['shape'])})")
+
+    def infer_frame(self, frame):
+        """Resize and quantize a BGR frame into the input tensor, run it, return dequantized outputs"""
+        cv2.resize(frame, (self.input_w, self.input_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._resized)
+
+        buffer = self.interpreter.tensor(self.input['index'])()
+        np.take(self._lut, self._resized, out=buffer[0])
+        # invoke() refuses to run while a view of an internal tensor is alive
+        del buffer
+        self.interpreter.invoke()
+
+        results = []
+        for details in self.outputs:
+            out = self.interpreter.get_tensor(details['index']).astype(np.float32)
+            scale, zero_point = details['quantization']
+            if scale:
+                out = (out - zero_point) * scale
+            results.append(out.reshape(-1, out.shape[-1]))
+        return results
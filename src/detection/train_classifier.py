@@ -233,8 +233,15 @@ class PotholeClassifierTrainer:
         self.model.save(output_path)
         logger.info(f"Model saved to: {output_path}")
     
-    def convert_to_tflite(self, output_path=config.CLASSIFIER_TFLITE):
-        """Convert model to TensorFlow Lite for Raspberry Pi deployment"""
+    def convert_to_tflite(self, output_path=config.CLASSIFIER_TFLITE, representative_images=None):
+        """
+        Convert model to TensorFlow Lite for Raspberry Pi deployment
+        
+        Args:
+            output_path: Where to write the .tflite file
+            representative_images: Optional uint8 RGB images used to calibrate full
+                INT8 quantization (uint8 input, int8 kernels); dynamic-range otherwise
+        """
         if self.model is None:
             logger.error("Model not trained")
             return
@@ -244,6 +251,17 @@ class PotholeClassifierTrainer:
         converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
         converter.optimizations = [tf.lite.Optimize.DEFAULT]
         
+        if representative_images is not None and len(representative_images) > 0:
+            def representative_dataset():
+                for img in representative_images[:config.TFLITE_CALIBRATION_SAMPLES]:
+                    yield [img[np.newaxis].astype(np.float32) / 255.0]
+            
+            logger.info("Using full INT8 quantization")
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            converter.inference_input_type = tf.uint8
+            converter.inference_output_type = tf.uint8
+        
         tflite_model = converter.convert()
         
         ensure_dir_exists(os.path.dirname(output_path))
@@ -300,7 +318,7 @@ def main():
     
     # Convert to TFLite for Raspberry Pi
     if config.PI_OPTIMIZE:
-        trainer.convert_to_tflite()
+        trainer.convert_to_tflite(representative_images=X_train)
     
     logger.info("Training pipeline completed successfully!")
     logger.info(f"Model saved to: {config.CLASSIFIER_MODEL}")
@@ -117,7 +117,7 @@ class SystemDiagnostics:
             status["opencv_version"] = cv2.__version__
             
             # Try to load YOLO (Fast check)
-            if os.path.exists(config.YOLOV4_CFG) and os.path.exists(config.YOLOV4_WEIGHTS):
+            if config.MODEL_STATUS['yolo_cfg'].exists and config.MODEL_STATUS['yolo_weights'].exists:
                 net = cv2.dnn.readNetFromDarknet(config.YOLOV4_CFG, config.YOLOV4_WEIGHTS)
                 status["yolo_load"] = "PASSED"
                 
@@ -0,0 +1 @@
+"""ASTROPATH sensor fusion"""
@@ -0,0 +1,55 @@
+"""
+ASTROPATH JSON Provider Module (json_provider.py)
+orjson-backed Flask JSON provider shared by the web app, dashboard and citizen app
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson; responses are built from bytes without a str round-trip"""
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def dumpb(self, obj) -> bytes:
+        """Serialize straight to UTF-8 bytes (no str round-trip)"""
+        return orjson.dumps(obj, default=self.default, option=self.options)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.options),
+            mimetype=self.mimetype
+        )
+
+
+def dumpb(app, obj) -> bytes:
+    """Serialize obj to JSON bytes with the app's provider (orjson when installed)"""
+    provider = app.json
+    if isinstance(provider, OrjsonProvider):
+        return provider.dumpb(obj)
+    return provider.dumps(obj).encode('utf-8')
+
+
+def use_orjson(app):
+    """
+    Switch a Flask app's jsonify/get_json to orjson when it is installed
+
+    Returns:
+        bool: True if the orjson provider was installed
+    """
+    if orjson is None:
+        return False
+    app.json = OrjsonProvider(app)
+    return True
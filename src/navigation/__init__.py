@@ -0,0 +1 @@
+"""ASTROPATH navigation: GPS handling and drone control"""
@@ -22,6 +22,11 @@ Usage:
   ```
 """
 
+import os
+import re
+import mmap
+import select
+import struct
 import serial
 import pynmea2
 import time
@@ -33,6 +38,13 @@ import threading
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Complete position sentences we parse (GGA preferred, RMC fallback), found in the raw
+# receive buffer in one scan so other sentences and line noise are never split or decoded
+POSITION_SENTENCE = re.compile(rb'^\$G[PN](?:GGA|RMC),[^\n]*\n', re.MULTILINE)
+SELECT_INTERVAL = 0.05  # Max wait per select()/in_waiting poll while a line is incomplete
+SERIAL_READ_CHUNK = 4096  # Bytes per os.read() once select() reports data (several sentences)
+SERIAL_RX_BUFFER = 8192  # Driver receive buffer requested on Windows
+
 
 class GPSQuality:
     """GPS fix quality levels"""
@@ -47,6 +59,42 @@ class GPSQuality:
     SIMULATION = 8
 
 
+class FixCache:
+    """
+    Last known fix in a small memory-mapped file: lat, lon (float64) and fix time (ns, uint64).
+    
+    Reads and writes are plain memory copies, visible to every process mapping the
+    same file and kept across restarts.
+    """
+    
+    LAYOUT = struct.Struct('<ddQ')
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self.LAYOUT.size:
+                os.ftruncate(fd, self.LAYOUT.size)
+            self._mm = mmap.mmap(fd, self.LAYOUT.size)
+        finally:
+            os.close(fd)  # The mapping keeps the file open
+    
+    def write(self, lat: float, lon: float, ts_ns: Optional[int] = None):
+        """Store a fix (timestamp defaults to now)"""
+        self.LAYOUT.pack_into(self._mm, 0, lat, lon, ts_ns or time.time_ns())
+    
+    def read(self) -> Optional[Tuple[float, float, int]]:
+        """
+        Returns:
+            (lat, lon, ts_ns) or None if no fix has been stored yet
+        """
+        lat, lon, ts_ns = self.LAYOUT.unpack_from(self._mm, 0)
+        return (lat, lon, ts_ns) if ts_ns else None
+    
+    def close(self):
+        self._mm.close()
+
+
 class GPSHandler:
     """
     Manages real GPS module communication and coordinate extraction.
@@ -64,7 +112,8 @@ class GPSHandler:
                  baud: int = 9600,
                  timeout: float = 1.0,
                  max_retries: int = 20,
-                 min_sats: int = 4):
+                 min_sats: int = 4,
+                 cache_path: Optional[str] = None):
         """
         Initialize GPS handler.
         
@@ -77,6 +126,8 @@ class GPSHandler:
             timeout (float): Serial read timeout in seconds
             max_retries (int): Max attempts to read valid NMEA sentence per call
             min_sats (int): Minimum satellites for valid fix (3-4 typical)
+            cache_path (str): Optional FixCache file; its last fix seeds the cached
+                coordinates and every new fix is written back to it
         """
         self.port = port
         self.baud = baud
@@ -85,6 +136,8 @@ class GPSHandler:
         self.min_sats = min_sats
         
         self.ser = None
+        self._rx = bytearray()
+        self._use_select = False
         self.connected = False
         self.last_valid_lat = None
         self.last_valid_lon = None
@@ -94,6 +147,9 @@ class GPSHandler:
         self.connection_attempts = 0
         
         self._lock = threading.Lock()
+        self._fix_cache = None
+        if cache_path:
+            self._load_fix_cache(cache_path)
         self._connect()
     
     def _connect(self) -> bool:
@@ -118,6 +174,11 @@ class GPSHandler:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE
             )
+            self._rx.clear()
+            # select() works on serial fds on POSIX; Windows falls back to polling in_waiting
+            self._use_select = os.name == 'posix' and hasattr(self.ser, 'fileno')
+            if hasattr(self.ser, 'set_buffer_size'):
+                self.ser.set_buffer_size(rx_size=SERIAL_RX_BUFFER)
             self.connected = True
             self.connection_attempts += 1
             logger.info(f"GPS connected on {self.port} @ {self.baud} baud")
@@ -132,11 +193,61 @@ class GPSHandler:
             logger.error(f"GPS initialization error: {e}")
             return False
     
+    def _load_fix_cache(self, path: str):
+        """Open the shared fix cache and start from its last stored position"""
+        try:
+            self._fix_cache = FixCache(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"GPS fix cache unavailable ({path}): {e}")
+            return
+        
+        cached = self._fix_cache.read()
+        if cached is not None:
+            lat, lon, ts_ns = cached
+            self.last_valid_lat = lat
+            self.last_valid_lon = lon
+            self.last_valid_time = datetime.fromtimestamp(ts_ns / 1e9).strftime("%Y-%m-%d %H:%M:%S")
+            logger.info(f"Loaded cached GPS fix ({lat:.6f}, {lon:.6f}) from {self.last_valid_time}")
+    
+    def _read_sentence(self, deadline: float) -> bytes:
+        """
+        Return the next complete GGA/RMC sentence, reading whatever bytes are waiting.
+        
+        Never blocks on a partial line past `deadline` (time.monotonic()).
+        
+        Returns:
+            bytes: Sentence including its newline, or b'' if none arrived in time
+        """
+        while True:
+            match = POSITION_SENTENCE.search(self._rx)
+            if match:
+                sentence = match.group()
+                del self._rx[:match.end()]
+                return sentence
+            
+            # Nothing usable buffered: keep only a trailing partial line
+            del self._rx[:self._rx.rfind(b'\n') + 1]
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b''
+            
+            if self._use_select:
+                ready, _, _ = select.select([self.ser], [], [], min(remaining, SELECT_INTERVAL))
+                if ready:
+                    # pyserial already opens the tty in raw (non-canonical) mode, so one
+                    # read drains every buffered sentence without an in_waiting ioctl
+                    self._rx += os.read(self.ser.fileno(), SERIAL_READ_CHUNK)
+            elif self.ser.in_waiting:
+                self._rx += self.ser.read(self.ser.in_waiting)
+            else:
+                time.sleep(min(remaining, SELECT_INTERVAL))
+    
     def get_coordinates(self) -> Tuple[Optional[float], Optional[float], Optional[str], int]:
         """
         Read latest valid GPS coordinates from serial stream.
         
-        Attempts to read up to max_retries NMEA sentences quickly.
+        Attempts to read up to max_retries NMEA sentences within `timeout` seconds.
         Returns most recent valid GGA sentence (lat/lon/quality).
         Falls back to last known position if no fix available.
         
@@ -163,19 +274,15 @@ class GPSHandler:
                     logger.warning("GPS not connected and no cached coordinates")
                     return None, None, None, 0
             
-            # Try reading valid NMEA sentences
+            # Try reading valid NMEA sentences, spending at most `timeout` on this call
+            deadline = time.monotonic() + self.timeout
             for attempt in range(self.max_retries):
                 try:
-                    line = self.ser.readline()
+                    line = self._read_sentence(deadline)
                     if not line:
-                        continue
+                        break
                     
-                    line_str = line.decode('ascii', errors='replace').strip()
-                    
-                    # Look for position sentences (GGA preferred, RMC fallback)
-                    if not (line_str.startswith('$GPGGA') or line_str.startswith('$GNGGA') or
-                            line_str.startswith('$GPRMC') or line_str.startswith('$GNRMC')):
-                        continue
+                    line_str = line.rstrip(b'\r\n').decode('ascii', errors='replace')
                     
                     try:
                         msg = pynmea2.parse(line_str)
@@ -216,6 +323,8 @@ class GPSHandler:
                                 self.last_valid_time = ts_str
                                 self.last_quality = quality
                                 self.no_fix_count = 0
+                                if self._fix_cache is not None:
+                                    self._fix_cache.write(lat, lon)
                                 
                                 logger.debug(f"GPS Fix: ({lat:.6f}, {lon:.6f}) Quality={quality} Sats={num_sats}")
                                 return lat, lon, ts_str, quality
@@ -290,6 +399,9 @@ class GPSHandler:
                     logger.info("GPS connection closed")
                 except Exception as e:
                     logger.error(f"Error closing GPS: {e}")
+            if self._fix_cache is not None:
+                self._fix_cache.close()
+                self._fix_cache = None
     
     def __enter__(self):
         """Context manager support."""
@@ -4,6 +4,10 @@ Common functions for logging, geolocation, and file handling
 """
 
 import logging
+import logging.handlers
+import atexit
+import queue
+import threading
 import os
 import sys
 import numpy as np
@@ -12,37 +16,102 @@ from datetime import datetime
 import config
 
 # ==================== Logging Setup ====================
-def setup_logger(name=__name__):
-    """Configure logging with both file and console handlers"""
-    logger = logging.getLogger(name)
-    
-    if logger.handlers:
-        return logger
-    
-    # Set log level
-    log_level = getattr(logging, config.LOG_LEVEL)
-    logger.setLevel(log_level)
-    
-    # Create formatters
+
+# Shared queue + listener thread used when config.LOG_ASYNC is on
+_log_queue = None
+_log_listener = None
+_queued_loggers = []  # Loggers whose QueueHandler feeds _log_queue
+
+
+def _build_log_handlers(log_level):
+    """Create the console/file handlers selected in config"""
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
+    handlers = []
+    
     # Console handler
     if config.LOG_TO_CONSOLE:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(logging.StreamHandler(sys.stdout))
     
     # File handler
     if config.LOG_TO_FILE:
         os.makedirs(os.path.dirname(config.LOG_FILE), exist_ok=True)
-        file_handler = logging.FileHandler(config.LOG_FILE)
-        file_handler.setLevel(log_level)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(logging.FileHandler(config.LOG_FILE))
+    
+    for handler in handlers:
+        handler.setLevel(log_level)
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def _get_log_queue(log_level):
+    """Start the listener thread that writes records from every logger (once per process)"""
+    global _log_queue, _log_listener
+    if _log_queue is None:
+        _log_queue = queue.SimpleQueue()
+        _log_listener = logging.handlers.QueueListener(_log_queue, *_build_log_handlers(log_level),
+                                                       respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(flush_logs)
+    return _log_queue
+
+
+def _restart_log_listener():
+    """Threads do not survive fork(); give a forked child its own listener on the same queue"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener = logging.handlers.QueueListener(_log_queue, *_log_listener.handlers,
+                                                       respect_handler_level=True)
+        _log_listener.start()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_log_listener)
+
+
+def flush_logs():
+    """
+    Write out queued log records and stop the listener (call before exec/exit)
+    
+    Loggers are switched to the listener's handlers directly, so records logged afterwards
+    (e.g. by later atexit hooks) are still written instead of queued with no reader.
+    """
+    global _log_queue, _log_listener
+    if _log_listener is not None:
+        handlers = _log_listener.handlers
+        _log_listener.stop()
+        for logger in _queued_loggers:
+            for handler in list(logger.handlers):
+                if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is _log_queue:
+                    logger.removeHandler(handler)
+            for handler in handlers:
+                logger.addHandler(handler)
+        _queued_loggers.clear()
+        _log_listener = None
+        _log_queue = None
+
+
+def setup_logger(name=__name__):
+    """Configure logging with both file and console handlers"""
+    logger = logging.getLogger(name)
+    
+    if logger.handlers:
+        return logger
+    
+    # Set log level
+    log_level = getattr(logging, config.LOG_LEVEL)
+    logger.setLevel(log_level)
+    
+    if config.LOG_ASYNC:
+        # Callers only enqueue; formatting-to-disk happens on the listener thread
+        logger.addHandler(logging.handlers.QueueHandler(_get_log_queue(log_level)))
+        _queued_loggers.append(logger)
+    else:
+        for handler in _build_log_handlers(log_level):
+            logger.addHandler(handler)
     
     return logger
 
@@ -129,6 +198,144 @@ def fast_preprocess_for_yolo(frame, input_size):
     return padded
 
 
+def nms_boxes(boxes, scores, iou_threshold):
+    """
+    Greedy non-maximum suppression on (x, y, w, h) boxes, same result as cv2.dnn.NMSBoxes
+    without marshalling Python lists
+
+    Args:
+        boxes: (N, 4) array of x, y, w, h
+        scores: (N,) array of confidences (already score-thresholded)
+        iou_threshold: Boxes overlapping a kept box by more than this are dropped
+
+    Returns:
+        np.ndarray of kept indices, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float64)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        inter_w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        inter_h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = inter_w * inter_h
+        with np.errstate(divide='ignore', invalid='ignore'):
+            iou = inter / (areas[i] + areas[rest] - inter)
+
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.intp)
+
+
+def setup_dnn_target(net, input_size):
+    """
+    Put an OpenCV DNN net on the CUDA backend (or the CPU) and warm it up
+
+    With config.USE_CUDA the FP16 target (tensor cores) is tried first unless
+    config.CUDA_FP16 is off. OpenCV only rejects an unsupported target once a forward
+    pass runs, so each candidate gets one dummy inference and older GPUs fall back to
+    FP32 CUDA. The warm-up also takes the lazy allocation cost off the first real frame.
+
+    Returns:
+        int: The cv2.dnn target in use
+    """
+    if config.USE_CUDA:
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
+        targets = [cv2.dnn.DNN_TARGET_CUDA]
+        if config.CUDA_FP16:
+            targets.insert(0, cv2.dnn.DNN_TARGET_CUDA_FP16)
+    else:
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        targets = [cv2.dnn.DNN_TARGET_CPU]
+
+    blob = np.zeros((1, 3, input_size, input_size), dtype=np.float32)
+    output_names = net.getUnconnectedOutLayersNames()
+    for target in targets:
+        net.setPreferableTarget(target)
+        try:
+            net.setInput(blob)
+            net.forward(output_names)
+            return target
+        except cv2.error as e:
+            if target == targets[-1]:
+                raise
+            logger.warning(f"DNN target {target} unavailable ({e}), trying the next one")
+
+
+def load_tflite_interpreter(model_path, num_threads=None, delegate=None):
+    """
+    Load a TFLite interpreter from tflite_runtime, or full TensorFlow as a fallback
+
+    Tries the explicit XNNPACK delegate (config.TFLITE_XNNPACK_DELEGATE) first; recent
+    runtimes already apply the built-in XNNPACK delegate when it is not installed.
+    A delegate library passed explicitly (e.g. the Edge TPU's) is required instead:
+    failing to load it raises ValueError/OSError.
+    Raises ImportError if neither runtime is available.
+    """
+    try:
+        import tflite_runtime.interpreter as tflite
+    except ImportError:
+        from tensorflow import lite as tflite
+    load_delegate = getattr(tflite, 'load_delegate', None) or tflite.experimental.load_delegate
+
+    if delegate is not None:
+        delegates = [load_delegate(delegate)]
+    else:
+        try:
+            delegates = [load_delegate(config.TFLITE_XNNPACK_DELEGATE)]
+        except (OSError, ValueError):
+            delegates = None
+
+    interpreter = tflite.Interpreter(model_path=model_path, num_threads=num_threads or os.cpu_count(),
+                                     experimental_delegates=delegates)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def tflite_predict(interpreter, batch):
+    """
+    Run a TFLite classifier on a float32 0-1 input batch, handling quantized (INT8/UINT8) models
+
+    The input is quantized (or copied) straight into the interpreter's own input tensor
+    instead of through an astype() copy plus set_tensor().
+
+    Returns:
+        np.ndarray: Dequantized float32 output
+    """
+    # Tensor details don't change after allocate_tensors(); look them up once per interpreter
+    details = getattr(interpreter, '_astropath_io', None)
+    if details is None:
+        details = (interpreter.get_input_details()[0], interpreter.get_output_details()[0])
+        interpreter._astropath_io = details
+    input_details, output_details = details
+
+    buffer = interpreter.tensor(input_details['index'])()
+    if input_details['dtype'] != np.float32:
+        # Quantized models take integer input
+        scale, zero_point = input_details['quantization']
+        info = np.iinfo(input_details['dtype'])
+        np.clip(np.rint(batch / scale + zero_point), info.min, info.max, out=buffer, casting='unsafe')
+    else:
+        np.copyto(buffer, batch)
+    # invoke() refuses to run while a view of an internal tensor is alive
+    del buffer
+
+    interpreter.invoke()
+    output = interpreter.get_tensor(output_details['index']).astype(np.float32)
+
+    scale, zero_point = output_details['quantization']
+    if scale:
+        output = (output - zero_point) * scale
+    return output
+
+
 def normalize_image(image):
     """Normalize image to 0-1 range"""
     return image.astype(np.float32) / 255.0
@@ -151,16 +358,63 @@ def get_timestamp():
     return datetime.now().strftime("%Y%m%d-%H%M%S")
 
 
-def save_image(image, directory, prefix="detection"):
-    """Save image with timestamp"""
+def save_image(image, directory, prefix="detection", writer=None):
+    """
+    Save image with timestamp as a config.JPEG_QUALITY JPEG
+    
+    The frame is encoded once here; with an AsyncFileWriter the disk write happens on
+    its thread and the path is returned before the file exists.
+    """
     ensure_dir_exists(directory)
     ts = get_timestamp()
     filename = os.path.join(directory, f"{prefix}_{ts}.jpg")
-    cv2.imwrite(filename, image)
-    logger.info(f"Saved image: {filename}")
+    ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+    if not ok:
+        raise ValueError(f"Failed to encode image for {filename}")
+    if writer is not None:
+        writer.submit(filename, buffer)
+    else:
+        with open(filename, 'wb') as f:
+            f.write(buffer)
+        logger.info(f"Saved image: {filename}")
     return filename
 
 
+class AsyncFileWriter:
+    """
+    Write files on a background thread so slow storage (a Pi's SD card) stays off the caller
+    
+    submit() blocks only when max_pending writes are already queued.
+    """
+    
+    def __init__(self, max_pending=8):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="AsyncFileWriter", daemon=True)
+        self._thread.start()
+    
+    def submit(self, path, data):
+        """Queue bytes (or a buffer such as an encoded image) to be written to path"""
+        self._queue.put((path, data))
+    
+    def close(self, timeout=10):
+        """Finish queued writes and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, data = item
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                logger.info(f"Saved image: {path}")
+            except OSError as e:
+                logger.error(f"Failed to write {path}: {e}")
+
+
 # ==================== Performance Metrics ====================
 class FPSCounter:
     """Calculate frames per second"""
@@ -0,0 +1,140 @@
+"""
+test_api.py - Detection API Tests
+=================================
+Flask test-client checks that the detection endpoints still accept and return
+well-formed JSON: bulk POST on the dashboard and the streamed listing in app.py.
+Skipped when Flask or OpenCV/NumPy (imported through src.utils) is not installed.
+
+Usage:
+  python -m unittest tests.test_api
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import importlib.util
+from pathlib import Path
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import DetectionDatabase
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ('flask', 'flask_cors', 'cv2', 'numpy'))
+
+
+def make_detection(latitude, longitude, severity='Medium', confidence=0.8):
+    """Detection body as posted by the detectors"""
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'latitude': latitude,
+        'longitude': longitude,
+        'severity': severity,
+        'confidence': confidence,
+    }
+
+
+@unittest.skipUnless(HAS_DEPS, "Flask/OpenCV not installed")
+class TestDashboardAPI(unittest.TestCase):
+
+    def setUp(self):
+        from src.dashboard import DashboardServer
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dashboard = DashboardServer(db_path=os.path.join(self.tmp_dir, 'detections.db'))
+        self.client = self.dashboard.app.test_client()
+
+    def tearDown(self):
+        self.dashboard.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_post_array_inserts_all(self):
+        body = [make_detection(17.0, 73.0, 'High'), make_detection(18.0, 74.0, 'Low')]
+
+        response = self.client.post('/api/detections', data=json.dumps(body),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        payload = json.loads(response.data)
+        self.assertEqual(len(payload['detection_ids']), 2)
+        for detection_id, detection in zip(payload['detection_ids'], body):
+            row = self.dashboard.db.get_detection(detection_id)
+            self.assertEqual(row['severity'], detection['severity'])
+
+    def test_post_single_detection(self):
+        response = self.client.post('/api/detections', data=json.dumps(make_detection(17.0, 73.0)),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(self.dashboard.db.get_detection(json.loads(response.data)['detection_id']))
+
+    def test_post_array_missing_field_is_rejected(self):
+        body = [make_detection(17.0, 73.0), {'latitude': 18.0}]
+
+        response = self.client.post('/api/detections', data=json.dumps(body),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['status'], 'error')
+        self.assertEqual(self.dashboard.db.get_all_detections(), [])
+
+    def test_listing_and_heatmap_parse(self):
+        self.dashboard.db.add_detections_bulk([make_detection(17.0, 73.0, 'High'),
+                                               make_detection(18.0, 74.0, 'Low')])
+
+        listing = json.loads(self.client.get('/api/detections').data)
+        self.assertEqual(listing['count'], 2)
+        self.assertIn('notes', listing['detections'][0])
+
+        heatmap = json.loads(self.client.get('/api/heatmap').data)
+        self.assertEqual(heatmap['count'], 2)
+        self.assertEqual(len(heatmap['data']['latitude']), 2)
+
+    def test_health(self):
+        response = self.client.get('/api/health')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['status'], 'healthy')
+
+
+@unittest.skipUnless(HAS_DEPS, "Flask/OpenCV not installed")
+class TestAppDetectionsStream(unittest.TestCase):
+
+    def setUp(self):
+        import app as app_module
+
+        self.app_module = app_module
+        self.tmp_dir = tempfile.mkdtemp()
+        self.original_db = app_module.db
+        app_module.db = DetectionDatabase(os.path.join(self.tmp_dir, 'detections.db'))
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        self.app_module.db.close()
+        self.app_module.db = self.original_db
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_streamed_body_is_valid_json(self):
+        # More rows than one stream chunk, so the chunk joins are exercised
+        count = self.app_module.DETECTIONS_STREAM_CHUNK * 2 + 3
+        self.app_module.db.add_detections_bulk([make_detection(17.0 + i / 1000, 73.0) for i in range(count)])
+
+        payload = json.loads(self.client.get(f'/api/detections?limit={count}').data)
+
+        self.assertTrue(payload['success'])
+        self.assertEqual(payload['count'], count)
+        self.assertEqual(len(payload['detections']), count)
+        self.assertEqual(len({row['id'] for row in payload['detections']}), count)
+
+    def test_streamed_body_when_empty(self):
+        payload = json.loads(self.client.get('/api/detections').data)
+
+        self.assertEqual(payload, {'success': True, 'detections': [], 'count': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+test_api_client.py - BatchedReporter Tests
+==========================================
+Checks when queued detections are sent, with the HTTP POST replaced by a recorder.
+Skipped when requests or OpenCV/NumPy (imported through src.utils) is not installed.
+
+Usage:
+  python -m unittest tests.test_api_client
+"""
+
+import sys
+import time
+import threading
+import unittest
+import importlib.util
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ('requests', 'cv2', 'numpy'))
+
+
+def make_reporter():
+    """BatchedReporter whose batches are recorded instead of POSTed"""
+    from src.api_client import BatchedReporter
+
+    class RecordingReporter(BatchedReporter):
+        def __init__(self):
+            self.batches = []
+            self.sent = threading.Event()
+            super().__init__(url='http://localhost/unused')
+
+        def _send(self, batch):
+            self.batches.append((time.monotonic(), batch))
+            self.sent.set()
+
+    return RecordingReporter()
+
+
+@unittest.skipUnless(HAS_DEPS, "requests/OpenCV not installed")
+class TestBatchedReporter(unittest.TestCase):
+
+    def test_single_item_sent_after_interval(self):
+        reporter = make_reporter()
+        try:
+            submitted = time.monotonic()
+            reporter.submit({'id': 1})
+
+            self.assertTrue(reporter.sent.wait(config.API_BATCH_INTERVAL + 2.0),
+                            "a lone detection was not sent within API_BATCH_INTERVAL")
+            sent_at, batch = reporter.batches[0]
+            self.assertEqual(batch, [{'id': 1}])
+            self.assertGreaterEqual(sent_at - submitted, config.API_BATCH_INTERVAL * 0.5)
+        finally:
+            reporter.close()
+
+    def test_full_batch_sent_without_waiting(self):
+        reporter = make_reporter()
+        try:
+            for i in range(config.API_BATCH_MAX_ITEMS):
+                reporter.submit({'id': i})
+
+            self.assertTrue(reporter.sent.wait(config.API_BATCH_INTERVAL + 2.0))
+            self.assertEqual(len(reporter.batches[0][1]), config.API_BATCH_MAX_ITEMS)
+        finally:
+            reporter.close()
+
+    def test_close_sends_remaining(self):
+        reporter = make_reporter()
+        reporter.submit({'id': 1})
+        reporter.submit({'id': 2})
+        reporter.close()
+
+        sent = [item for _, batch in reporter.batches for item in batch]
+        self.assertEqual(sent, [{'id': 1}, {'id': 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
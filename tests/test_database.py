@@ -0,0 +1,194 @@
+"""
+test_database.py - DetectionDatabase Tests
+==========================================
+Schema, bulk insert, R*Tree area queries and trigger-maintained statistics,
+against a throwaway SQLite file (standard library only).
+
+Usage:
+  python -m unittest tests.test_database
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import DetectionDatabase
+
+
+def make_detection(latitude, longitude, severity='Medium', confidence=0.8, days_ago=0, **extra):
+    """Detection dict in the shape the detectors and API submit"""
+    detection = {
+        'timestamp': (datetime.now() - timedelta(days=days_ago)).isoformat(),
+        'latitude': latitude,
+        'longitude': longitude,
+        'severity': severity,
+        'confidence': confidence,
+        'class_name': 'pothole',
+        'camera_source': 'test',
+        'gps_quality': 4,
+    }
+    detection.update(extra)
+    return detection
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Fresh database file per test"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = DetectionDatabase(os.path.join(self.tmp_dir, 'detections.db'))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class TestBulkInsert(DatabaseTestCase):
+
+    def test_returned_ids_match_inserted_rows(self):
+        detections = [make_detection(17.0 + i / 100, 73.0, confidence=0.5 + i / 10) for i in range(5)]
+
+        ids = self.db.add_detections_bulk(detections)
+
+        self.assertEqual(len(ids), 5)
+        for detection_id, detection in zip(ids, detections):
+            row = self.db.get_detection(detection_id)
+            self.assertEqual(row['latitude'], detection['latitude'])
+            self.assertEqual(row['confidence'], detection['confidence'])
+
+    def test_ids_continue_after_single_inserts(self):
+        first = self.db.add_detection(make_detection(17.0, 73.0))
+        ids = self.db.add_detections_bulk([make_detection(18.0, 74.0), make_detection(19.0, 75.0)])
+
+        self.assertEqual(ids, [first + 1, first + 2])
+        self.assertEqual(self.db.get_detection(ids[1])['latitude'], 19.0)
+
+    def test_images_attach_to_their_rows(self):
+        ids = self.db.add_detections_bulk([
+            make_detection(17.0, 73.0),
+            make_detection(18.0, 74.0, image_base64='aGVsbG8='),
+        ])
+
+        self.assertIsNone(self.db.get_detection(ids[0])['image_base64'])
+        self.assertEqual(self.db.get_detection(ids[1])['image_base64'], 'aGVsbG8=')
+        # Listings never carry the image
+        self.assertNotIn('image_base64', self.db.get_all_detections()[0])
+
+    def test_empty_batch(self):
+        self.assertEqual(self.db.add_detections_bulk([]), [])
+
+
+class TestAreaQuery(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.inside = self.db.add_detections_bulk([
+            make_detection(17.3590, 73.8580),
+            make_detection(17.3595, 73.8585),
+        ])
+        self.db.add_detections_bulk([
+            make_detection(17.4000, 73.8580),   # north of the box
+            make_detection(17.3592, 73.9000),   # east of the box
+        ])
+
+    def test_rtree_available(self):
+        self.assertTrue(self.db.has_rtree, "SQLite build without R*Tree; area queries fall back to a scan")
+
+    def test_area_returns_only_points_inside(self):
+        rows = self.db.get_detections_by_area(17.35, 17.36, 73.85, 73.86)
+        self.assertCountEqual([row['id'] for row in rows], self.inside)
+
+    def test_area_follows_updates_and_deletes(self):
+        conn = self.db.conn
+        conn.execute('UPDATE detections SET latitude = 17.5 WHERE id = ?', (self.inside[0],))
+        conn.execute('DELETE FROM detections WHERE id = ?', (self.inside[1],))
+        conn.commit()
+
+        self.assertEqual(self.db.get_detections_by_area(17.35, 17.36, 73.85, 73.86), [])
+        rows = self.db.get_detections_by_area(17.49, 17.51, 73.85, 73.86)
+        self.assertEqual([row['id'] for row in rows], [self.inside[0]])
+
+
+class TestStatistics(DatabaseTestCase):
+
+    def test_counts_and_average_from_analytics(self):
+        self.db.add_detections_bulk([
+            make_detection(17.0, 73.0, 'High', 0.9),
+            make_detection(17.0, 73.0, 'High', 0.7),
+            make_detection(17.0, 73.0, 'Low', 0.5, days_ago=1),
+            make_detection(17.0, 73.0, 'Medium', 0.6, days_ago=60),   # outside the window
+        ])
+
+        stats = self.db.get_statistics(days=30)
+
+        self.assertEqual(stats['total_detections'], 3)
+        self.assertEqual(stats['high_severity'], 2)
+        self.assertEqual(stats['medium_severity'], 0)
+        self.assertEqual(stats['low_severity'], 1)
+        self.assertAlmostEqual(stats['avg_confidence'], 0.7)
+        self.assertEqual(stats['pending_repairs'], 3)
+
+    def test_repairs_and_deletes_update_statistics(self):
+        ids = self.db.add_detections_bulk([make_detection(17.0, 73.0, 'High', 0.9),
+                                           make_detection(17.0, 73.0, 'Low', 0.5)])
+
+        self.assertTrue(self.db.update_repair_status(ids[0], 'completed'))
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['repairs_completed'], 1)
+        self.assertEqual(stats['pending_repairs'], 1)
+
+        # Re-opening the repair takes it back out of the count
+        self.db.update_repair_status(ids[0], 'pending')
+        self.assertEqual(self.db.get_statistics()['repairs_completed'], 0)
+
+        self.db.conn.execute('DELETE FROM detections WHERE id = ?', (ids[1],))
+        self.db.conn.commit()
+        self.db.invalidate_cache()
+        stats = self.db.get_statistics()
+        self.assertEqual(stats['total_detections'], 1)
+        self.assertEqual(stats['low_severity'], 0)
+        self.assertAlmostEqual(stats['avg_confidence'], 0.9)
+
+    def test_existing_rows_are_backfilled(self):
+        self.db.add_detections_bulk([make_detection(17.0, 73.0, 'High', 0.9)])
+        path = self.db.db_path
+        self.db.close()
+
+        # Rebuild from scratch, as on the first start after an upgrade
+        conn = DetectionDatabase(path).conn
+        conn.executescript('DROP TRIGGER analytics_insert; DELETE FROM analytics;')
+        conn.close()
+
+        self.db = DetectionDatabase(path)
+        self.assertEqual(self.db.get_statistics()['total_detections'], 1)
+
+
+class TestListings(DatabaseTestCase):
+
+    def test_status_update_keeps_notes_in_listing(self):
+        detection_id = self.db.add_detection(make_detection(17.0, 73.0))
+        self.db.update_repair_status(detection_id, 'in_progress', 'crew assigned')
+
+        listed = self.db.get_all_detections()[0]
+        self.assertEqual(listed['notes'], 'crew assigned')
+        self.assertEqual(listed['repair_status'], 'in_progress')
+
+    def test_heatmap_is_column_oriented(self):
+        self.db.add_detections_bulk([make_detection(17.0, 73.0, 'High'), make_detection(18.0, 74.0, 'Low')])
+
+        heatmap = self.db.get_heatmap_data()
+
+        self.assertEqual(set(heatmap), {'latitude', 'longitude', 'severity', 'weight'})
+        self.assertCountEqual(heatmap['severity'], ['High', 'Low'])
+        self.assertEqual(len(heatmap['weight']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+"""
+ASTROPATH YOLO Edge Build (build_yolo_edge.py)
+Build INT8 YOLOv4-tiny artifacts for edge accelerators from the ONNX export (YOLOV4_ONNX)
+
+Targets:
+  openvino  OpenVINO IR (YOLO_OPENVINO_XML), INT8-quantized with NNCF     [openvino, nncf]
+  tflite    Full-integer TFLite (YOLO_TFLITE) via onnx2tf + TFLiteConverter [onnx2tf, tensorflow]
+  edgetpu   tflite + edgetpu_compiler -> YOLO_EDGETPU                         [edgetpu_compiler]
+
+Usage:
+  python tools/build_yolo_edge.py openvino tflite --samples 200
+
+Darknet weights are not converted here; export yolov4-tiny to ONNX first
+(e.g. with the darknet2onnx script from pytorch-YOLOv4) and place it at YOLOV4_ONNX.
+"""
+
+import os
+import sys
+import glob
+import shutil
+import argparse
+import subprocess
+import tempfile
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from src.utils import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def load_calibration_frames(image_dir, size, samples):
+    """
+    Load road frames as RGB float32 0-1, resized to the YOLO input size
+
+    Returns:
+        np.ndarray of shape (N, size, size, 3)
+    """
+    paths = []
+    for ext in ('jpg', 'jpeg', 'png', 'JPG', 'JPEG', 'PNG'):
+        paths.extend(glob.glob(os.path.join(image_dir, '**', f'*.{ext}'), recursive=True))
+    paths = sorted(paths)[:samples]
+
+    frames = []
+    for path in paths:
+        img = cv2.imread(path)
+        if img is None:
+            continue
+        img = cv2.resize(img, (size, size), interpolation=cv2.INTER_LINEAR)
+        frames.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB).astype(np.float32) / 255.0)
+
+    logger.info(f"Loaded {len(frames)} calibration frames from {image_dir}")
+    return np.stack(frames) if frames else np.empty((0, size, size, 3), np.float32)
+
+
+def build_openvino(onnx_path, frames, xml_path):
+    """Convert ONNX to OpenVINO IR and quantize it to INT8 with NNCF"""
+    try:
+        import openvino as ov
+        import nncf
+    except ImportError:
+        logger.error("openvino and nncf are required: pip install openvino nncf")
+        return False
+
+    model = ov.convert_model(onnx_path)
+
+    # NNCF feeds the model NCHW batches of one
+    dataset = nncf.Dataset(list(frames), lambda frame: frame.transpose(2, 0, 1)[np.newaxis])
+    quantized = nncf.quantize(model, dataset, subset_size=len(frames))
+
+    ov.save_model(quantized, xml_path)
+    logger.info(f"OpenVINO INT8 IR saved: {xml_path}")
+    return True
+
+
+def build_tflite(onnx_path, frames, tflite_path):
+    """Convert ONNX -> TF SavedModel (onnx2tf, NHWC) -> full-integer INT8 TFLite"""
+    if shutil.which('onnx2tf') is None:
+        logger.error("onnx2tf not found on PATH: pip install onnx2tf")
+        return False
+
+    import tensorflow as tf
+
+    with tempfile.TemporaryDirectory() as saved_model_dir:
+        result = subprocess.run(['onnx2tf', '-i', onnx_path, '-o', saved_model_dir],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            logger.error(f"onnx2tf failed: {result.stderr.decode(errors='replace')[-500:]}")
+            return False
+
+        def representative_dataset():
+            for frame in frames:
+                yield [frame[np.newaxis]]
+
+        converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.float32  # keep box decoding in float
+        tflite_model = converter.convert()
+
+    with open(tflite_path, 'wb') as f:
+        f.write(tflite_model)
+    logger.info(f"INT8 TFLite saved: {tflite_path}")
+    return True
+
+
+def build_edgetpu(tflite_path, edgetpu_path):
+    """Compile a full-integer TFLite model for the Coral Edge TPU"""
+    compiler = shutil.which('edgetpu_compiler')
+    if compiler is None:
+        logger.error("edgetpu_compiler not found on PATH (Coral Edge TPU compiler, Linux x86-64 only)")
+        return False
+
+    out_dir = os.path.dirname(edgetpu_path)
+    result = subprocess.run([compiler, '-s', '-o', out_dir, tflite_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    logger.info(result.stdout.decode(errors='replace'))
+    if result.returncode != 0:
+        return False
+
+    # The compiler writes <name>_edgetpu.tflite next to the output dir
+    compiled = os.path.join(out_dir, os.path.basename(tflite_path).replace('.tflite', '_edgetpu.tflite'))
+    if compiled != edgetpu_path:
+        shutil.move(compiled, edgetpu_path)
+    logger.info(f"Edge TPU model saved: {edgetpu_path}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build INT8 YOLOv4-tiny models for OpenVINO / TFLite / Edge TPU")
+    parser.add_argument('targets', nargs='+', choices=['openvino', 'tflite', 'edgetpu'])
+    parser.add_argument('--onnx', default=config.YOLOV4_ONNX, help="YOLOv4-tiny ONNX export")
+    parser.add_argument('--images', default=config.TRAINING_DATA_PATH, help="Folder of road frames for calibration")
+    parser.add_argument('--samples', type=int, default=200, help="Calibration frames")
+    parser.add_argument('--size', type=int,
+                        default=config.FAST_IMG_SIZE_YOLO if config.FAST_MODE else config.IMG_SIZE_YOLO,
+                        help="Network input size the ONNX model was exported with")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.onnx):
+        logger.error(f"ONNX model not found: {args.onnx}")
+        return 1
+
+    frames = load_calibration_frames(args.images, args.size, args.samples)
+    if len(frames) == 0:
+        logger.error("No calibration frames found; INT8 quantization needs representative data.")
+        return 1
+
+    ok = True
+    if 'openvino' in args.targets:
+        ok &= build_openvino(args.onnx, frames, config.YOLO_OPENVINO_XML)
+
+    if 'tflite' in args.targets or 'edgetpu' in args.targets:
+        ok &= build_tflite(args.onnx, frames, config.YOLO_TFLITE)
+
+    if 'edgetpu' in args.targets and os.path.exists(config.YOLO_TFLITE):
+        ok &= build_edgetpu(config.YOLO_TFLITE, config.YOLO_EDGETPU)
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+ASTROPATH Classifier Quantization (quantize_classifier.py)
+Convert the trained Keras classifier (CLASSIFIER_MODEL) into a full-INT8 TFLite model
+(CLASSIFIER_TFLITE), calibrated on images from the training folders
+
+Usage:
+  python tools/quantize_classifier.py [--samples 100]
+
+With PI_OPTIMIZE = True the apps then load the quantized model (config.ACTIVE_CLASSIFIER).
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from src.utils import setup_logger
+from src.detection.train_classifier import PotholeClassifierTrainer
+
+logger = setup_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-training INT8 quantization of the pothole classifier")
+    parser.add_argument('--model', default=config.CLASSIFIER_MODEL, help="Keras .h5 model to convert")
+    parser.add_argument('--output', default=config.CLASSIFIER_TFLITE, help="Output .tflite path")
+    parser.add_argument('--samples', type=int, default=100, help="Calibration images (split across both classes)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        logger.error(f"Keras model not found: {args.model}. Train it first (main.py option 1).")
+        return 1
+
+    import tensorflow as tf
+
+    trainer = PotholeClassifierTrainer(img_size=config.IMG_SIZE_CLASSIFIER)
+    trainer.model = tf.keras.models.load_model(args.model)
+
+    # Representative dataset: a balanced sample of pothole and plain road images
+    per_class = max(1, args.samples // 2)
+    pothole_imgs, _ = trainer.load_images_from_directory(config.POTHOLE_DATA_PATH, 1, max_samples=per_class)
+    plain_imgs, _ = trainer.load_images_from_directory(config.PLAIN_DATA_PATH, 0, max_samples=per_class)
+    images = [imgs for imgs in (pothole_imgs, plain_imgs) if len(imgs)]
+
+    if not images:
+        logger.error("No calibration images found in the training folders.")
+        return 1
+
+    trainer.convert_to_tflite(output_path=args.output, representative_images=np.concatenate(images))
+
+    size_in = os.path.getsize(args.model) / 1e6
+    size_out = os.path.getsize(args.output) / 1e6
+    logger.info(f"Quantized classifier: {size_in:.1f} MB -> {size_out:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())